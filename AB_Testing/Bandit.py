@@ -24,6 +24,10 @@ for structured and readable outputs.
 """
 
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
 from loguru import logger
 
 
@@ -104,6 +108,343 @@ class Bandit(ABC):
         """
         pass
 
+    # The helpers below are shared by every implementation and keep the trial log
+    # in preallocated, compactly typed arrays instead of growing Python lists.
+
+    # Names of the attributes that make up the algorithm state in a checkpoint.
+    checkpoint_fields = ()
+
+    # Optional Instrumentation (see instrumentation.py); None runs the plain trial loop.
+    instrumentation = None
+
+    # Optional DriftingEnvironment (see nonstationary.py) that changes the true arm means
+    # during a run; None keeps the means the bandit was created with.
+    environment = None
+
+    # Optional posterior_samples(n_draws, rng) method returning (n_draws, n_arms) joint draws
+    # of the arm values, separate from the bandit's own rng. The posterior stopping criteria
+    # (see stopping.py) need it; None means the bandit has no posterior to sample.
+    posterior_samples = None
+
+    def _reset_log(self, capacity, arm_regrets):
+        """
+        Preallocate the trial buffers and zero the running accumulators.
+
+        Args:
+            capacity (int): Number of trials the buffers can hold before growing.
+            arm_regrets (Sequence[float]): Regret of pulling each arm once
+                (best true mean minus the arm's true mean).
+        """
+        arm_regrets = np.asarray(arm_regrets)
+        arm_dtype = np.int16 if len(arm_regrets) <= np.iinfo(np.int16).max else np.int32
+        self._arm_log = np.empty(capacity, dtype=arm_dtype)
+        self._reward_log = np.empty(capacity, dtype=np.float32)
+        self._arm_regrets = arm_regrets
+        self._arm_regret_values = arm_regrets.tolist()
+        self._log_pos = 0
+        self._log_offset = 0
+        self._tally_pos = 0
+        self._arm_counts = np.zeros(len(arm_regrets), dtype=np.int64)
+        self._arm_sums = np.zeros(len(arm_regrets))
+        self._sink = None
+        self.stopping_decision = None
+        self.total_reward = 0.0
+        self.total_regret = 0
+
+    @property
+    def trials_logged(self):
+        """int: Total number of trials run so far, including rows already flushed to a sink."""
+        return self._log_offset + self._log_pos
+
+    def _grow_log(self):
+        """Double the capacity of the trial buffers, keeping the logged trials."""
+        capacity = max(2 * len(self._arm_log), 1024)
+        for name in ("_arm_log", "_reward_log"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _log_trial(self, arm, reward):
+        """
+        Append one trial to the buffers and update the running totals in O(1).
+
+        Args:
+            arm (int): Index of the chosen arm.
+            reward (float): The reward obtained from that arm.
+        """
+        n = self._log_pos
+        if n == len(self._arm_log):
+            if self._sink is None:
+                self._grow_log()
+            else:
+                self._flush_log()
+                n = 0
+        self._arm_log[n] = arm
+        self._reward_log[n] = reward
+        self._log_pos = n + 1
+        self.total_reward += reward
+        self.total_regret += self._arm_regret_values[arm]
+
+    def _flush_log(self):
+        """Write the buffered trials to the result sink as one chunk and empty the buffers."""
+        if self.instrumentation is not None:
+            self.instrumentation.count("sink_flushes")
+        self._tally_log()
+        n = self._log_pos
+        arms = self._arm_log[:n]
+        self._sink.append({
+            "Trial": np.arange(self._log_offset + 1, self._log_offset + n + 1),
+            "Arm": arms,
+            "Reward": self._reward_log[:n],
+            "Regret": self._logged_regrets(arms),
+            "Algorithm": self.algorithm
+        })
+        self._log_offset += n
+        self._log_pos = self._tally_pos = 0
+
+    def _logged_regrets(self, arms):
+        """
+        Regret of each trial held in the buffers.
+
+        Args:
+            arms (np.ndarray): The logged arms, starting at the first buffered trial.
+
+        Returns:
+            np.ndarray: One regret per trial, taken from the environment's means when one is attached.
+        """
+        if self.environment is None:
+            return self._arm_regrets[arms]
+        return self.environment.trial_regrets(arms, self._log_offset + 1)
+
+    def _set_true_means(self, means):
+        """
+        Play against new true arm means from the next trial on.
+
+        The base class updates the per-arm regrets used by the running total; subclasses
+        also replace the means their pull() draws rewards from.
+
+        Args:
+            means (Sequence[float]): New true mean reward of each arm.
+        """
+        means = np.asarray(means, dtype=float)
+        self._arm_regrets = np.max(means) - means
+        self._arm_regret_values = self._arm_regrets.tolist()
+
+    def _tally_log(self):
+        """Add the trials logged since the last tally to the per-arm pull counts and reward sums."""
+        start, stop = self._tally_pos, self._log_pos
+        if stop > start:
+            arms = self._arm_log[start:stop]
+            n_arms = len(self._arm_counts)
+            self._arm_counts += np.bincount(arms, minlength=n_arms)
+            self._arm_sums += np.bincount(arms, weights=self._reward_log[start:stop], minlength=n_arms)
+        self._tally_pos = stop
+
+    def arm_totals(self):
+        """
+        Pull counts and reward sums per arm over every trial of the run, including flushed ones.
+
+        Returns:
+            tuple: (counts (np.ndarray), reward_sums (np.ndarray)), one value per arm.
+        """
+        self._tally_log()
+        return self._arm_counts, self._arm_sums
+
+    def _trial(self, t):
+        """
+        Run a single trial: pick an arm, observe the reward and update the state.
+
+        The default pulls and updates once; subclasses override it when a trial needs
+        more, e.g. EpsilonGreedy decays epsilon first.
+
+        Args:
+            t (int): Current trial number, starting from 1.
+
+        Returns:
+            tuple: (arm_index (int), reward (float))
+        """
+        arm, reward = self.pull()
+        self.update(arm, reward)
+        return arm, reward
+
+    def _log_stopping_decision(self):
+        """Log the decision of the stopping rule used in the last run, if any."""
+        decision = self.stopping_decision
+        if decision is None:
+            return
+        if decision["criterion"] == "confidence_sequence":
+            evidence = (f"lower bound {decision['lower_bound']:.4f} vs best rival upper bound "
+                        f"{decision['rival_upper_bound']:.4f}")
+        else:
+            evidence = f"P(best)={decision['prob_best']:.4f}, expected loss={decision['expected_loss']:.5f}"
+        logger.info(f"[{self.algorithm}] Decision: arm {decision['best_arm']} ({evidence}) "
+                    f"after {decision['trials_run']} trials, {decision['trials_saved']} trials saved")
+
+    def _restored(self):
+        """Rebuild any derived structures after the state was loaded from a checkpoint."""
+        pass
+
+    def _start_log(self, n_trials, arm_regrets, checkpoint=None, resume=False, sink=None):
+        """
+        Allocate the trial log for a run, restoring it from a checkpoint when resuming.
+
+        Args:
+            n_trials (int): Total number of trials of the run.
+            arm_regrets (Sequence[float]): Regret of pulling each arm once.
+            checkpoint (Checkpointer, optional): Where the run is checkpointed.
+            resume (bool, optional): Continue from the last checkpoint if one exists.
+            sink (ResultSink, optional): Receives the trial log in chunks of sink.chunk_size
+                rows, so only one chunk is ever held in memory. With a checkpoint as well, every
+                save flushes into the sink, and a resumed run appends to the same store.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count("runs")
+            with self.instrumentation.phase("setup"):
+                return self._setup_log(n_trials, arm_regrets, checkpoint, resume, sink)
+        self._setup_log(n_trials, arm_regrets, checkpoint, resume, sink)
+
+    def _setup_log(self, n_trials, arm_regrets, checkpoint, resume, sink):
+        self._reset_log(n_trials if sink is None else min(n_trials, sink.chunk_size), arm_regrets)
+        self._sink = sink
+        if checkpoint is None:
+            return
+        if not (resume and checkpoint.restore(self)):
+            checkpoint.begin(self)
+
+    def _run_trials(self, n_trials, checkpoint=None, stopping=None):
+        """
+        Run trials until n_trials are logged, checkpointing every checkpoint.every trials.
+
+        With an instrumentation attached, the same loop runs inside instrumentation.loop(),
+        which times and profiles it, with the per-trial calls replaced by the (possibly
+        timed) ones of instrumentation.trial_hooks(). Progress is logged at segment ends.
+        An attached environment wraps each trial to switch the true means at its change points.
+
+        Args:
+            n_trials (int): Total number of iterations the run should reach.
+            checkpoint (Checkpointer, optional): Saves the state between segments of trials.
+            stopping (StoppingRule, optional): Checked every stopping.check_every trials,
+                ends the run early once its criterion is met.
+        """
+        instrumentation = self.instrumentation
+        trial, log_trial = self._trial, self._log_trial
+        if self.environment is not None:
+            trial = self.environment.trial_hook(self, trial)
+        progress_every = None
+        loop = nullcontext()
+        if instrumentation is not None:
+            trial, log_trial = instrumentation.trial_hooks(trial, log_trial)
+            progress_every = instrumentation.progress_every
+            loop = instrumentation.loop(self, n_trials)
+        t = self.trials_logged + 1
+        with loop:
+            while t <= n_trials:
+                stop = self._segment_stop(t, n_trials, checkpoint, stopping, progress_every)
+                for t in range(t, stop + 1):
+                    arm, reward = trial(t)
+                    log_trial(arm, reward)
+                t = stop + 1
+                if self._end_segment(n_trials, checkpoint, stopping):
+                    break
+
+    @staticmethod
+    def _segment_stop(t, n_trials, checkpoint, stopping, progress_every=None):
+        """Return the last trial before the next checkpoint, stopping check or progress log, starting at trial t."""
+        stop = n_trials
+        for every in (checkpoint and checkpoint.every, stopping and stopping.check_every, progress_every):
+            if every:
+                stop = min(stop, ((t - 1) // every + 1) * every)
+        return stop
+
+    def _end_segment(self, n_trials, checkpoint, stopping):
+        """
+        Log progress, check the stopping rule and save a checkpoint at the end of a segment of trials.
+
+        Returns:
+            bool: True when the stopping rule ended the run.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            instrumentation.segment_done(self.trials_logged)
+        stopped = False
+        if stopping is not None:
+            if instrumentation is None:
+                stopped = stopping.check(self, n_trials)
+            else:
+                with instrumentation.phase("stopping"):
+                    stopped = stopping.check(self, n_trials)
+        done = self.trials_logged
+        if checkpoint is not None and (stopped or done == n_trials or done % checkpoint.every == 0):
+            if instrumentation is None:
+                checkpoint.save(self)
+            else:
+                with instrumentation.phase("checkpoint"):
+                    checkpoint.save(self)
+                instrumentation.count("checkpoints")
+        if stopped:
+            logger.info(f"[{self.algorithm}] Stopped early after {done} of {n_trials} trials")
+        return stopped
+
+    def _collect_results(self, trial_column=True):
+        """
+        Finish a run: flush the last chunk to the sink, or build the results DataFrame.
+
+        Args:
+            trial_column (bool, optional): Whether the DataFrame gets a 'Trial' column.
+
+        Returns:
+            pd.DataFrame | None: The results, or None when they were streamed to a sink.
+        """
+        if self.instrumentation is not None:
+            with self.instrumentation.phase("results"):
+                return self._finish_results(trial_column)
+        return self._finish_results(trial_column)
+
+    def _finish_results(self, trial_column):
+        if self._sink is None:
+            return self._results_frame(self.algorithm, trial_column)
+        self._flush_log()
+        self._sink = None
+        return None
+
+    @property
+    def logged_arms(self):
+        """np.ndarray: View of the arm indices held in memory (all of them unless streamed to a sink)."""
+        return self._arm_log[:self._log_pos]
+
+    @property
+    def logged_rewards(self):
+        """np.ndarray: View of the rewards held in memory (all of them unless streamed to a sink)."""
+        return self._reward_log[:self._log_pos]
+
+    @property
+    def mean_reward(self):
+        """float: Average reward over the logged trials, in constant time."""
+        return self.total_reward / self.trials_logged if self.trials_logged else float("nan")
+
+    def _results_frame(self, algorithm, trial_column=True):
+        """
+        Build the results DataFrame on top of the trial buffers without copying them.
+
+        Args:
+            algorithm (str): Value of the 'Algorithm' column.
+            trial_column (bool, optional): Whether to include a 1-based 'Trial' column.
+
+        Returns:
+            pd.DataFrame: Trial-by-trial record of arms, rewards and regrets.
+        """
+        n = self._log_pos
+        arms = self.logged_arms
+        columns = {"Trial": np.arange(1, n + 1)} if trial_column else {}
+        columns.update({
+            "Arm": arms,
+            "Reward": self.logged_rewards,
+            "Regret": self._logged_regrets(arms),
+            "Algorithm": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), [algorithm])
+        })
+        return pd.DataFrame(columns, copy=False)
+
 
 class Visualization:
     """
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Batched Multi-Replicate Bandit Simulation
+Runs many independent replicates of Epsilon-Greedy and Thompson Sampling at once.
+
+Every replicate keeps the exact logic of the single-run classes, but the bandit state
+is stored as (n_replicates, n_arms) arrays, so each time step is one vectorized
+selection and one vectorized update for all replicates together.
+"""
+
+
+from abc import abstractmethod
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from Bandit import Bandit
+from epsilon_greedy_algorithm import epsilon_schedule
+
+
+class BatchedBandit(Bandit):
+
+    """
+    Shared machinery for running R independent bandit replicates in lockstep.
+
+    Class Attributes:
+        true_means(np.ndarray): True mean rewards of each arm.
+
+        n_arms(int): Total number of arms.
+
+        n_replicates(int): Number of independent replicates simulated together.
+
+        rng(np.random.Generator): Random generator used for all replicates.
+
+        mean_rewards(np.ndarray): Reward per trial averaged over the replicates, shape (n_trials,).
+
+        total_rewards(np.ndarray): Total reward of each replicate, shape (n_replicates,).
+
+        cumulative_regret(np.ndarray): Cumulative regret of shape (n_trials, n_replicates), float32.
+    """
+
+    algorithm = "Batched Bandit"
+
+    def __init__(self, true_means, n_replicates=100, seed=None):
+        """
+        Initialize the shared replicate state.
+
+        Args:
+            true_means (Sequence[float]): The real average reward values for each arm.
+            n_replicates (int, optional): Number of independent replicates. Defaults to 100.
+            seed (int | np.random.SeedSequence, optional): Seed for reproducible runs.
+        """
+        self.true_means = np.asarray(true_means, dtype=float)
+        self.n_arms = len(self.true_means)
+        self.n_replicates = int(n_replicates)
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(self.n_replicates)
+        self.mean_rewards = None
+        self.total_rewards = None
+        self.cumulative_regret = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(arms={self.n_arms}, replicates={self.n_replicates})"
+
+    @abstractmethod
+    def select_arms(self, t):
+        """
+        Choose one arm per replicate for trial t.
+
+        Args:
+            t (int): Current trial number, starting from 1.
+
+        Returns:
+            np.ndarray: Arm index for each replicate.
+        """
+        pass
+
+    def pull(self, t=1):
+        """
+        Pull one arm in every replicate and observe the rewards.
+
+        Args:
+            t (int, optional): Current trial number, starting from 1.
+
+        Returns:
+            tuple: (chosen_arms, observed_rewards), both of shape (n_replicates,)
+        """
+        arms = self.select_arms(t)
+        rewards = self.rng.normal(self.true_means[arms], 1)
+        return arms, rewards
+
+    def experiment(self, n_trials=20000, ci=0.95):
+        """
+        Run all replicates for n_trials steps and aggregate the regret curves.
+
+        Args:
+            n_trials (int): Number of iterations to perform.
+            ci (float, optional): Width of the percentile band around the mean curve.
+
+        Returns:
+            pd.DataFrame: Per-trial mean, standard deviation and percentile band of the
+            cumulative regret across replicates, plus the mean reward.
+        """
+        logger.info(f"Starting {self.algorithm} simulation with {self.n_replicates} replicates")
+
+        # Rewards and arms are folded into running totals as they come; only the cumulative
+        # regret curves, which the percentile bands need, are kept per trial and replicate.
+        gaps = np.max(self.true_means) - self.true_means
+        self.mean_rewards = np.empty(n_trials)
+        self.total_rewards = np.zeros(self.n_replicates)
+        self.cumulative_regret = np.empty((n_trials, self.n_replicates), dtype=np.float32)
+        regret = np.zeros(self.n_replicates)
+
+        for t in range(1, n_trials + 1):
+            arms, rewards = self.pull(t)
+            self.update(arms, rewards)
+            self.mean_rewards[t - 1] = rewards.mean()
+            self.total_rewards += rewards
+            regret += gaps[arms]
+            self.cumulative_regret[t - 1] = regret
+
+        results = self.summarize(ci)
+
+        logger.success(f"{self.algorithm} simulation complete.")
+        return results
+
+    @property
+    def regret_curves(self):
+        """np.ndarray: Cumulative regret per replicate, shape (n_replicates, n_trials)."""
+        return self.cumulative_regret.T
+
+    def summarize(self, ci=0.95):
+        """
+        Aggregate the per-replicate cumulative regret into summary curves.
+
+        Args:
+            ci (float, optional): Width of the percentile band. Defaults to 0.95.
+
+        Returns:
+            pd.DataFrame: Trial, mean/std/lower/upper cumulative regret and mean reward.
+        """
+        tail = (1 - ci) / 2 * 100
+        lower, upper = np.percentile(self.cumulative_regret, [tail, 100 - tail], axis=1)
+        return pd.DataFrame({
+            "Trial": np.arange(1, len(self.cumulative_regret) + 1),
+            "Mean Regret": self.cumulative_regret.mean(axis=1, dtype=np.float64),
+            "Std Regret": self.cumulative_regret.std(axis=1, dtype=np.float64),
+            "Lower Regret": lower,
+            "Upper Regret": upper,
+            "Mean Reward": self.mean_rewards,
+            "Algorithm": self.algorithm
+        })
+
+    def report(self):
+        """
+        Log the average reward and the distribution of total regret across replicates.
+        """
+        total_regret = self.cumulative_regret[-1]
+        average_reward = self.total_rewards.sum() / (len(self.mean_rewards) * self.n_replicates)
+        logger.info(f"[{self.algorithm}] Average Reward: {average_reward:.4f}")
+        logger.info(f"[{self.algorithm}] Total Regret: {total_regret.mean():.4f} "
+                    f"(std {total_regret.std():.4f} over {self.n_replicates} replicates)")
+
+
+class BatchedEpsilonGreedy(BatchedBandit):
+
+    """
+    Epsilon-Greedy with a decaying epsilon schedule, run for many replicates at once.
+
+    Class Attributes:
+        epsilon(float): Exploration rate of the current trial (shared by all replicates).
+
+        pulls(np.ndarray): Pull counts of shape (n_replicates, n_arms).
+
+        estimates(np.ndarray): Estimated reward means of shape (n_replicates, n_arms).
+    """
+
+    algorithm = "Epsilon-Greedy"
+
+    def __init__(self, true_means, n_replicates=100, epsilon_start=1.0, epsilon_decay="inverse", seed=None):
+        """
+        Initializing the batched algorithm.
+
+        Args:
+            true_means (Sequence[float]): The real average reward values for each arm.
+            n_replicates (int, optional): Number of independent replicates. Defaults to 100.
+            epsilon_start (float, optional): Starting exploration probability. Defaults to 1.0.
+            epsilon_decay (str, optional): Decay schedule from EPSILON_SCHEDULES. Defaults to "inverse".
+            seed (int | np.random.SeedSequence, optional): Seed for reproducible runs.
+        """
+        super().__init__(true_means, n_replicates, seed)
+        self.epsilon_start = epsilon_start
+        self.epsilon = epsilon_start
+        self._schedule = epsilon_schedule(epsilon_decay)
+        self.pulls = np.zeros((self.n_replicates, self.n_arms))
+        self.estimates = np.zeros((self.n_replicates, self.n_arms))
+
+    def select_arms(self, t):
+        """
+        Explore uniformly with probability epsilon, otherwise take each replicate's argmax.
+
+        Args:
+            t (int): Current trial number, starting from 1.
+
+        Returns:
+            np.ndarray: Arm index for each replicate.
+        """
+        self.epsilon = self._schedule(self.epsilon_start, t)
+        explore = self.rng.random(self.n_replicates) < self.epsilon
+        random_arms = self.rng.integers(self.n_arms, size=self.n_replicates)
+        return np.where(explore, random_arms, np.argmax(self.estimates, axis=1))
+
+    def update(self, arms, rewards):
+        """
+        Update the running mean of the pulled arm in every replicate.
+
+        Args:
+            arms (np.ndarray): Arm index pulled in each replicate.
+            rewards (np.ndarray): Reward obtained in each replicate.
+        """
+        self.pulls[self._rows, arms] += 1
+        current = self.estimates[self._rows, arms]
+        self.estimates[self._rows, arms] = current + (rewards - current) / self.pulls[self._rows, arms]
+
+
+class BatchedThompsonSampling(BatchedBandit):
+
+    """
+    Beta-posterior Thompson Sampling run for many replicates at once.
+
+    Class Attributes:
+        posterior_a(np.ndarray): Alpha parameters of shape (n_replicates, n_arms).
+
+        posterior_b(np.ndarray): Beta parameters of shape (n_replicates, n_arms).
+    """
+
+    algorithm = "Thompson Sampling"
+
+    def __init__(self, true_means, n_replicates=100, seed=None):
+        """
+        Initialize uniform Beta(1, 1) priors for every arm of every replicate.
+
+        Args:
+            true_means (Sequence[float]): Real mean reward for each arm.
+            n_replicates (int, optional): Number of independent replicates. Defaults to 100.
+            seed (int | np.random.SeedSequence, optional): Seed for reproducible runs.
+        """
+        super().__init__(true_means, n_replicates, seed)
+        self.posterior_a = np.ones((self.n_replicates, self.n_arms))
+        self.posterior_b = np.ones((self.n_replicates, self.n_arms))
+
+    def select_arms(self, t):
+        """
+        Sample every posterior once and take the argmax within each replicate.
+
+        Args:
+            t (int): Current trial number (unused, kept for a uniform interface).
+
+        Returns:
+            np.ndarray: Arm index for each replicate.
+        """
+        return np.argmax(self.rng.beta(self.posterior_a, self.posterior_b), axis=1)
+
+    def update(self, arms, rewards):
+        """
+        Count a success for positive rewards and a failure otherwise.
+
+        Args:
+            arms (np.ndarray): Arm index pulled in each replicate.
+            rewards (np.ndarray): Reward obtained in each replicate.
+        """
+        success = rewards > 0
+        self.posterior_a[self._rows, arms] += success
+        self.posterior_b[self._rows, arms] += ~success
+
+
+# In[ ]:
+
+
+
+
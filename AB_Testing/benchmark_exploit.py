@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Epsilon-Greedy Exploitation Benchmark
+Compares trials per second of the plain np.argmax exploit step with the
+tournament-tree best-arm index as the number of arms grows.
+
+Both variants are run from the same seed, so the benchmark also checks that
+they choose exactly the same sequence of arms.
+"""
+
+
+import argparse
+import time
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EpsilonGreedy
+
+
+def run(n_arms, n_trials, indexed, seed=0):
+    """
+    Time one Epsilon-Greedy run.
+
+    Args:
+        n_arms (int): Number of arms (true means drawn uniformly from [0, 1)).
+        n_trials (int): Number of trials to run.
+        indexed (bool): Whether to use the tournament-tree index.
+        seed (int, optional): Seed for the arm means and the run itself.
+
+    Returns:
+        tuple: (trials per second, chosen arms)
+    """
+    means = np.random.RandomState(seed).rand(n_arms)
+    bandit = EpsilonGreedy(means, rng=np.random.RandomState(seed + 1), indexed=indexed)
+    start = time.perf_counter()
+    bandit.experiment(n_trials)
+    elapsed = time.perf_counter() - start
+    return n_trials / elapsed, bandit.logged_arms.copy()
+
+
+def benchmark(arm_counts=(10, 100, 1000, 10000, 100000, 1000000), n_trials=20000, seed=0):
+    """
+    Measure exploitation throughput against the number of arms.
+
+    Args:
+        arm_counts (Sequence[int]): Arm counts to benchmark.
+        n_trials (int): Trials per run.
+        seed (int): Seed shared by both variants.
+
+    Returns:
+        pd.DataFrame: Trials per second with and without the index, and the speedup.
+    """
+    logger.disable("epsilon_greedy_algorithm")
+    rows = []
+    for n_arms in arm_counts:
+        argmax_tps, argmax_arms = run(n_arms, n_trials, indexed=False, seed=seed)
+        tree_tps, tree_arms = run(n_arms, n_trials, indexed=True, seed=seed)
+        if not np.array_equal(argmax_arms, tree_arms):
+            raise AssertionError(f"Indexed and argmax runs diverged for {n_arms} arms")
+        rows.append({"n_arms": n_arms, "argmax_trials_per_sec": argmax_tps,
+                     "indexed_trials_per_sec": tree_tps, "speedup": tree_tps / argmax_tps})
+        logger.info(f"{n_arms} arms: argmax {argmax_tps:,.0f}/s, indexed {tree_tps:,.0f}/s")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Epsilon-Greedy exploit step.")
+    parser.add_argument("--arms", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000, 1000000])
+    parser.add_argument("--trials", type=int, default=20000)
+    args = parser.parse_args()
+    logger.info(f"Exploitation benchmark:\n{benchmark(args.arms, args.trials).to_string(index=False)}")
+
+
+# In[ ]:
+
+
+
+
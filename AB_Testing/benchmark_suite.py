@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Benchmark Suite for the Bandit Hot Paths
+Measures pull()/update() latency, experiment() throughput, result DataFrame memory
+and report() cost for EpsilonGreedy and ThompsonSampling with fixed seeds.
+
+Results are written as JSON. Passing a previous results file as --baseline compares
+every metric against it and exits with status 1 when any of them regressed by more
+than --threshold, so the suite can gate changes automatically.
+
+Usage:
+    python benchmark_suite.py --output bench.json
+    python benchmark_suite.py --output new.json --baseline bench.json --threshold 0.15
+"""
+
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EpsilonGreedy
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+BANDITS = {"epsilon_greedy": EpsilonGreedy, "thompson_sampling": ThompsonSampling}
+
+# Whether a larger value of the unit is better, used when flagging regressions.
+HIGHER_IS_BETTER = {"ns/call": False, "trials/s": True, "bytes": False, "us/call": False}
+
+
+def _make(name, n_arms, seed):
+    """Build a bandit with evenly spaced arm means and its own seeded random state."""
+    return BANDITS[name](np.linspace(0, 1, n_arms), rng=np.random.RandomState(seed))
+
+
+def _best_of(function, repeats):
+    """Run function repeats times and return the fastest wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_calls(name, n_arms=4, n_calls=20000, repeats=5, seed=0):
+    """
+    Per-call latency of pull() and update().
+
+    Returns:
+        list[dict]: One result per method.
+    """
+    bandit = _make(name, n_arms, seed)
+    bandit.experiment(1000)
+    pulls = [bandit.pull() for _ in range(n_calls)]
+
+    def pull_loop():
+        for _ in range(n_calls):
+            bandit.pull()
+
+    def update_loop():
+        for arm, reward in pulls:
+            bandit.update(arm, reward)
+
+    return [
+        {"name": f"{name}.pull", "params": {"n_arms": n_arms},
+         "value": _best_of(pull_loop, repeats) / n_calls * 1e9, "unit": "ns/call"},
+        {"name": f"{name}.update", "params": {"n_arms": n_arms},
+         "value": _best_of(update_loop, repeats) / n_calls * 1e9, "unit": "ns/call"},
+    ]
+
+
+def bench_experiment(name, n_trials, n_arms, repeats=3, seed=0):
+    """
+    End-to-end experiment() throughput, result memory and report() cost.
+
+    Returns:
+        list[dict]: Throughput, DataFrame memory, peak traced memory and report() latency.
+    """
+    params = {"n_trials": n_trials, "n_arms": n_arms}
+    elapsed = _best_of(lambda: _make(name, n_arms, seed).experiment(n_trials), repeats)
+
+    bandit = _make(name, n_arms, seed)
+    tracemalloc.start()
+    results = bandit.experiment(n_trials)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report_calls = 1000
+    report_time = _best_of(lambda: [bandit.report() for _ in range(report_calls)], repeats)
+    return [
+        {"name": f"{name}.experiment", "params": params, "value": n_trials / elapsed, "unit": "trials/s"},
+        {"name": f"{name}.results_memory", "params": params,
+         "value": int(results.memory_usage(deep=True).sum()), "unit": "bytes"},
+        {"name": f"{name}.experiment_peak_memory", "params": params, "value": int(peak), "unit": "bytes"},
+        {"name": f"{name}.report", "params": params, "value": report_time / report_calls * 1e6, "unit": "us/call"},
+    ]
+
+
+def run_suite(trial_counts=(1000, 10000, 100000), arm_counts=(4, 100, 1000), quick=False):
+    """
+    Run every benchmark for both algorithms.
+
+    Args:
+        trial_counts (Sequence[int]): n_trials values for the experiment() benchmarks.
+        arm_counts (Sequence[int]): Arm counts for the experiment() benchmarks.
+        quick (bool): Use fewer calls and repeats, for smoke runs.
+
+    Returns:
+        dict: {"meta": {...}, "results": [...]}.
+    """
+    for module in ("epsilon_greedy_algorithm", "thompson_sampling_algorithm"):
+        logger.disable(module)
+    repeats = 1 if quick else 3
+    results = []
+    for name in BANDITS:
+        results += bench_calls(name, n_calls=2000 if quick else 20000, repeats=repeats)
+        for n_trials in trial_counts:
+            for n_arms in arm_counts:
+                results += bench_experiment(name, n_trials, n_arms, repeats=repeats)
+                logger.info(f"{name}: {n_trials} trials x {n_arms} arms done")
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def _key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Compare two result sets and flag regressions.
+
+    Args:
+        current (dict): Output of run_suite().
+        baseline (dict): Earlier output of run_suite().
+        threshold (float): Relative change that counts as a regression.
+
+    Returns:
+        pd.DataFrame: One row per metric present in both, with the relative change
+        (positive means worse) and a 'regressed' flag.
+    """
+    previous = {_key(result): result["value"] for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = _key(result)
+        if key not in previous or previous[key] == 0:
+            continue
+        change = (result["value"] - previous[key]) / previous[key]
+        worse = -change if HIGHER_IS_BETTER[result["unit"]] else change
+        rows.append({"name": result["name"], "params": key[1], "unit": result["unit"],
+                     "baseline": previous[key], "current": result["value"],
+                     "change": worse, "regressed": worse > threshold})
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the bandit hot paths.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--trials", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--arms", type=int, nargs="+", default=[4, 100, 1000])
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    suite = run_suite(args.trials, args.arms, args.quick)
+    with open(args.output, "w") as handle:
+        json.dump(suite, handle, indent=2)
+    logger.success(f"Wrote {len(suite['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            comparison = compare(suite, json.load(handle), args.threshold)
+        logger.info(f"Comparison with {args.baseline}:\n{comparison.to_string(index=False)}")
+        regressions = comparison[comparison["regressed"]]
+        if len(regressions):
+            logger.error(f"{len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Thompson Sampling Scalability Benchmark
+Compares decisions per second of the dense ThompsonSampling (one Beta draw per arm)
+with LazyThompsonSampling (one draw per posterior group) for K from 10 to 10^6.
+
+It also checks, for a fixed posterior state, that both pick arms with the same
+distribution by reporting the total variation distance of their selection frequencies.
+"""
+
+
+import argparse
+import time
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from lazy_thompson_sampling import LazyThompsonSampling
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+def decisions_per_second(bandit_class, n_arms, n_trials, seed=0):
+    """
+    Time n_trials pull/update steps of a fresh bandit.
+
+    Args:
+        bandit_class (type): ThompsonSampling or LazyThompsonSampling.
+        n_arms (int): Number of arms (true means drawn uniformly from [0, 1)).
+        n_trials (int): Number of decisions to time.
+        seed (int, optional): Seed for the arm means and the run.
+
+    Returns:
+        float: Decisions per second.
+    """
+    means = np.random.RandomState(seed).rand(n_arms)
+    bandit = bandit_class(means, rng=np.random.RandomState(seed + 1))
+    start = time.perf_counter()
+    for _ in range(n_trials):
+        arm, reward = bandit.pull()
+        bandit.update(arm, reward)
+    return n_trials / (time.perf_counter() - start)
+
+
+def selection_distance(n_arms=8, n_warmup=200, n_draws=50000, seed=0):
+    """
+    Total variation distance between dense and lazy selection frequencies.
+
+    Both samplers are evaluated on the same posterior state, reached by a short
+    warm-up run, so the distance should only reflect Monte Carlo noise.
+
+    Args:
+        n_arms (int, optional): Number of arms.
+        n_warmup (int, optional): Trials used to move the posteriors away from the prior.
+        n_draws (int, optional): Selections drawn from each sampler.
+        seed (int, optional): Seed for the warm-up and the draws.
+
+    Returns:
+        float: Total variation distance between the two empirical distributions.
+    """
+    lazy = LazyThompsonSampling(np.linspace(-0.5, 0.5, n_arms), rng=np.random.RandomState(seed))
+    for _ in range(n_warmup):
+        lazy.update(*lazy.pull())
+    lazy_counts = np.bincount([lazy.pull()[0] for _ in range(n_draws)], minlength=n_arms)
+    dense = np.random.RandomState(seed + 1).beta(lazy.posterior_a, lazy.posterior_b, size=(n_draws, n_arms))
+    dense_counts = np.bincount(np.argmax(dense, axis=1), minlength=n_arms)
+    return 0.5 * np.abs(lazy_counts - dense_counts).sum() / n_draws
+
+
+def benchmark(arm_counts=(10, 100, 1000, 10000, 100000, 1000000), n_trials=2000, seed=0):
+    """
+    Measure decisions per second against the number of arms.
+
+    The dense sampler gets fewer decisions for large K so every run stays short.
+
+    Args:
+        arm_counts (Sequence[int]): Arm counts to benchmark.
+        n_trials (int): Decisions per lazy run (and upper bound for dense runs).
+        seed (int): Seed shared by both samplers.
+
+    Returns:
+        pd.DataFrame: Decisions per second of both samplers and the speedup.
+    """
+    logger.disable("thompson_sampling_algorithm")
+    rows = []
+    for n_arms in arm_counts:
+        dense = decisions_per_second(ThompsonSampling, n_arms, max(20, min(n_trials, 10**7 // n_arms)), seed)
+        lazy = decisions_per_second(LazyThompsonSampling, n_arms, n_trials, seed)
+        rows.append({"n_arms": n_arms, "dense_decisions_per_sec": dense,
+                     "lazy_decisions_per_sec": lazy, "speedup": lazy / dense})
+        logger.info(f"{n_arms} arms: dense {dense:,.0f}/s, lazy {lazy:,.0f}/s")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dense vs lazy Thompson Sampling.")
+    parser.add_argument("--arms", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000, 1000000])
+    parser.add_argument("--trials", type=int, default=2000)
+    args = parser.parse_args()
+    logger.info(f"Thompson Sampling benchmark:\n{benchmark(args.arms, args.trials).to_string(index=False)}")
+    logger.info(f"Selection total variation distance (dense vs lazy): {selection_distance():.4f}")
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Checkpoint and Resume for Long-Running Bandit Experiments
+
+A checkpoint directory holds two append-only trial-log files (arms.bin, rewards.bin)
+and one small state.npz with the bandit's arrays, the NumPy RNG state, the running
+totals and the trial-log position. Every save appends only the trials logged since
+the previous save and then atomically replaces state.npz, so the cost of a checkpoint
+does not grow with the length of the run. On resume the log files are cut back to
+the saved position, which also discards trials written by a save that crashed
+before its state file was replaced.
+
+When the run streams into a ResultSink, the sink already holds the trial log: a save
+flushes the buffered trials into it and records its row count and segments in
+state.npz instead of writing arms.bin and rewards.bin, together with the per-arm totals
+of the flushed trials. On resume the sink, reopened with append=True, is cut back to
+the recorded rows in the same way, and the run keeps appending to it.
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+from loguru import logger
+
+
+class Checkpointer:
+    """
+    Periodic, incremental checkpoints of a bandit experiment.
+
+    Class Attributes:
+        directory(str): Folder the checkpoint files are written to.
+
+        every(int): Number of trials between two checkpoints.
+
+        durable(bool): Whether every save is fsync'ed to disk.
+
+        saved_position(int): Number of trials already persisted in the log files.
+    """
+
+    def __init__(self, directory, every=1_000_000, durable=True):
+        """
+        Prepare a checkpoint directory.
+
+        Args:
+            directory (str): Folder for the checkpoint files, created if missing.
+            every (int, optional): Trials between checkpoints. Defaults to 1,000,000.
+            durable (bool, optional): fsync files on every save. Defaults to True.
+        """
+        self.directory = directory
+        self.every = int(every)
+        self.durable = durable
+        self.saved_position = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return f"Checkpointer({self.directory!r}, every={self.every}, saved={self.saved_position})"
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _append(self, name, values):
+        with open(self._path(name), "ab") as handle:
+            handle.write(values.tobytes())
+            if self.durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def begin(self, bandit):
+        """
+        Start a fresh run: drop any previous trial log and save the initial state.
+
+        Args:
+            bandit (Bandit): Bandit whose experiment is starting.
+        """
+        for name in ("arms.bin", "rewards.bin"):
+            open(self._path(name), "wb").close()
+        self.saved_position = 0
+        self.save(bandit)
+
+    def save(self, bandit):
+        """
+        Append the new part of the trial log and atomically replace the state file.
+
+        Args:
+            bandit (Bandit): Bandit to checkpoint.
+        """
+        position = bandit.trials_logged
+        sink = bandit._sink
+        streamed = {}
+        if sink is None:
+            self._append("arms.bin", bandit._arm_log[self.saved_position:position])
+            self._append("rewards.bin", bandit._reward_log[self.saved_position:position])
+        else:
+            bandit._flush_log()
+            if self.durable:
+                sink.sync()
+            streamed = {"sink_rows": sink.rows, "arm_counts": bandit._arm_counts, "arm_sums": bandit._arm_sums,
+                        "sink_manifest": json.dumps({"categories": sink.categories, "segments": sink.segments})}
+
+        rng_name, rng_key, rng_pos, has_gauss, cached_gaussian = bandit.rng.get_state()
+        fields = {f"field_{name}": np.asarray(getattr(bandit, name)) for name in bandit.checkpoint_fields}
+        temporary = self._path("state.tmp.npz")
+        with open(temporary, "wb") as handle:
+            np.savez(handle, algorithm=type(bandit).__name__, position=position,
+                     arm_dtype=bandit._arm_log.dtype.str, n_arms=len(bandit._arm_regrets),
+                     total_reward=bandit.total_reward, total_regret=bandit.total_regret,
+                     rng_name=rng_name, rng_key=rng_key, rng_pos=rng_pos,
+                     rng_has_gauss=has_gauss, rng_cached_gaussian=cached_gaussian, **streamed, **fields)
+            if self.durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(temporary, self._path("state.npz"))
+        self.saved_position = position
+        logger.debug(f"Checkpoint saved at trial {position}")
+
+    def restore(self, bandit):
+        """
+        Load the last checkpoint into a freshly constructed bandit.
+
+        The bandit's trial buffers must already be allocated (experiment() does this),
+        they are refilled from the log files and grown if needed. A run that streamed into
+        a sink must be resumed into the same store, opened with ResultSink(..., append=True).
+
+        Args:
+            bandit (Bandit): Bandit of the same class and arm count as the checkpointed one.
+
+        Returns:
+            bool: False when the directory holds no checkpoint yet.
+        """
+        if not os.path.exists(self._path("state.npz")):
+            return False
+        with np.load(self._path("state.npz")) as state:
+            if str(state["algorithm"]) != type(bandit).__name__ or int(state["n_arms"]) != len(bandit._arm_regrets):
+                raise ValueError(f"Checkpoint in {self.directory} was written by {state['algorithm']} "
+                                 f"with {int(state['n_arms'])} arms, not {bandit!r}")
+            position = int(state["position"])
+            streamed = "sink_rows" in state
+            if streamed != (bandit._sink is not None):
+                raise ValueError(f"Checkpoint in {self.directory} was written "
+                                 f"{'with' if streamed else 'without'} a result sink; resume it the same way")
+            if streamed:
+                sink_manifest = json.loads(str(state["sink_manifest"]))
+                bandit._sink.truncate(int(state["sink_rows"]), sink_manifest["categories"], sink_manifest["segments"])
+                bandit._arm_counts = state["arm_counts"].copy()
+                bandit._arm_sums = state["arm_sums"].copy()
+            for name in bandit.checkpoint_fields:
+                value = state[f"field_{name}"]
+                setattr(bandit, name, value.item() if value.ndim == 0 else value.copy())
+            bandit.rng.set_state((str(state["rng_name"]), state["rng_key"], int(state["rng_pos"]),
+                                  int(state["rng_has_gauss"]), float(state["rng_cached_gaussian"])))
+            bandit.total_reward = state["total_reward"].item()
+            bandit.total_regret = state["total_regret"].item()
+            arm_dtype = np.dtype(str(state["arm_dtype"]))
+
+        self.saved_position = position
+        if streamed:
+            bandit._log_offset = position
+            bandit._log_pos = bandit._tally_pos = 0
+            bandit._restored()
+            logger.info(f"Resumed {type(bandit).__name__} from trial {position} into {bandit._sink!r}")
+            return True
+
+        arms = np.fromfile(self._path("arms.bin"), dtype=arm_dtype, count=position)
+        rewards = np.fromfile(self._path("rewards.bin"), dtype=np.float32, count=position)
+        if len(arms) < position or len(rewards) < position:
+            raise ValueError(f"Trial log in {self.directory} is shorter than the saved position {position}")
+        for name, values in (("arms.bin", arms), ("rewards.bin", rewards)):
+            with open(self._path(name), "r+b") as handle:
+                handle.truncate(values.nbytes)
+
+        while len(bandit._arm_log) < position:
+            bandit._grow_log()
+        bandit._arm_log[:position] = arms
+        bandit._reward_log[:position] = rewards
+        bandit._log_pos = position
+        bandit._restored()
+        logger.info(f"Resumed {type(bandit).__name__} from trial {position}")
+        return True
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Downsampling Helpers for Plotting Long Bandit Runs
+
+A plot is only as wide as its pixel grid, so long reward/regret curves are reduced
+to roughly one min/max pair per pixel column (which keeps every spike and the full
+envelope of the curve) or to n points with Largest-Triangle-Three-Buckets.
+CurveAccumulator computes the rolling-mean and cumulative curves chunk by chunk and
+keeps only the per-bin extrema, so runs that do not fit in memory can be plotted.
+"""
+
+
+import numpy as np
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean over a fixed window using one cumulative sum.
+
+    Args:
+        values (np.ndarray): Input series.
+        window (int): Window length.
+
+    Returns:
+        np.ndarray: Mean of values[i - window + 1:i + 1] for i >= window - 1.
+    """
+    sums = np.cumsum(np.asarray(values, dtype=float))
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+
+def _bin_extrema(values, bin_ids):
+    """Return the bins present in values and their minimum and maximum."""
+    starts = np.flatnonzero(np.r_[True, bin_ids[1:] != bin_ids[:-1]])
+    return bin_ids[starts], np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts), starts
+
+
+def _interleave(x, minima, maxima):
+    """Turn per-bin extrema into a polyline that draws each bin as a vertical stroke."""
+    return np.repeat(x, 2), np.column_stack([minima, maxima]).ravel()
+
+
+def minmax_decimate(y, n_bins, x=None):
+    """
+    Keep the minimum and maximum of each of n_bins equally sized bins.
+
+    Args:
+        y (np.ndarray): Series to reduce.
+        n_bins (int): Number of bins, typically the plot width in pixels.
+        x (np.ndarray, optional): x values of the series, default 0..len(y)-1.
+
+    Returns:
+        tuple: (x, y) with at most 2 * n_bins points.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    if len(y) <= 2 * n_bins:
+        return x, y
+    _, minima, maxima, starts = _bin_extrema(y, np.arange(len(y)) * n_bins // len(y))
+    return _interleave(x[starts], minima, maxima)
+
+
+def lttb(y, n_out, x=None):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        y (np.ndarray): Series to reduce.
+        n_out (int): Number of points to keep (at least 3).
+        x (np.ndarray, optional): x values of the series, default 0..len(y)-1.
+
+    Returns:
+        tuple: (x, y) with n_out points, always including the first and last point.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.arange(len(y), dtype=float) if x is None else np.asarray(x, dtype=float)
+    if len(y) <= n_out or n_out < 3:
+        return x, y
+    edges = np.linspace(1, len(y) - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, len(y) - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else len(y)
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+class CurveAccumulator:
+    """
+    Incrementally builds downsampled learning and cumulative curves from chunks.
+
+    Class Attributes:
+        n_rows(int): Total number of trials that will be fed in.
+
+        n_bins(int): Number of bins (pixel columns) per curve.
+
+        window(int): Rolling window of the learning curve.
+
+        rows_seen(int): Trials consumed so far.
+    """
+
+    names = ("rolling_reward", "cumulative_reward", "cumulative_regret")
+
+    def __init__(self, n_rows, n_bins=1000, window=200):
+        """
+        Prepare empty per-bin extrema.
+
+        Args:
+            n_rows (int): Total number of trials of the run.
+            n_bins (int, optional): Bins per curve. Defaults to 1000.
+            window (int, optional): Rolling window of the learning curve. Defaults to 200.
+        """
+        self.n_rows = n_rows
+        self.n_bins = min(n_bins, max(n_rows, 1))
+        self.window = window
+        self.rows_seen = 0
+        self._tail = np.empty(0)
+        self._reward_total = 0.0
+        self._regret_total = 0.0
+        self._minima = {name: np.full(self.n_bins, np.inf) for name in self.names}
+        self._maxima = {name: np.full(self.n_bins, -np.inf) for name in self.names}
+
+    def _add(self, name, rows, values):
+        if len(values) == 0:
+            return
+        bins, minima, maxima, _ = _bin_extrema(values, rows * self.n_bins // self.n_rows)
+        np.minimum.at(self._minima[name], bins, minima)
+        np.maximum.at(self._maxima[name], bins, maxima)
+
+    def update(self, rewards, regrets):
+        """
+        Consume the next chunk of trials.
+
+        Args:
+            rewards (np.ndarray): Rewards of the chunk, in trial order.
+            regrets (np.ndarray): Regrets of the chunk, in trial order.
+        """
+        rewards = np.asarray(rewards, dtype=float)
+        rows = np.arange(self.rows_seen, self.rows_seen + len(rewards))
+
+        cumulative = self._reward_total + np.cumsum(rewards)
+        self._add("cumulative_reward", rows, cumulative)
+        cumulative_regret = self._regret_total + np.cumsum(np.asarray(regrets, dtype=float))
+        self._add("cumulative_regret", rows, cumulative_regret)
+
+        joined = np.concatenate([self._tail, rewards])
+        if len(joined) >= self.window:
+            rolling = rolling_mean(joined, self.window)
+            self._add("rolling_reward", rows[len(rows) - len(rolling):], rolling)
+        self._tail = joined[-(self.window - 1):] if self.window > 1 else np.empty(0)
+
+        if len(rewards):
+            self._reward_total = cumulative[-1]
+            self._regret_total = cumulative_regret[-1]
+        self.rows_seen += len(rewards)
+
+    def curve(self, name):
+        """
+        Return one downsampled curve as a min/max polyline.
+
+        Args:
+            name (str): One of 'rolling_reward', 'cumulative_reward', 'cumulative_regret'.
+
+        Returns:
+            tuple: (x, y) with trial numbers (1-based) on x.
+        """
+        filled = np.isfinite(self._minima[name])
+        x = np.ceil(np.flatnonzero(filled) * self.n_rows / self.n_bins) + 1
+        return _interleave(x, self._minima[name][filled], self._maxima[name][filled])
+
+
+# In[ ]:
+
+
+
+
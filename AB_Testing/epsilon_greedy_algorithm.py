@@ -10,13 +10,37 @@ Implements exploration-exploitation tradeoff with decaying epsilon.
 """
 
 
-import numpy as np
+import math
 
-import pandas as pd
+import numpy as np
 
 from loguru import logger
 
 from Bandit import Bandit
+from tournament_tree import TournamentTree
+
+
+EPSILON_SCHEDULES = {
+    "inverse": lambda epsilon_start, t: epsilon_start / t,
+    "inverse_sqrt": lambda epsilon_start, t: epsilon_start / math.sqrt(t),
+    "exponential": lambda epsilon_start, t: epsilon_start * 0.999 ** (t - 1),
+    "constant": lambda epsilon_start, t: epsilon_start,
+}
+
+
+def epsilon_schedule(epsilon_decay):
+    """
+    Look up an epsilon decay schedule by name.
+
+    Args:
+        epsilon_decay (str): Key of EPSILON_SCHEDULES.
+
+    Returns:
+        callable: schedule(epsilon_start, t) giving the exploration rate of trial t.
+    """
+    if epsilon_decay not in EPSILON_SCHEDULES:
+        raise ValueError(f"Unknown epsilon_decay {epsilon_decay!r}, expected one of {sorted(EPSILON_SCHEDULES)}")
+    return EPSILON_SCHEDULES[epsilon_decay]
 
 
 class EpsilonGreedy(Bandit):
@@ -31,34 +55,64 @@ class EpsilonGreedy(Bandit):
         
         epsilon(float): Exploration rate (updated over time).
         
+        epsilon_start(float): Exploration rate the decay schedule starts from.
+        
+        epsilon_decay(str): Name of the schedule in EPSILON_SCHEDULES.
+        
+        rng(np.random.RandomState): Source of randomness (the global NumPy state by default).
+        
+        best_arm_index(TournamentTree | None): Incremental argmax over the estimates, used for large arm counts.
+        
         pulls(np.ndarray): Number of times each arm was pulled.
         
         estimates(np.ndarray): Estimated reward means per arm.
         
-        rewards(list): List of obtained rewards.
+        rewards(np.ndarray): View of the obtained rewards (float32 trial buffer).
         
-        chosen_arms(list): List of arm indices chosen per trial.
+        chosen_arms(np.ndarray): View of the arm indices chosen per trial (int16 trial buffer).
     """
 
-    def __init__(self, true_means, epsilon_start=1.0):
+    algorithm = "Epsilon-Greedy"
+    index_threshold = 10000
+    checkpoint_fields = ("pulls", "estimates", "epsilon")
+
+    def __init__(self, true_means, epsilon_start=1.0, epsilon_decay="inverse", rng=None, indexed=None):
         """
         Initializing the algorithm.
 
         Args:
             true_means (Sequence[float]): The real average reward values for each arm.
             epsilon_start (float, optional): Starting exploration probability and setting default to 1.0.
+            epsilon_decay (str, optional): Decay schedule from EPSILON_SCHEDULES, default "inverse" (epsilon_start / t).
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+            indexed (bool, optional): Keep a tournament tree so exploitation is O(1) instead of an O(K) argmax.
+                By default it is enabled once the arm count reaches index_threshold.
         """
+        self._schedule = epsilon_schedule(epsilon_decay)
         self.true_means = np.array(true_means)
         self.n_arms = len(true_means)
         self.epsilon = epsilon_start
+        self.epsilon_start = epsilon_start
+        self.epsilon_decay = epsilon_decay
+        self.rng = np.random if rng is None else rng
         self.pulls = np.zeros(self.n_arms)
         self.estimates = np.zeros(self.n_arms)
-        self.rewards = []
-        self.chosen_arms = []
+        if indexed is None:
+            indexed = self.n_arms >= self.index_threshold
+        self.best_arm_index = TournamentTree(self.estimates) if indexed else None
+        self._reset_log(0, np.max(self.true_means) - self.true_means)
 
     def __repr__(self):
         return f"<EpsilonGreedy Agent | epsilon={self.epsilon:.3f}, arms={self.n_arms}>"
 
+    @property
+    def rewards(self):
+        return self.logged_rewards
+
+    @property
+    def chosen_arms(self):
+        return self.logged_arms
+
     def select_arm(self):
         """
         Decide which arm to pull based on epsilon-greedy logic.
@@ -66,13 +120,24 @@ class EpsilonGreedy(Bandit):
         Returns:
             int: Index of chosen arm.
         """
-        explore = np.random.rand() < self.epsilon
+        explore = self.rng.rand() < self.epsilon
         if explore:
-            arm_index = np.random.randint(self.n_arms)
+            arm_index = self.rng.randint(self.n_arms)
         else:
-            arm_index = np.argmax(self.estimates)
+            arm_index = self.best_arm()
         return arm_index
 
+    def best_arm(self):
+        """
+        Return the arm with the highest estimate, in O(1) when the best-arm index is kept.
+
+        Returns:
+            int: Index of the greedy arm.
+        """
+        if self.best_arm_index is not None:
+            return self.best_arm_index.argmax()
+        return int(np.argmax(self.estimates))
+
     def pull(self):
         """
         Pull a selected arm and observe reward.
@@ -81,7 +146,7 @@ class EpsilonGreedy(Bandit):
             tuple: (chosen_arm, observed_reward)
         """
         arm = self.select_arm()
-        reward = np.random.normal(self.true_means[arm], 1)
+        reward = self.rng.normal(self.true_means[arm], 1)
         return arm, reward
 
     def update(self, arm, reward):
@@ -96,36 +161,73 @@ class EpsilonGreedy(Bandit):
         count = self.pulls[arm]
         current_estimate = self.estimates[arm]
         self.estimates[arm] = current_estimate + (reward - current_estimate) / count
+        if self.best_arm_index is not None:
+            self.best_arm_index.update(arm, float(self.estimates[arm]))
 
-    def experiment(self, n_trials=20000):
+    def refresh_index(self, arms=None):
+        """
+        Resynchronize the best-arm index after estimates were changed outside update().
+
+        Args:
+            arms (Sequence[int], optional): Arms whose estimates changed, default rebuilds the whole index.
+        """
+        if self.best_arm_index is None:
+            return
+        if arms is None:
+            self.best_arm_index = TournamentTree(self.estimates)
+        else:
+            for arm in arms:
+                self.best_arm_index.update(arm, float(self.estimates[arm]))
+
+    def posterior_samples(self, n_draws, rng):
+        """
+        Sample arm means from a normal approximation around the estimates.
+
+        Rewards have unit variance, so an arm pulled n times has standard error 1 / sqrt(n);
+        arms that were never pulled are treated as if pulled once.
+
+        Args:
+            n_draws (int): Number of joint samples.
+            rng (np.random.Generator): Source of the draws.
+
+        Returns:
+            np.ndarray: (n_draws, n_arms) sampled means.
+        """
+        scale = 1 / np.sqrt(np.maximum(self.pulls, 1))
+        return rng.normal(self.estimates, scale, size=(n_draws, self.n_arms))
+
+    def _restored(self):
+        self.refresh_index()
+
+    def _set_true_means(self, means):
+        super()._set_true_means(means)
+        self.true_means = np.array(means, dtype=float)
+
+    def _trial(self, t):
+        self.epsilon = self._schedule(self.epsilon_start, t)
+        arm, reward = self.pull()
+        self.update(arm, reward)
+        return arm, reward
+
+    def experiment(self, n_trials=20000, checkpoint=None, resume=False, sink=None, stopping=None):
         """
         Run the epsilon-greedy experiment.
 
         Args:
             n_trials (int): Number of iterations to perform.
+            checkpoint (Checkpointer, optional): Periodically saves the run so it can be resumed.
+            resume (bool, optional): Continue from the last checkpoint instead of starting over.
+            sink (ResultSink, optional): Stream the trial log to disk in fixed-size chunks.
+            stopping (StoppingRule, optional): End the run once the rule's criterion is met.
 
         Returns:
-            pd.DataFrame: Trial-by-trial record of arms, rewards, and regrets.
+            pd.DataFrame: Trial-by-trial record of arms, rewards, and regrets (None when streamed to a sink).
         """
         logger.info("Starting Epsilon-Greedy simulation")
 
-        best_true_mean = np.max(self.true_means)
-
-        for t in range(1, n_trials + 1):
-            self.epsilon = 1 / t
-            arm, reward = self.pull()
-            self.update(arm, reward)
-            self.rewards.append(reward)
-            self.chosen_arms.append(arm)
-
-        regrets = best_true_mean - np.array([self.true_means[a] for a in self.chosen_arms])
-        results = pd.DataFrame({
-            "Trial": np.arange(1, n_trials + 1),
-            "Arm": self.chosen_arms,
-            "Reward": self.rewards,
-            "Regret": regrets,
-            "Algorithm": "Epsilon-Greedy"
-        })
+        self._start_log(n_trials, np.max(self.true_means) - self.true_means, checkpoint, resume, sink)
+        self._run_trials(n_trials, checkpoint, stopping)
+        results = self._collect_results()
 
         logger.success("Epsilon-Greedy simulation complete.")
         return results
@@ -134,11 +236,9 @@ class EpsilonGreedy(Bandit):
         """
         Summarize and log the experimental performance.
         """
-        mean_reward = np.mean(self.rewards)
-        total_regret = np.sum(np.max(self.true_means) - np.array([self.true_means[a] for a in self.chosen_arms]))
-
-        logger.info(f"[Epsilon-Greedy] Average Reward: {mean_reward:.4f}")
-        logger.info(f"[Epsilon-Greedy] Total Regret: {total_regret:.4f}")
+        logger.info(f"[Epsilon-Greedy] Average Reward: {self.mean_reward:.4f}")
+        logger.info(f"[Epsilon-Greedy] Total Regret: {self.total_regret:.4f}")
+        self._log_stopping_decision()
 
 
 # In[ ]:
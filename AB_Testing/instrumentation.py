@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Opt-in Instrumentation for Bandit Experiments
+
+Attach an Instrumentation to a bandit before calling experiment() to find out where a
+run spends its time:
+
+    bandit.instrumentation = Instrumentation(progress_every=100_000, profiler=cProfile.Profile())
+    bandit.experiment(1_000_000)
+    bandit.instrumentation.report()
+
+Phases timed per run are 'setup' (buffer allocation and checkpoint restore), 'trials'
+(the whole trial loop), 'checkpoint' and 'results' (flushing to a sink or building the
+DataFrame, regret reconstruction included). With trial_timers enabled, the loop is
+further split into 'trial' (arm selection, RNG draws and the state update of one trial)
+and 'log' (trial-log appends). The profiler breaks 'trial' down further, into RNG calls,
+argmax, tournament-tree updates and so on. The bandit runs the same loop either way; an
+instrumentation only swaps in timed per-trial calls and shortens the segments so that
+progress is logged between them. Bandits without one only pay for a few attribute checks
+per experiment.
+"""
+
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+
+from loguru import logger
+
+
+class Instrumentation:
+    """
+    Collects phase timings, counters, progress logs and an optional profile of a run.
+
+    Class Attributes:
+        progress_every(int | None): Log trials-per-second every this many trials.
+
+        trial_timers(bool): Whether the trial and log calls are timed on every trial.
+
+        profiler(object | None): Profiler enabled around the trial loop, either with
+            enable()/disable() (cProfile.Profile) or start()/stop() (sampling profilers).
+
+        timings(dict): Seconds spent per phase.
+
+        calls(dict): Number of timed calls per phase.
+
+        counters(dict): Event counts (trials, checkpoints, sink flushes, runs).
+    """
+
+    def __init__(self, progress_every=None, trial_timers=True, profiler=None):
+        """
+        Configure what is measured.
+
+        Args:
+            progress_every (int, optional): Trials between progress logs. Defaults to no progress logs.
+            trial_timers (bool, optional): Time every trial and log call. Defaults to True;
+                turning it off leaves only the per-run phases and progress, at almost no cost.
+            profiler (object, optional): Profiler to run during the trial loop.
+        """
+        self.progress_every = progress_every
+        self.trial_timers = trial_timers
+        self.profiler = profiler
+        self.reset()
+
+    def __repr__(self):
+        return f"Instrumentation(trials={self.counters['trials']}, phases={sorted(self.timings)})"
+
+    def reset(self):
+        """Forget all timings and counters."""
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self._run = None
+
+    def add(self, name, seconds, calls=1):
+        """
+        Add time to a phase.
+
+        Args:
+            name (str): Phase name.
+            seconds (float): Elapsed time.
+            calls (int, optional): Number of calls the time covers.
+        """
+        self.timings[name] += seconds
+        self.calls[name] += calls
+
+    def count(self, name, n=1):
+        """Increase an event counter by n."""
+        self.counters[name] += n
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one call of the given phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name, function):
+        """
+        Wrap a callable so every call is added to a phase.
+
+        Args:
+            name (str): Phase name.
+            function (callable): Function or bound method to wrap.
+
+        Returns:
+            callable: Wrapper with the same signature.
+        """
+        clock = time.perf_counter
+        timings, calls = self.timings, self.calls
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[name] += clock() - start
+                calls[name] += 1
+
+        return wrapper
+
+    def trial_hooks(self, trial, log_trial):
+        """
+        Per-trial calls for the bandit's loop: timed wrappers with trial timers, else the calls themselves.
+
+        Args:
+            trial (callable): The bandit's _trial(t).
+            log_trial (callable): The bandit's _log_trial(arm, reward).
+
+        Returns:
+            tuple: (trial, log_trial) to call on every trial.
+        """
+        if not self.trial_timers:
+            return trial, log_trial
+        return self.timed("trial", trial), self.timed("log", log_trial)
+
+    @contextmanager
+    def loop(self, bandit, total):
+        """
+        Time and profile the trial loop of a bandit, and set up its progress logs.
+
+        Args:
+            bandit (Bandit): Bandit whose trials are run inside the block.
+            total (int): Trials the run will reach.
+        """
+        clock = time.perf_counter
+        started = clock()
+        first = bandit.trials_logged
+        self._run = {"algorithm": bandit.algorithm, "total": total, "started": started,
+                     "last_done": first, "last_time": started}
+        self.start_profiler()
+        try:
+            yield
+        finally:
+            self.stop_profiler()
+            self.add("trials", clock() - started)
+            self.count("trials", bandit.trials_logged - first)
+            self._run = None
+
+    def segment_done(self, done):
+        """
+        Record the end of a segment of trials inside loop(), logging progress every progress_every trials.
+
+        Args:
+            done (int): Trials logged so far.
+        """
+        run = self._run
+        if self.progress_every and done % self.progress_every == 0:
+            run["last_time"] = self.progress(run["algorithm"], done, run["total"], run["started"],
+                                             run["last_done"], run["last_time"])
+        run["last_done"] = done
+
+    def start_profiler(self):
+        """Enable the attached profiler, if any."""
+        if self.profiler is not None:
+            (getattr(self.profiler, "enable", None) or self.profiler.start)()
+
+    def stop_profiler(self):
+        """Disable the attached profiler, if any."""
+        if self.profiler is not None:
+            (getattr(self.profiler, "disable", None) or self.profiler.stop)()
+
+    def progress(self, algorithm, done, total, started, last_done, last_time):
+        """
+        Log the progress of a run.
+
+        Args:
+            algorithm (str): Name shown in the log line.
+            done (int): Trials completed so far.
+            total (int): Trials the run will reach.
+            started (float): perf_counter() value when the loop started.
+            last_done (int): Trials completed at the previous progress log.
+            last_time (float): perf_counter() value of the previous progress log.
+
+        Returns:
+            float: Current perf_counter() value, to pass as last_time next time.
+        """
+        now = time.perf_counter()
+        recent = (done - last_done) / max(now - last_time, 1e-12)
+        logger.info(f"[{algorithm}] {done:,}/{total:,} trials ({done / total:.0%}), "
+                    f"{recent:,.0f} trials/s, {now - started:.1f}s elapsed")
+        return now
+
+    def summary(self):
+        """
+        Tabulate the collected timings.
+
+        Returns:
+            pd.DataFrame: One row per phase with total seconds, calls, mean microseconds per call
+            and the share of the trial loop.
+        """
+        timings = dict(self.timings)
+        calls = dict(self.calls)
+        loop = timings.get("trials", 0.0)
+        rows = [{"phase": name, "seconds": seconds, "calls": calls[name],
+                 "mean_us": seconds / calls[name] * 1e6 if calls[name] else float("nan"),
+                 "share_of_trials": seconds / loop if loop else float("nan")}
+                for name, seconds in timings.items()]
+        return pd.DataFrame(rows).sort_values("seconds", ascending=False, ignore_index=True)
+
+    def report(self):
+        """Log the phase table and the counters through loguru."""
+        for row in self.summary().itertuples():
+            logger.info(f"[Instrumentation] {row.phase:<10} {row.seconds:9.4f}s  {row.calls:>10,} calls  "
+                        f"{row.mean_us:9.3f} us/call  {row.share_of_trials:6.1%} of trial loop")
+        for name, value in sorted(self.counters.items()):
+            logger.info(f"[Instrumentation] {name}: {value:,}")
+
+
+# In[ ]:
+
+
+
+
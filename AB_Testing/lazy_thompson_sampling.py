@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Lazy Thompson Sampling for Very Large Arm Sets
+Draws one value per group of arms with identical posteriors instead of one per arm.
+
+Arms whose Beta posteriors have the same (a, b) counts are exchangeable. The largest
+of m independent Beta(a, b) draws has CDF F(x)^m, so it can be sampled exactly with
+a single inverse-CDF draw at level U^(1/m). Picking the group with the largest
+maximum and then a uniformly random member of that group therefore selects every
+arm with exactly the same probability as sampling all K posteriors and taking the
+argmax, while only costing O(G) work for G distinct posteriors. With large catalogs
+most arms are still at the prior (or share a few small counts), so G << K.
+"""
+
+
+import numpy as np
+
+from scipy.special import betainccinv
+
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+class _ArmGroup:
+    """Growable int32 array of the arms that share one (a, b) posterior."""
+
+    __slots__ = ("arms", "size")
+
+    def __init__(self, capacity=8):
+        self.arms = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+
+
+class LazyThompsonSampling(ThompsonSampling):
+    """
+    Thompson Sampling that samples per posterior group rather than per arm.
+
+    Class Attributes:
+        posterior_a(np.ndarray): Alpha counts of the Beta posteriors (int32).
+
+        posterior_b(np.ndarray): Beta counts of the Beta posteriors (int32).
+
+        groups(dict): Maps each distinct (a, b) pair to the arms currently holding it.
+    """
+
+    checkpoint_fields = ("posterior_a", "posterior_b", "group_layout")
+
+    def __init__(self, arm_means, rng=None):
+        """
+        Initialize the bandit with every arm in a single Beta(1, 1) group.
+
+        Args:
+            arm_means (Sequence[float]): Real mean reward for each arm.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+        """
+        super().__init__(arm_means, rng=rng)
+        self.posterior_a = np.ones(self.num_arms, dtype=np.int32)
+        self.posterior_b = np.ones(self.num_arms, dtype=np.int32)
+        self._rebuild_groups()
+
+    def __repr__(self):
+        return f"LazyThompsonSampling(num_arms={self.num_arms}, groups={len(self.groups)})"
+
+    @property
+    def group_layout(self):
+        """
+        np.ndarray: Groups flattened as [a, b, size, *members] in iteration order.
+
+        Restoring the exact layout (rather than regrouping) keeps resumed runs
+        bit-for-bit identical, since both the group order and the member order
+        decide which arm a given random draw selects.
+        """
+        parts = [np.array([a, b, group.size], dtype=np.int32)
+                 for (a, b), group in self.groups.items()]
+        members = [group.arms[:group.size] for group in self.groups.values()]
+        return np.concatenate([piece for pair in zip(parts, members) for piece in pair])
+
+    @group_layout.setter
+    def group_layout(self, layout):
+        self.groups = {}
+        self._slot = np.empty(self.num_arms, dtype=np.int32)
+        offset = 0
+        while offset < len(layout):
+            a, b, size = (int(v) for v in layout[offset:offset + 3])
+            group = self.groups[(a, b)] = _ArmGroup(size)
+            group.arms[:] = layout[offset + 3:offset + 3 + size]
+            group.size = size
+            self._slot[group.arms] = np.arange(size)
+            offset += 3 + size
+
+    def _rebuild_groups(self):
+        """Regroup all arms by their current (a, b) counts."""
+        pairs = np.stack([self.posterior_a, self.posterior_b], axis=1)
+        keys, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        members = np.argsort(inverse, kind="stable").astype(np.int32)
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+        self.groups = {}
+        self._slot = np.empty(self.num_arms, dtype=np.int32)
+        for key, arms in zip(map(tuple, keys.tolist()), np.split(members, bounds)):
+            group = self.groups[key] = _ArmGroup(len(arms))
+            group.arms[:] = arms
+            group.size = len(arms)
+            self._slot[arms] = np.arange(len(arms))
+
+    def refresh_index(self):
+        """Regroup the arms after the posterior counts were changed outside update()."""
+        self._rebuild_groups()
+
+    def _add(self, arm, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = _ArmGroup()
+        if group.size == len(group.arms):
+            group.arms = np.concatenate([group.arms, np.empty(len(group.arms), dtype=np.int32)])
+        group.arms[group.size] = arm
+        self._slot[arm] = group.size
+        group.size += 1
+
+    def _remove(self, arm, key):
+        group = self.groups[key]
+        slot = self._slot[arm]
+        last = group.arms[group.size - 1]
+        group.arms[slot] = last
+        self._slot[last] = slot
+        group.size -= 1
+        if group.size == 0:
+            del self.groups[key]
+
+    def pull(self):
+        """
+        Select an arm by sampling the maximum of each posterior group.
+
+        Returns:
+            tuple: (selected arm index, simulated reward)
+        """
+        keys = list(self.groups)
+        params = np.array(keys, dtype=float)
+        sizes = np.fromiter((group.size for group in self.groups.values()), dtype=float, count=len(keys))
+        tail = -np.expm1(np.log(self.rng.rand(len(keys))) / sizes)
+        group_max = betainccinv(params[:, 0], params[:, 1], tail)
+        group = self.groups[keys[np.argmax(group_max)]]
+        selected = int(group.arms[self.rng.randint(group.size)])
+        reward = self.rng.normal(self.arm_means[selected], 1)
+        return selected, reward
+
+    def update(self, arm_index, reward):
+        """
+        Update the posterior counts and move the arm to its new group.
+
+        Args:
+            arm_index (int): Index of the arm pulled.
+            reward (float): Observed reward from the arm.
+        """
+        old_key = (int(self.posterior_a[arm_index]), int(self.posterior_b[arm_index]))
+        super().update(arm_index, reward)
+        self._remove(arm_index, old_key)
+        self._add(arm_index, (int(self.posterior_a[arm_index]), int(self.posterior_b[arm_index])))
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,514 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Non-Stationary Bandit Variants
+Sliding-window and exponentially discounted versions of Epsilon-Greedy and Thompson Sampling.
+
+Sliding-window variants keep the last `window` (arm, reward) pairs in a ring buffer
+next to per-arm sufficient statistics; every update adds the new trial and removes
+the one falling out of the window, so it costs O(1) and the state never grows.
+
+Discounted variants weight a trial that is s steps old by gamma^s. Instead of
+multiplying every arm's statistics by gamma on each step, new observations are added
+with weight scale = gamma^-t and the statistics are read back divided by scale. Only
+when scale gets large are all statistics renormalized, an O(K) step that happens once
+every ~230 / -log(gamma) trials.
+
+All four classes plug into experiment(), report(), checkpoints and stopping rules like
+their stationary parents. The trial log returned by experiment() still records every
+trial; stream it to a ResultSink when runs are long.
+
+DriftingEnvironment supplies the drift they are built for. Attach one to any bandit to
+change its true means at fixed trials, either to explicit piecewise-constant segments or
+along a random walk:
+
+    bandit.environment = DriftingEnvironment.random_walk(bandit.true_means, n_trials=200_000)
+    results = bandit.experiment(200_000)
+"""
+
+
+import numpy as np
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EpsilonGreedy
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+# Largest lazy scale before the discounted statistics are renormalized.
+MAX_SCALE = 1e100
+
+
+class DriftingEnvironment:
+    """
+    Piecewise-constant schedule of true arm means that a bandit is run against.
+
+    Trial t is played against the means of the last segment starting at or before t. The
+    bandit's means and per-arm regrets are only replaced when a trial crosses into another
+    segment, so pull() and the running total_regret follow the schedule at the cost of one
+    comparison per trial. The Regret column of the results is looked up per trial from the
+    segment it was played in. The means of the last segment played stay on the bandit after
+    the run.
+
+    Class Attributes:
+        starts(np.ndarray): First trial of each segment, beginning with trial 1.
+
+        means(np.ndarray): (n_segments, n_arms) true means of each segment.
+
+        regrets(np.ndarray): (n_segments, n_arms) regret of pulling each arm in each segment.
+    """
+
+    def __init__(self, starts, means):
+        """
+        Build the schedule from explicit segments.
+
+        Args:
+            starts (Sequence[int]): Increasing first trial of each segment, the first one must be 1.
+            means (Sequence[Sequence[float]]): True arm means of each segment, one row per start.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        means = np.asarray(means, dtype=float)
+        if means.ndim != 2 or len(means) != len(starts):
+            raise ValueError(f"Expected one row of arm means per segment start, got {means.shape} "
+                             f"for {len(starts)} starts")
+        if starts[0] != 1 or np.any(np.diff(starts) <= 0):
+            raise ValueError(f"Segment starts must increase from trial 1, got {starts.tolist()}")
+        self.starts = starts
+        self.means = means
+        self.regrets = means.max(axis=1, keepdims=True) - means
+
+    def __repr__(self):
+        return f"DriftingEnvironment(segments={len(self.starts)}, arms={self.means.shape[1]})"
+
+    @classmethod
+    def random_walk(cls, true_means, n_trials, every=1000, step=0.05, rng=None):
+        """
+        Means that take an independent Gaussian step per arm every `every` trials.
+
+        Args:
+            true_means (Sequence[float]): Arm means of the first segment.
+            n_trials (int): Number of trials the schedule covers; later trials keep the last means.
+            every (int, optional): Length of each segment. Defaults to 1000.
+            step (float, optional): Standard deviation of each step. Defaults to 0.05.
+            rng (np.random.Generator, optional): Source of the steps, a fresh default_rng() if omitted.
+
+        Returns:
+            DriftingEnvironment: The drifting schedule.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        starts = np.arange(1, n_trials + 1, every)
+        steps = rng.normal(0, step, size=(len(starts), len(true_means)))
+        steps[0] = 0
+        return cls(starts, np.asarray(true_means, dtype=float) + np.cumsum(steps, axis=0))
+
+    def segment(self, t):
+        """
+        Index of the segment trial t is played in.
+
+        Args:
+            t (int): Trial number, starting from 1.
+
+        Returns:
+            int: Row of starts and means.
+        """
+        return int(np.searchsorted(self.starts, t, side="right")) - 1
+
+    def trial_hook(self, bandit, trial):
+        """
+        Wrap a bandit's _trial(t) so that every trial is played against its segment's means.
+
+        The wrapper looks the segment up on its first call, so resumed and repeated runs
+        start from the right means.
+
+        Args:
+            bandit (Bandit): The bandit the trials belong to.
+            trial (callable): The bandit's _trial(t).
+
+        Returns:
+            callable: The wrapped trial(t).
+        """
+        starts = self.starts
+        start = stop = 0
+
+        def drifting_trial(t):
+            nonlocal start, stop
+            if not start <= t < stop:
+                index = self.segment(t)
+                bandit._set_true_means(self.means[index])
+                start = starts[index]
+                stop = starts[index + 1] if index + 1 < len(starts) else np.inf
+            return trial(t)
+
+        return drifting_trial
+
+    def trial_regrets(self, arms, first_trial):
+        """
+        Regret of consecutive logged trials under the means of their segments.
+
+        Args:
+            arms (np.ndarray): Arms pulled in consecutive trials.
+            first_trial (int): Trial number of arms[0].
+
+        Returns:
+            np.ndarray: One regret per trial.
+        """
+        trials = np.arange(first_trial, first_trial + len(arms))
+        return self.regrets[np.searchsorted(self.starts, trials, side="right") - 1, arms]
+
+
+class SlidingWindowEpsilonGreedy(EpsilonGreedy):
+    """
+    Epsilon-Greedy whose estimates only use the last `window` trials.
+
+    Class Attributes:
+        window(int): Number of most recent trials the estimates are based on.
+
+        pulls(np.ndarray): Pulls of each arm inside the window.
+
+        reward_sums(np.ndarray): Sum of the rewards of each arm inside the window.
+
+        window_arms(np.ndarray): Ring buffer of the arms of the last trials.
+
+        window_rewards(np.ndarray): Ring buffer of the rewards of the last trials.
+
+        window_updates(int): Number of updates so far, the next slot is window_updates % window.
+    """
+
+    algorithm = "Sliding-Window Epsilon-Greedy"
+    checkpoint_fields = EpsilonGreedy.checkpoint_fields + (
+        "reward_sums", "window_arms", "window_rewards", "window_updates")
+
+    def __init__(self, true_means, window=1000, epsilon_start=0.1, epsilon_decay="constant", rng=None,
+                 indexed=None):
+        """
+        Initializing the algorithm.
+
+        Args:
+            true_means (Sequence[float]): The real average reward values for each arm.
+            window (int, optional): Number of recent trials to learn from. Defaults to 1000.
+            epsilon_start (float, optional): Exploration probability. Defaults to 0.1.
+            epsilon_decay (str, optional): Schedule from EPSILON_SCHEDULES, "constant" by default since
+                a drifting environment has to be explored for as long as it runs.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+            indexed (bool, optional): Keep a tournament tree over the estimates, see EpsilonGreedy.
+        """
+        super().__init__(true_means, epsilon_start, epsilon_decay, rng, indexed)
+        self.window = int(window)
+        self.reward_sums = np.zeros(self.n_arms)
+        self.window_arms = np.zeros(self.window, dtype=np.int32)
+        self.window_rewards = np.zeros(self.window)
+        self.window_updates = 0
+
+    def __repr__(self):
+        return f"<SlidingWindowEpsilonGreedy Agent | window={self.window}, epsilon={self.epsilon:.3f}, arms={self.n_arms}>"
+
+    def _set_estimate(self, arm):
+        count = self.pulls[arm]
+        if count == 0:
+            self.reward_sums[arm] = 0.0
+        self.estimates[arm] = self.reward_sums[arm] / count if count else 0.0
+        if self.best_arm_index is not None:
+            self.best_arm_index.update(arm, float(self.estimates[arm]))
+
+    def update(self, arm, reward):
+        """
+        Add the new trial to the window and drop the oldest one, in O(1).
+
+        Args:
+            arm (int): Arm index that was pulled.
+            reward (float): Reward obtained.
+        """
+        slot = self.window_updates % self.window
+        if self.window_updates >= self.window:
+            old = self.window_arms[slot]
+            self.pulls[old] -= 1
+            self.reward_sums[old] -= self.window_rewards[slot]
+            self._set_estimate(old)
+        self.window_arms[slot] = arm
+        self.window_rewards[slot] = reward
+        self.window_updates += 1
+        self.pulls[arm] += 1
+        self.reward_sums[arm] += reward
+        self._set_estimate(arm)
+
+    def report(self):
+        """
+        Summarize and log the experimental performance.
+        """
+        super().report()
+        logger.info(f"[{self.algorithm}] Window: {self.window} trials, "
+                    f"{int(np.count_nonzero(self.pulls))} arms pulled inside it")
+
+
+class DiscountedEpsilonGreedy(EpsilonGreedy):
+    """
+    Epsilon-Greedy with exponentially discounted reward estimates.
+
+    Class Attributes:
+        gamma(float): Discount factor applied per trial.
+
+        weights(np.ndarray): Discounted pull counts, multiplied by scale.
+
+        weighted_sums(np.ndarray): Discounted reward sums, multiplied by scale.
+
+        scale(float): Lazy discount scale, gamma^-t since the last renormalization.
+    """
+
+    algorithm = "Discounted Epsilon-Greedy"
+    checkpoint_fields = EpsilonGreedy.checkpoint_fields + ("weights", "weighted_sums", "scale")
+
+    def __init__(self, true_means, gamma=0.999, epsilon_start=0.1, epsilon_decay="constant", rng=None,
+                 indexed=None):
+        """
+        Initializing the algorithm.
+
+        Args:
+            true_means (Sequence[float]): The real average reward values for each arm.
+            gamma (float, optional): Per-trial discount, the effective memory is 1 / (1 - gamma). Defaults to 0.999.
+            epsilon_start (float, optional): Exploration probability. Defaults to 0.1.
+            epsilon_decay (str, optional): Schedule from EPSILON_SCHEDULES, "constant" by default.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+            indexed (bool, optional): Keep a tournament tree over the estimates, see EpsilonGreedy.
+        """
+        if not 0 < gamma <= 1:
+            raise ValueError(f"gamma must be in (0, 1], got {gamma}")
+        super().__init__(true_means, epsilon_start, epsilon_decay, rng, indexed)
+        self.gamma = gamma
+        self.weights = np.zeros(self.n_arms)
+        self.weighted_sums = np.zeros(self.n_arms)
+        self.scale = 1.0
+
+    def __repr__(self):
+        return f"<DiscountedEpsilonGreedy Agent | gamma={self.gamma}, epsilon={self.epsilon:.3f}, arms={self.n_arms}>"
+
+    @property
+    def discounted_pulls(self):
+        """np.ndarray: Effective number of pulls of each arm after discounting."""
+        return self.weights / self.scale
+
+    def update(self, arm, reward):
+        """
+        Discount all past observations by gamma and add the new one, in amortized O(1).
+
+        The estimates are ratios of two equally scaled sums, so only the pulled arm's
+        estimate changes.
+
+        Args:
+            arm (int): Arm index that was pulled.
+            reward (float): Reward obtained.
+        """
+        self.scale /= self.gamma
+        if self.scale > MAX_SCALE:
+            self.weights /= self.scale
+            self.weighted_sums /= self.scale
+            self.scale = 1.0
+        self.pulls[arm] += 1
+        self.weights[arm] += self.scale
+        self.weighted_sums[arm] += reward * self.scale
+        self.estimates[arm] = self.weighted_sums[arm] / self.weights[arm]
+        if self.best_arm_index is not None:
+            self.best_arm_index.update(arm, float(self.estimates[arm]))
+
+    def posterior_samples(self, n_draws, rng):
+        """
+        Sample arm means from a normal approximation using the discounted pull counts.
+
+        Args:
+            n_draws (int): Number of joint samples.
+            rng (np.random.Generator): Source of the draws.
+
+        Returns:
+            np.ndarray: (n_draws, n_arms) sampled means.
+        """
+        scale = 1 / np.sqrt(np.maximum(self.discounted_pulls, 1))
+        return rng.normal(self.estimates, scale, size=(n_draws, self.n_arms))
+
+    def report(self):
+        """
+        Summarize and log the experimental performance.
+        """
+        super().report()
+        logger.info(f"[{self.algorithm}] gamma={self.gamma}, effective memory "
+                    f"{self.discounted_pulls.sum():.1f} trials")
+
+
+class SlidingWindowThompsonSampling(ThompsonSampling):
+    """
+    Thompson Sampling whose Beta posteriors only count the last `window` trials.
+
+    Class Attributes:
+        window(int): Number of most recent trials the posteriors are based on.
+
+        window_arms(np.ndarray): Ring buffer of the arms of the last trials.
+
+        window_successes(np.ndarray): Ring buffer of whether each of the last trials was a success.
+
+        window_updates(int): Number of updates so far, the next slot is window_updates % window.
+    """
+
+    algorithm = "Sliding-Window Thompson Sampling"
+    checkpoint_fields = ThompsonSampling.checkpoint_fields + ("window_arms", "window_successes", "window_updates")
+
+    def __init__(self, arm_means, window=1000, rng=None):
+        """
+        Initialize the bandit with Beta(1, 1) priors and an empty window.
+
+        Args:
+            arm_means (Sequence[float]): Real mean reward for each arm.
+            window (int, optional): Number of recent trials to learn from. Defaults to 1000.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+        """
+        super().__init__(arm_means, rng=rng)
+        self.window = int(window)
+        self.window_arms = np.zeros(self.window, dtype=np.int32)
+        self.window_successes = np.zeros(self.window, dtype=bool)
+        self.window_updates = 0
+
+    def __repr__(self):
+        return f"SlidingWindowThompsonSampling(num_arms={self.num_arms}, window={self.window})"
+
+    def update(self, arm_index, reward):
+        """
+        Add the new trial to the posteriors and remove the one leaving the window, in O(1).
+
+        Args:
+            arm_index (int): Index of the arm pulled.
+            reward (float): Observed reward from the arm.
+        """
+        slot = self.window_updates % self.window
+        if self.window_updates >= self.window:
+            old = self.window_arms[slot]
+            if self.window_successes[slot]:
+                self.posterior_a[old] -= 1
+            else:
+                self.posterior_b[old] -= 1
+        success = reward > 0
+        self.window_arms[slot] = arm_index
+        self.window_successes[slot] = success
+        self.window_updates += 1
+        if success:
+            self.posterior_a[arm_index] += 1
+        else:
+            self.posterior_b[arm_index] += 1
+
+    def report(self):
+        """
+        Log mean reward and mean regret using loguru.
+        """
+        super().report()
+        logger.info(f"[{self.algorithm}] Window: {self.window} trials")
+
+
+class DiscountedThompsonSampling(ThompsonSampling):
+    """
+    Thompson Sampling with exponentially discounted Beta posteriors.
+
+    The posterior of an arm is Beta(1 + S, 1 + F) with S and F its discounted success
+    and failure counts, so arms that are not pulled drift back towards the prior.
+
+    Class Attributes:
+        gamma(float): Discount factor applied per trial.
+
+        successes(np.ndarray): Discounted success counts, multiplied by scale.
+
+        failures(np.ndarray): Discounted failure counts, multiplied by scale.
+
+        scale(float): Lazy discount scale, gamma^-t since the last renormalization.
+
+    posterior_a and posterior_b rebuild the Beta parameters from the scaled counts on every
+    access and are meant for reporting; pull() computes them into two preallocated buffers.
+    """
+
+    algorithm = "Discounted Thompson Sampling"
+    checkpoint_fields = ("successes", "failures", "scale")
+
+    def __init__(self, arm_means, gamma=0.999, rng=None):
+        """
+        Initialize the bandit with Beta(1, 1) priors.
+
+        Args:
+            arm_means (Sequence[float]): Real mean reward for each arm.
+            gamma (float, optional): Per-trial discount, the effective memory is 1 / (1 - gamma). Defaults to 0.999.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
+        """
+        if not 0 < gamma <= 1:
+            raise ValueError(f"gamma must be in (0, 1], got {gamma}")
+        self.gamma = gamma
+        self.scale = 1.0
+        super().__init__(arm_means, rng=rng)
+        self._alpha = np.empty(self.num_arms)
+        self._beta = np.empty(self.num_arms)
+
+    def __repr__(self):
+        return f"DiscountedThompsonSampling(num_arms={self.num_arms}, gamma={self.gamma})"
+
+    @property
+    def posterior_a(self):
+        """np.ndarray: Alpha parameters, 1 + discounted successes."""
+        return 1 + self.successes / self.scale
+
+    @posterior_a.setter
+    def posterior_a(self, value):
+        self.successes = (np.asarray(value, dtype=float) - 1) * self.scale
+
+    @property
+    def posterior_b(self):
+        """np.ndarray: Beta parameters, 1 + discounted failures."""
+        return 1 + self.failures / self.scale
+
+    @posterior_b.setter
+    def posterior_b(self, value):
+        self.failures = (np.asarray(value, dtype=float) - 1) * self.scale
+
+    def pull(self):
+        """
+        Select an arm by sampling the discounted posteriors, without allocating new arrays.
+
+        Returns:
+            tuple: (selected arm index, simulated reward)
+        """
+        alpha, beta = self._alpha, self._beta
+        np.divide(self.successes, self.scale, out=alpha)
+        alpha += 1
+        np.divide(self.failures, self.scale, out=beta)
+        beta += 1
+        selected = np.argmax(self.rng.beta(alpha, beta))
+        reward = self.rng.normal(self.arm_means[selected], 1)
+        return selected, reward
+
+    def update(self, arm_index, reward):
+        """
+        Discount all past observations by gamma and add the new one, in amortized O(1).
+
+        Args:
+            arm_index (int): Index of the arm pulled.
+            reward (float): Observed reward from the arm.
+        """
+        self.scale /= self.gamma
+        if self.scale > MAX_SCALE:
+            self.successes /= self.scale
+            self.failures /= self.scale
+            self.scale = 1.0
+        if reward > 0:
+            self.successes[arm_index] += self.scale
+        else:
+            self.failures[arm_index] += self.scale
+
+    def report(self):
+        """
+        Log mean reward and mean regret using loguru.
+        """
+        super().report()
+        memory = (self.successes.sum() + self.failures.sum()) / self.scale
+        logger.info(f"[{self.algorithm}] gamma={self.gamma}, effective memory {memory:.1f} trials")
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Offline Policy Evaluation over Logged Bandit Data
+Estimates how candidate policies would have performed on a log shaped like outputs.csv
+(Arm, Reward and optionally Algorithm and Propensity columns) without re-running traffic.
+
+The log is streamed in chunks and every candidate is scored in the same pass. Policies
+are grouped into families whose state is held as (n_policies, n_arms) arrays. Within a
+block of update_every rows each policy is frozen: its action probabilities are computed
+once for the block, and the block is then scored for all policies with array operations.
+The policies learn from their matched rows at the end of the block, the same way a
+production bandit updates in batches. Smaller blocks track sequential learning more
+closely; larger blocks are faster.
+
+Estimators, per policy:
+    replay: mean reward over the rows where the policy's sampled arm equals the logged
+        arm (Li et al.). Unbiased when the logging policy chose arms uniformly at random.
+    ips: mean of pi(logged arm) / p(logged arm) * reward over all rows.
+    snips: the self-normalized ips estimate, which has lower variance.
+The logging propensities p come from a Propensity column, an explicit per-arm vector
+(see estimate_propensities()), or are assumed uniform.
+"""
+
+
+import argparse
+import itertools
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EPSILON_SCHEDULES, epsilon_schedule
+from result_store import ResultReader
+
+
+class PolicyFamily(ABC):
+    """
+    A group of policies over the same arms, evaluated together.
+
+    Class Attributes:
+        n_arms(int): Number of arms.
+
+        names(list[str]): One label per policy.
+    """
+
+    def __init__(self, n_arms, names):
+        self.n_arms = n_arms
+        self.names = list(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    @abstractmethod
+    def probabilities(self, rng):
+        """
+        Action probabilities of every policy for the next block.
+
+        Args:
+            rng (np.random.Generator): Source of randomness for Monte Carlo estimates.
+
+        Returns:
+            np.ndarray: (n_policies, n_arms) rows summing to 1.
+        """
+        pass
+
+    def update(self, arms, rewards, matched):
+        """
+        Learn from the rows where each policy's choice matched the logged arm.
+
+        The default does nothing, which is right for non-learning families such as
+        FixedPolicies; learning families override it.
+
+        Args:
+            arms (np.ndarray): Logged arms of the block, shape (B,).
+            rewards (np.ndarray): Logged rewards of the block, shape (B,).
+            matched (np.ndarray): (n_policies, B) boolean mask of matched rows.
+        """
+        pass
+
+    def _matched_totals(self, arms, rewards, matched):
+        """Per-(policy, arm) counts and reward sums of the matched rows, via one bincount each."""
+        policy, row = np.nonzero(matched)
+        cells = policy * self.n_arms + arms[row]
+        size = len(self) * self.n_arms
+        counts = np.bincount(cells, minlength=size).reshape(len(self), self.n_arms)
+        sums = np.bincount(cells, weights=rewards[row], minlength=size).reshape(len(self), self.n_arms)
+        return counts, sums, row
+
+
+class FixedPolicies(PolicyFamily):
+    """Non-learning policies with constant action probabilities (e.g. always arm k, uniform)."""
+
+    def __init__(self, probabilities, names=None):
+        """
+        Args:
+            probabilities (array-like): (n_policies, n_arms) action probabilities.
+            names (Sequence[str], optional): Policy labels.
+        """
+        probabilities = np.atleast_2d(np.asarray(probabilities, dtype=float))
+        self._probabilities = probabilities / probabilities.sum(axis=1, keepdims=True)
+        super().__init__(probabilities.shape[1],
+                         names or [f"Fixed({i})" for i in range(len(probabilities))])
+
+    def probabilities(self, rng):
+        return self._probabilities
+
+
+class EpsilonGreedyPolicies(PolicyFamily):
+    """
+    Epsilon-Greedy policies for every combination of starting epsilon and decay schedule.
+
+    The schedule is applied to each policy's own number of matched rows, as in
+    EpsilonGreedy where t counts the updates the agent has seen.
+
+    Class Attributes:
+        counts(np.ndarray): (n_policies, n_arms) matched pulls.
+
+        sums(np.ndarray): (n_policies, n_arms) matched reward sums.
+    """
+
+    def __init__(self, n_arms, epsilons=(0.1,), epsilon_decays=("constant",)):
+        """
+        Args:
+            n_arms (int): Number of arms.
+            epsilons (Sequence[float], optional): Starting exploration rates.
+            epsilon_decays (Sequence[str], optional): Schedules from EPSILON_SCHEDULES.
+        """
+        self.configs = list(itertools.product(epsilons, epsilon_decays))
+        for _, decay in self.configs:
+            epsilon_schedule(decay)
+        super().__init__(n_arms, [f"Epsilon-Greedy(epsilon={e}, decay={d})" for e, d in self.configs])
+        self.counts = np.zeros((len(self), n_arms))
+        self.sums = np.zeros((len(self), n_arms))
+
+    def probabilities(self, rng):
+        seen = self.counts.sum(axis=1) + 1
+        epsilon = np.array([min(EPSILON_SCHEDULES[decay](start, t), 1.0)
+                            for (start, decay), t in zip(self.configs, seen)])
+        estimates = np.divide(self.sums, self.counts, out=np.zeros_like(self.sums), where=self.counts > 0)
+        probabilities = np.repeat(epsilon[:, None] / self.n_arms, self.n_arms, axis=1)
+        probabilities[np.arange(len(self)), np.argmax(estimates, axis=1)] += 1 - epsilon
+        return probabilities
+
+    def update(self, arms, rewards, matched):
+        counts, sums, _ = self._matched_totals(arms, rewards, matched)
+        self.counts += counts
+        self.sums += sums
+
+
+class ThompsonPolicies(PolicyFamily):
+    """
+    Beta-Bernoulli Thompson Sampling policies, one per prior, with success meaning reward > 0.
+
+    The probability that Thompson Sampling picks each arm has no closed form, so it is
+    estimated once per block from n_draws joint posterior samples.
+
+    Class Attributes:
+        posterior_a(np.ndarray): (n_policies, n_arms) alpha parameters.
+
+        posterior_b(np.ndarray): (n_policies, n_arms) beta parameters.
+    """
+
+    def __init__(self, n_arms, priors=((1.0, 1.0),), n_draws=2000):
+        """
+        Args:
+            n_arms (int): Number of arms.
+            priors (Sequence[tuple], optional): (alpha, beta) prior per policy.
+            n_draws (int, optional): Posterior samples used to estimate the action probabilities.
+        """
+        super().__init__(n_arms, [f"Thompson Sampling(prior={a:g},{b:g})" for a, b in priors])
+        priors = np.asarray(priors, dtype=float)
+        self.posterior_a = np.repeat(priors[:, :1], n_arms, axis=1)
+        self.posterior_b = np.repeat(priors[:, 1:], n_arms, axis=1)
+        self.n_draws = n_draws
+
+    def probabilities(self, rng):
+        draws = rng.beta(self.posterior_a[:, None, :], self.posterior_b[:, None, :],
+                         size=(len(self), self.n_draws, self.n_arms))
+        winners = np.argmax(draws, axis=2) + np.arange(len(self))[:, None] * self.n_arms
+        counts = np.bincount(winners.ravel(), minlength=len(self) * self.n_arms)
+        return counts.reshape(len(self), self.n_arms) / self.n_draws
+
+    def update(self, arms, rewards, matched):
+        counts, successes, _ = self._matched_totals(arms, (rewards > 0).astype(float), matched)
+        self.posterior_a += successes
+        self.posterior_b += counts - successes
+
+
+def iter_log(source, chunk_size=1_000_000, algorithm=None):
+    """
+    Stream a bandit log as arrays.
+
+    Args:
+        source (str | pd.DataFrame): CSV path, result store directory or DataFrame.
+        chunk_size (int, optional): Rows per chunk.
+        algorithm (str, optional): Only yield rows logged by this algorithm.
+
+    Yields:
+        tuple: (arms, rewards, propensities or None) for each chunk.
+    """
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[start:start + chunk_size] for start in range(0, len(source), chunk_size))
+    elif os.path.isdir(source):
+        columns = ["Arm", "Reward"] + (["Algorithm"] if algorithm else [])
+        chunks = ResultReader(source).iter_chunks(columns, algorithm=algorithm, chunk_size=chunk_size)
+        algorithm = None
+    else:
+        header = pd.read_csv(source, nrows=0).columns
+        columns = [c for c in ("Arm", "Reward", "Algorithm", "Propensity") if c in header]
+        if not algorithm and "Algorithm" in columns:
+            columns.remove("Algorithm")
+        dtypes = {"Arm": np.int32, "Reward": np.float64, "Propensity": np.float64, "Algorithm": "category"}
+        chunks = pd.read_csv(source, usecols=columns, dtype={c: dtypes[c] for c in columns}, chunksize=chunk_size)
+    for chunk in chunks:
+        if algorithm:
+            chunk = chunk[chunk["Algorithm"] == algorithm]
+        propensities = chunk["Propensity"].to_numpy(float) if "Propensity" in chunk else None
+        yield chunk["Arm"].to_numpy(np.int64), chunk["Reward"].to_numpy(float), propensities
+
+
+def estimate_propensities(source, n_arms, chunk_size=1_000_000, algorithm=None):
+    """
+    Estimate the logging policy's marginal arm probabilities in a pass over the Arm column.
+
+    Using marginal frequencies as propensities ignores how the logging policy adapted
+    over time, so ips/snips on logs from adaptive policies remain approximate.
+
+    Args:
+        source (str | pd.DataFrame): CSV path, result store directory or DataFrame.
+        n_arms (int): Number of arms.
+        chunk_size (int, optional): Rows per chunk.
+        algorithm (str, optional): Only count rows logged by this algorithm.
+
+    Returns:
+        np.ndarray: (n_arms,) arm frequencies.
+    """
+    counts = np.zeros(n_arms, dtype=np.int64)
+    for arms, _, _ in iter_log(source, chunk_size, algorithm):
+        counts += np.bincount(arms, minlength=n_arms)
+    return counts / counts.sum()
+
+
+class OfflineEvaluator:
+    """
+    Scores many policy families against one logged stream in a single pass.
+
+    Class Attributes:
+        families(list[PolicyFamily]): Candidate policies.
+
+        n_arms(int): Number of arms in the log.
+
+        update_every(int): Rows per block during which policies are frozen.
+
+        propensities(np.ndarray | None): Per-arm logging probabilities, None means uniform
+            unless the log has a Propensity column.
+
+        rows(int): Logged rows processed so far.
+    """
+
+    def __init__(self, families, n_arms, update_every=1000, propensities=None, seed=0):
+        """
+        Args:
+            families (Sequence[PolicyFamily]): Candidate policies.
+            n_arms (int): Number of arms in the log.
+            update_every (int, optional): Rows per frozen block. Defaults to 1000.
+            propensities (array-like, optional): Per-arm logging probabilities.
+            seed (int, optional): Seed for the policies' sampled choices.
+        """
+        self.families = list(families)
+        self.n_arms = n_arms
+        self.update_every = int(update_every)
+        self.propensities = None if propensities is None else np.asarray(propensities, dtype=float)
+        self.rng = np.random.default_rng(seed)
+        self.names = [name for family in self.families for name in family.names]
+        n = len(self.names)
+        self.rows = 0
+        self.matches = np.zeros(n, dtype=np.int64)
+        self.replay_rewards = np.zeros(n)
+        self.weighted_rewards = np.zeros(n)
+        self.weights = np.zeros(n)
+        self.squared_weights = np.zeros(n)
+
+    def __repr__(self):
+        return f"OfflineEvaluator(policies={len(self.names)}, rows={self.rows})"
+
+    def _sample(self, probabilities, n_rows):
+        """Draw n_rows arms from every policy's distribution by inverting its CDF."""
+        cdf = np.cumsum(probabilities, axis=1)
+        cdf[:, -1] = 1.0
+        uniforms = self.rng.random((len(cdf), n_rows))
+        if cdf.size * n_rows <= 4_000_000:
+            return (uniforms[:, :, None] >= cdf[:, None, :]).sum(axis=2)
+        return np.stack([np.searchsorted(row, u, side="right") for row, u in zip(cdf, uniforms)])
+
+    def _block(self, arms, rewards, logging_propensity):
+        probabilities = np.vstack([family.probabilities(self.rng) for family in self.families])
+        weights = probabilities[:, arms] / logging_propensity
+        self.weighted_rewards += weights @ rewards
+        self.weights += weights.sum(axis=1)
+        self.squared_weights += np.einsum("pb,pb->p", weights, weights)
+
+        matched = self._sample(probabilities, len(arms)) == arms
+        self.matches += matched.sum(axis=1)
+        self.replay_rewards += matched @ rewards
+
+        start = 0
+        for family in self.families:
+            family.update(arms, rewards, matched[start:start + len(family)])
+            start += len(family)
+        self.rows += len(arms)
+
+    def process(self, arms, rewards, propensities=None):
+        """
+        Score one chunk of the log, block by block.
+
+        Args:
+            arms (np.ndarray): Logged arms.
+            rewards (np.ndarray): Logged rewards.
+            propensities (np.ndarray, optional): Logging probability of each row's arm.
+        """
+        if propensities is None:
+            propensities = (np.full(len(arms), 1 / self.n_arms) if self.propensities is None
+                            else self.propensities[arms])
+        for start in range(0, len(arms), self.update_every):
+            block = slice(start, start + self.update_every)
+            self._block(arms[block], rewards[block], propensities[block])
+
+    def evaluate(self, source, chunk_size=1_000_000, algorithm=None):
+        """
+        Stream a whole log through the evaluator.
+
+        Args:
+            source (str | pd.DataFrame): CSV path, result store directory or DataFrame.
+            chunk_size (int, optional): Rows read per chunk.
+            algorithm (str, optional): Only use rows logged by this algorithm.
+
+        Returns:
+            pd.DataFrame: summary() after the pass.
+        """
+        for arms, rewards, propensities in iter_log(source, chunk_size, algorithm):
+            self.process(arms, rewards, propensities)
+            logger.debug(f"Offline evaluation: {self.rows} rows processed")
+        logger.success(f"Evaluated {len(self.names)} policies on {self.rows} logged rows")
+        return self.summary()
+
+    def summary(self):
+        """
+        Tabulate the estimates.
+
+        Returns:
+            pd.DataFrame: Per policy, the replay matches and estimate, ips and snips
+            estimates and the effective sample size of the importance weights.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "policy": self.names,
+                "rows": self.rows,
+                "replay_matches": self.matches,
+                "replay_reward": self.replay_rewards / self.matches,
+                "ips_reward": self.weighted_rewards / self.rows,
+                "snips_reward": self.weighted_rewards / self.weights,
+                "effective_sample_size": self.weights ** 2 / self.squared_weights,
+            })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluate bandit policies offline on a logged CSV or result store.")
+    parser.add_argument("source", help="CSV file or result store directory.")
+    parser.add_argument("--arms", type=int, required=True, help="Number of arms in the log.")
+    parser.add_argument("--algorithm", help="Only use rows logged by this algorithm.")
+    parser.add_argument("--epsilons", type=float, nargs="*", default=[0.01, 0.05, 0.1, 0.2])
+    parser.add_argument("--decays", nargs="*", default=["constant", "inverse_sqrt"])
+    parser.add_argument("--thompson-priors", type=float, nargs="*", default=[1.0],
+                        help="Symmetric Beta prior strengths for Thompson Sampling policies.")
+    parser.add_argument("--update-every", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--empirical-propensities", action="store_true",
+                        help="Use logged arm frequencies as propensities instead of uniform.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    families = [FixedPolicies(np.eye(args.arms), [f"Always arm {k}" for k in range(args.arms)])]
+    if args.epsilons:
+        families.append(EpsilonGreedyPolicies(args.arms, args.epsilons, args.decays))
+    if args.thompson_priors:
+        families.append(ThompsonPolicies(args.arms, [(s, s) for s in args.thompson_priors]))
+    propensities = None
+    if args.empirical_propensities:
+        propensities = estimate_propensities(args.source, args.arms, args.chunk_size, args.algorithm)
+    evaluator = OfflineEvaluator(families, args.arms, args.update_every, propensities, args.seed)
+    estimates = evaluator.evaluate(args.source, args.chunk_size, args.algorithm)
+    logger.info(f"Off-policy estimates:\n{estimates.to_string(index=False)}")
+
+
+# In[ ]:
+
+
+
+
@@ -4,9 +4,59 @@
 # In[1]:
 
 
+import os
+
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from loguru import logger
+from matplotlib.figure import Figure
+
+from downsampling import CurveAccumulator, lttb, minmax_decimate, rolling_mean
+from result_store import ResultReader
+
+
+DOWNSAMPLERS = {"minmax": minmax_decimate, "lttb": lttb}
+
+COLORS = {"Epsilon-Greedy": "hotpink", "Thompson Sampling": "purple"}
+
+FIGURES = {
+    "learning_curve.png": ("rolling_reward", "Learning Curve", "Average Reward"),
+    "cumulative_rewards.png": ("cumulative_reward", "Cumulative Rewards Comparison", "Cumulative Reward"),
+    "cumulative_regret.png": ("cumulative_regret", "Cumulative Regret Comparison", "Cumulative Regret"),
+}
+
+
+def _save_figures(curves, out_dir, figsize=(10, 5), dpi=100):
+    """
+    Draws the three comparison figures straight to PNG files without a display.
+
+    Args:
+        curves(dict): {algorithm: {curve name: (x, y)}}.
+        out_dir(str): Folder the images are written to.
+        figsize(tuple): Figure size in inches.
+        dpi(int): Resolution of the saved images.
+
+    Returns:
+        list[str]: Paths of the written images.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for filename, (name, title, ylabel) in FIGURES.items():
+        figure = Figure(figsize=figsize)
+        axes = figure.add_subplot()
+        for algorithm, algorithm_curves in curves.items():
+            x, y = algorithm_curves[name]
+            axes.plot(x, y, color=COLORS.get(algorithm), label=algorithm, linewidth=1)
+        axes.set_title(title)
+        axes.set_xlabel("Trial")
+        axes.set_ylabel(ylabel)
+        axes.legend()
+        path = os.path.join(out_dir, filename)
+        figure.savefig(path, dpi=dpi)
+        paths.append(path)
+    logger.info(f"Saved {len(paths)} figures to {out_dir}")
+    return paths
 
 
 class Visualization:
@@ -16,18 +66,22 @@ class Visualization:
     Class Attributes:
         eg_results(pd.DataFrame): Results from Epsilon-Greedy algorithm.
         ts_results(pd.DataFrame): Results from Thompson Sampling algorithm.
+        offsets(dict): {algorithm: (reward, regret)} totals of the trials before the loaded ones.
     """
 
-    def __init__(self, eg_results, ts_results):
+    def __init__(self, eg_results, ts_results, offsets=None):
         """
         Stores the experiment results.
 
         Args:
             eg_results(pd.DataFrame): Results of 'Reward' and 'Regret' columns of Epsilon-Greedy algorithm.
             ts_results(pd.DataFrame): Results of 'Reward' and 'Regret' columns of Thompson Sampling algorithm.
+            offsets(dict, optional): {algorithm: (reward, regret)} summed over the trials before the
+                first loaded one, so the cumulative curves of a trial range start at their true level.
         """
         self.eg_results = eg_results
         self.ts_results = ts_results
+        self.offsets = offsets or {}
 
     def plot1(self):
         """
@@ -73,6 +127,89 @@ class Visualization:
         plt.legend()
         plt.show()
 
+    @classmethod
+    def from_store(cls, directory, trials=None):
+        """
+        Loads only the columns and trial range the plots need from a result store.
+
+        Args:
+            directory(str): Folder written by result_store.ResultSink.
+            trials(tuple, optional): (first, stop) trial numbers to load, stop exclusive.
+
+        Returns:
+            Visualization: Instance holding both algorithms' 'Trial', 'Reward' and 'Regret' columns.
+        """
+        reader = ResultReader(directory)
+        columns = ["Trial", "Reward", "Regret"]
+        offsets = {}
+        if trials is not None:
+            rewards, regrets = reader.column("Reward"), reader.column("Regret")
+            for algorithm in ("Epsilon-Greedy", "Thompson Sampling"):
+                before = reader.row_ranges(algorithm, (1, trials[0]))
+                offsets[algorithm] = (sum(float(rewards[r].sum(dtype=float)) for r in before),
+                                      sum(float(regrets[r].sum(dtype=float)) for r in before))
+        return cls(reader.read(columns, algorithm="Epsilon-Greedy", trials=trials),
+                   reader.read(columns, algorithm="Thompson Sampling", trials=trials), offsets)
+
+    def render(self, out_dir, window=200, method="minmax", figsize=(10, 5), dpi=100):
+        """
+        Renders plot1() and plot2() headlessly to image files, downsampled to the pixel width.
+
+        Args:
+            out_dir(str): Folder the images are written to.
+            window(int): Rolling window of the learning curve.
+            method(str): "minmax" keeps each pixel column's extremes, "lttb" keeps
+                Largest-Triangle-Three-Buckets points.
+            figsize(tuple): Figure size in inches.
+            dpi(int): Resolution of the saved images.
+
+        Returns:
+            list[str]: Paths of the written images.
+        """
+        if method not in DOWNSAMPLERS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {sorted(DOWNSAMPLERS)}")
+        n_points = int(figsize[0] * dpi)
+        reduce = DOWNSAMPLERS[method]
+        curves = {}
+        for algorithm, results in (("Epsilon-Greedy", self.eg_results), ("Thompson Sampling", self.ts_results)):
+            rewards = results['Reward'].to_numpy(dtype=float)
+            trials = results['Trial'].to_numpy() if 'Trial' in results else np.arange(1, len(rewards) + 1)
+            reward_before, regret_before = self.offsets.get(algorithm, (0.0, 0.0))
+            curves[algorithm] = {
+                "rolling_reward": reduce(rolling_mean(rewards, window), n_points, trials[window - 1:]),
+                "cumulative_reward": reduce(reward_before + np.cumsum(rewards), n_points, trials),
+                "cumulative_regret": reduce(regret_before + np.cumsum(results['Regret'].to_numpy(dtype=float)),
+                                            n_points, trials),
+            }
+        return _save_figures(curves, out_dir, figsize, dpi)
+
+    @staticmethod
+    def render_store(directory, out_dir, window=200, figsize=(10, 5), dpi=100, chunk_size=1_000_000):
+        """
+        Renders the figures of a result store in one streaming pass, chunk by chunk.
+
+        Only per-pixel extrema are kept in memory, so stores of any length can be plotted.
+
+        Args:
+            directory(str): Folder written by result_store.ResultSink.
+            out_dir(str): Folder the images are written to.
+            window(int): Rolling window of the learning curve.
+            figsize(tuple): Figure size in inches.
+            dpi(int): Resolution of the saved images.
+            chunk_size(int): Rows read per chunk.
+
+        Returns:
+            list[str]: Paths of the written images.
+        """
+        reader = ResultReader(directory)
+        curves = {}
+        for algorithm in reader.categories:
+            n_rows = sum(r.stop - r.start for r in reader.row_ranges(algorithm))
+            accumulator = CurveAccumulator(n_rows, int(figsize[0] * dpi), window)
+            for chunk in reader.iter_chunks(["Reward", "Regret"], algorithm, chunk_size):
+                accumulator.update(chunk['Reward'].to_numpy(), chunk['Regret'].to_numpy())
+            curves[algorithm] = {name: accumulator.curve(name) for name in CurveAccumulator.names}
+        return _save_figures(curves, out_dir, figsize, dpi)
 
 # In[ ]:
 
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Chunked Binary Result Store
+Streams experiment results to disk as typed columns and reads them back memory-mapped.
+
+A result store is a directory with one raw little-endian file per column and a small
+manifest.json holding the schema, the row count, the category labels of the
+'Algorithm' column and the row/trial segments written by each algorithm. Rows are
+only ever appended, and the manifest is atomically replaced after every chunk, so a
+partially written store is still readable up to its last complete chunk.
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+import pandas as pd
+
+
+SCHEMA = {
+    "Trial": "<i8",
+    "Arm": "<i4",
+    "Reward": "<f4",
+    "Regret": "<f4",
+    "Algorithm": "<i1",
+}
+
+
+class ResultSink:
+    """
+    Append-only writer for experiment results.
+
+    Class Attributes:
+        directory(str): Folder of the result store.
+
+        chunk_size(int): Rows per chunk written by the experiment loop.
+
+        rows(int): Number of rows written so far.
+
+        categories(list[str]): Algorithm labels, indexed by the stored codes.
+    """
+
+    def __init__(self, directory, chunk_size=65536, append=False):
+        """
+        Create (or overwrite) a result store, or reopen one to append to it.
+
+        Args:
+            directory (str): Folder for the store, created if missing.
+            chunk_size (int, optional): Rows per chunk when an experiment streams into the sink.
+            append (bool, optional): Keep the rows of an existing store and append after them,
+                e.g. when a checkpointed run is resumed. Bytes beyond the manifest's row count,
+                left by an interrupted chunk, are cut off.
+        """
+        self.directory = directory
+        self.chunk_size = int(chunk_size)
+        self.rows = 0
+        self.categories = []
+        self.segments = []
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        append = append and os.path.exists(manifest_path)
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), "ab" if append else "wb")
+                       for name in SCHEMA}
+        if append:
+            with open(manifest_path) as handle:
+                manifest = json.load(handle)
+            self.truncate(manifest["rows"], manifest["categories"]["Algorithm"], manifest["segments"])
+        else:
+            self._write_manifest()
+
+    def __repr__(self):
+        return f"ResultSink({self.directory!r}, rows={self.rows})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_manifest(self):
+        manifest = {"rows": self.rows, "schema": SCHEMA, "chunk_size": self.chunk_size,
+                    "categories": {"Algorithm": self.categories}, "segments": self.segments}
+        temporary = os.path.join(self.directory, "manifest.tmp.json")
+        with open(temporary, "w") as handle:
+            json.dump(manifest, handle)
+        os.replace(temporary, os.path.join(self.directory, "manifest.json"))
+
+    def _code(self, algorithm):
+        if algorithm not in self.categories:
+            self.categories.append(algorithm)
+        return self.categories.index(algorithm)
+
+    def append(self, columns):
+        """
+        Append one chunk of rows from a single algorithm.
+
+        Args:
+            columns (dict): 'Trial', 'Arm', 'Reward' and 'Regret' arrays of equal length
+                and the 'Algorithm' label of the chunk.
+        """
+        n = len(columns["Arm"])
+        if n == 0:
+            return
+        code = self._code(columns["Algorithm"])
+        for name, dtype in SCHEMA.items():
+            values = np.full(n, code) if name == "Algorithm" else columns[name]
+            self._files[name].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            self._files[name].flush()
+
+        first_trial, last_trial = int(columns["Trial"][0]), int(columns["Trial"][-1])
+        previous = self.segments[-1] if self.segments else None
+        if previous and previous["algorithm"] == code and previous["trial_stop"] == first_trial:
+            previous["row_stop"] += n
+            previous["trial_stop"] = last_trial + 1
+        else:
+            self.segments.append({"algorithm": code, "row_start": self.rows, "row_stop": self.rows + n,
+                                  "trial_start": first_trial, "trial_stop": last_trial + 1})
+        self.rows += n
+        self._write_manifest()
+
+    def write_frame(self, results, algorithm=None):
+        """
+        Append an existing results DataFrame in chunks of chunk_size rows.
+
+        Args:
+            results (pd.DataFrame): Output of an experiment() call. A missing 'Trial'
+                column is numbered from 1.
+            algorithm (str, optional): Label to use instead of the 'Algorithm' column.
+        """
+        algorithm = algorithm or str(results["Algorithm"].iloc[0])
+        trials = results["Trial"].to_numpy() if "Trial" in results else np.arange(1, len(results) + 1)
+        for start in range(0, len(results), self.chunk_size):
+            stop = start + self.chunk_size
+            self.append({"Trial": trials[start:stop], "Arm": results["Arm"].to_numpy()[start:stop],
+                         "Reward": results["Reward"].to_numpy()[start:stop],
+                         "Regret": results["Regret"].to_numpy()[start:stop], "Algorithm": algorithm})
+
+    def truncate(self, rows, categories, segments):
+        """
+        Cut the store back to its first rows, e.g. to the position of a checkpoint.
+
+        Args:
+            rows (int): Number of rows to keep.
+            categories (list[str]): Algorithm labels of the kept rows.
+            segments (list[dict]): Segments of the kept rows, as in the manifest.
+        """
+        for name, handle in self._files.items():
+            handle.flush()
+            handle.truncate(rows * np.dtype(SCHEMA[name]).itemsize)
+        self.rows = int(rows)
+        self.categories = list(categories)
+        self.segments = [dict(segment) for segment in segments]
+        self._write_manifest()
+
+    def sync(self):
+        """fsync the column files, so every appended row survives a crash."""
+        for handle in self._files.values():
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def close(self):
+        """Flush and close the column files."""
+        for handle in self._files.values():
+            handle.close()
+
+
+class ResultReader:
+    """
+    Memory-mapped reader for a result store.
+
+    Class Attributes:
+        directory(str): Folder of the result store.
+
+        rows(int): Number of complete rows in the store.
+
+        categories(list[str]): Algorithm labels, indexed by the stored codes.
+    """
+
+    def __init__(self, directory):
+        """
+        Open a result store written by ResultSink.
+
+        Args:
+            directory (str): Folder of the store.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as handle:
+            manifest = json.load(handle)
+        self.rows = manifest["rows"]
+        self.schema = manifest["schema"]
+        self.categories = manifest["categories"]["Algorithm"]
+        self.segments = manifest["segments"]
+
+    def __repr__(self):
+        return f"ResultReader({self.directory!r}, rows={self.rows}, algorithms={self.categories})"
+
+    def column(self, name):
+        """
+        Memory-map one column without reading it.
+
+        Args:
+            name (str): Column name from the schema.
+
+        Returns:
+            np.memmap: Read-only view of the whole column.
+        """
+        if self.rows == 0:
+            return np.empty(0, dtype=self.schema[name])
+        return np.memmap(os.path.join(self.directory, f"{name}.bin"), dtype=self.schema[name],
+                         mode="r", shape=(self.rows,))
+
+    def row_ranges(self, algorithm=None, trials=None):
+        """
+        Translate an algorithm and a trial range into row slices, using only the manifest.
+
+        Args:
+            algorithm (str, optional): Keep only rows of this algorithm.
+            trials (tuple, optional): (first, stop) trial numbers, stop exclusive.
+
+        Returns:
+            list[slice]: Row slices to read, in storage order.
+        """
+        ranges = []
+        for segment in self.segments:
+            if algorithm is not None and self.categories[segment["algorithm"]] != algorithm:
+                continue
+            first, stop = trials if trials is not None else (segment["trial_start"], segment["trial_stop"])
+            first, stop = max(first, segment["trial_start"]), min(stop, segment["trial_stop"])
+            if first < stop:
+                offset = segment["row_start"] - segment["trial_start"]
+                ranges.append(slice(first + offset, stop + offset))
+        return ranges
+
+    def read(self, columns=None, algorithm=None, trials=None):
+        """
+        Load only the requested columns and rows into a DataFrame.
+
+        Args:
+            columns (Sequence[str], optional): Columns to load, default all of them.
+            algorithm (str, optional): Keep only rows of this algorithm.
+            trials (tuple, optional): (first, stop) trial numbers, stop exclusive.
+
+        Returns:
+            pd.DataFrame: The selected rows, 'Algorithm' decoded as a categorical.
+        """
+        columns = list(columns or self.schema)
+        ranges = self.row_ranges(algorithm, trials)
+        data = {}
+        for name in columns:
+            mapped = self.column(name)
+            values = np.concatenate([mapped[r] for r in ranges]) if ranges else mapped[:0].copy()
+            if name == "Algorithm":
+                values = pd.Categorical.from_codes(values, self.categories)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def iter_chunks(self, columns=None, algorithm=None, chunk_size=1_000_000):
+        """
+        Yield the selected rows as DataFrames of at most chunk_size rows.
+
+        Args:
+            columns (Sequence[str], optional): Columns to load, default all of them.
+            algorithm (str, optional): Keep only rows of this algorithm.
+            chunk_size (int, optional): Maximum rows per yielded chunk.
+
+        Yields:
+            pd.DataFrame: Consecutive chunks of the selected rows.
+        """
+        columns = list(columns or self.schema)
+        mapped = {name: self.column(name) for name in columns}
+        for rows in self.row_ranges(algorithm):
+            for start in range(rows.start, rows.stop, chunk_size):
+                chunk = slice(start, min(start + chunk_size, rows.stop))
+                data = {name: np.array(values[chunk]) for name, values in mapped.items()}
+                if "Algorithm" in data:
+                    data["Algorithm"] = pd.Categorical.from_codes(data["Algorithm"], self.categories)
+                yield pd.DataFrame(data, copy=False)
+
+
+# In[ ]:
+
+
+
+
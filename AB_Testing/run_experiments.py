@@ -4,11 +4,10 @@
 # In[1]:
 
 
-import pandas as pd
-
 from epsilon_greedy_algorithm import EpsilonGreedy
 from thompson_sampling_algorithm import ThompsonSampling
 from plots import Visualization
+from result_store import ResultReader, ResultSink
 
 
 # In[2]:
@@ -29,10 +28,11 @@ thompson_bandit = ThompsonSampling(bandit_means)
 # In[4]:
 
 
-#Running the experiments here.
+#Running the experiments here, streaming both trial logs into a chunked binary result store.
 
-results_epsilon = epsilon_bandit.experiment()
-results_thompson = thompson_bandit.experiment()
+with ResultSink("outputs") as sink:
+    epsilon_bandit.experiment(sink=sink)
+    thompson_bandit.experiment(sink=sink)
 
 
 # In[5]:
@@ -45,7 +45,7 @@ thompson_bandit.report()
 # In[6]:
 
 
-plotting = Visualization(results_epsilon,results_thompson)
+plotting = Visualization.from_store("outputs")
 
 
 # In[7]:
@@ -58,13 +58,18 @@ plotting.plot2()
 # In[8]:
 
 
-final_outputs = pd.concat([results_epsilon, 
-                           results_thompson],
-                          axis=0)
+#Reading the results back from the store. The store in outputs/ is the artifact of the run;
+#set export_csv to True to also export it as one big CSV, chunk by chunk.
+
+final_outputs = ResultReader("outputs")
+
+export_csv = False
 
-final_outputs.to_csv("outputs.csv", index=False)
+if export_csv:
+    for number, chunk in enumerate(final_outputs.iter_chunks()):
+        chunk.to_csv("outputs_export.csv", mode="w" if number == 0 else "a", header=number == 0, index=False)
 
-final_outputs.head()
+final_outputs.read(trials=(1, 6))
 
 
 # **Findings**
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Online Serving Mode for the Bandits
+Thread-safe batched select/record API on top of EpsilonGreedy and ThompsonSampling.
+
+Selection never takes a lock: request threads read the latest immutable snapshot
+of the model (the greedy arm and epsilon, or the Beta posteriors) and draw from
+their own per-thread random generator. Delayed feedback is accumulated into one of
+several lock-striped buffers, and whichever thread first fills its stripe folds all
+stripes into the wrapped bandit and publishes a new snapshot. If another thread is
+already flushing, the request is left to it: the flushing thread drains all stripes
+again before it returns, so feedback never stays pending until some later flush.
+Request threads only ever contend on their own stripe, never on one global lock.
+"""
+
+
+import argparse
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EpsilonGreedy
+from lazy_thompson_sampling import LazyThompsonSampling
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+def _accumulate(target, arms, weights):
+    """Add weights into target at arms, choosing the cheaper kernel for the batch size."""
+    if len(arms) >= len(target):
+        target += np.bincount(arms, weights=weights, minlength=len(target))
+    else:
+        np.add.at(target, arms, weights)
+
+
+class _Stripe:
+    """One lock-protected feedback buffer (pull counts and reward sums per arm)."""
+
+    def __init__(self, n_arms):
+        self.lock = threading.Lock()
+        self.n_arms = n_arms
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(self.n_arms)
+        self.sums = np.zeros(self.n_arms)
+        self.pending = 0
+
+
+class ServingBandit:
+    """
+    Concurrent serving wrapper around an EpsilonGreedy or ThompsonSampling instance.
+
+    Class Attributes:
+        bandit(Bandit): Wrapped bandit whose state is updated on every flush.
+
+        n_arms(int): Total number of arms.
+
+        n_stripes(int): Number of independent feedback buffers.
+
+        flush_every(int): Pending observations per stripe that trigger a flush.
+
+        recorded(int): Total number of observations folded into the model.
+    """
+
+    def __init__(self, bandit, n_stripes=8, flush_every=256, seed=None):
+        """
+        Wrap a bandit for concurrent serving.
+
+        Args:
+            bandit (EpsilonGreedy | ThompsonSampling): Bandit whose state is served and updated.
+            n_stripes (int, optional): Number of lock-striped feedback buffers. Defaults to 8.
+            flush_every (int, optional): Observations a stripe collects before a flush. Defaults to 256.
+            seed (int, optional): Root seed for the per-thread random generators.
+        """
+        if isinstance(bandit, EpsilonGreedy):
+            self.n_arms = bandit.n_arms
+        elif isinstance(bandit, ThompsonSampling):
+            self.n_arms = bandit.num_arms
+        else:
+            raise TypeError(f"Serving supports EpsilonGreedy and ThompsonSampling, got {type(bandit).__name__}")
+        self.bandit = bandit
+        self.n_stripes = n_stripes
+        self.flush_every = flush_every
+        self._stripes = [_Stripe(self.n_arms) for _ in range(n_stripes)]
+        self._merge_lock = threading.Lock()
+        self._flush_requested = False
+        self._seed_lock = threading.Lock()
+        self._seed = np.random.SeedSequence(seed)
+        self._local = threading.local()
+        self._next_stripe = itertools.count()
+        self.recorded = 0
+        self._publish()
+
+    def __repr__(self):
+        return f"ServingBandit({self.bandit!r}, stripes={self.n_stripes}, recorded={self.recorded})"
+
+    def _thread_state(self):
+        """Return the calling thread's own generator and feedback stripe, created on first use."""
+        local = self._local
+        if not hasattr(local, "rng"):
+            with self._seed_lock:
+                child = self._seed.spawn(1)[0]
+            local.rng = np.random.default_rng(child)
+            local.stripe = self._stripes[next(self._next_stripe) % self.n_stripes]
+        return local
+
+    def _publish(self):
+        """Publish an immutable snapshot of the current model state for selection."""
+        if isinstance(self.bandit, EpsilonGreedy):
+            self.bandit.epsilon = self.bandit._schedule(self.bandit.epsilon_start, max(self.recorded, 1))
+            snapshot = SimpleNamespace(best_arm=self.bandit.best_arm(),
+                                       epsilon=self.bandit.epsilon)
+        else:
+            snapshot = SimpleNamespace(a=self.bandit.posterior_a.copy(), b=self.bandit.posterior_b.copy())
+        self._snapshot = snapshot
+
+    def select(self, batch_size=1):
+        """
+        Assign arms to a batch of requests in one vectorized call, without locking.
+
+        Args:
+            batch_size (int, optional): Number of assignments to return. Defaults to 1.
+
+        Returns:
+            np.ndarray: Chosen arm index for every request in the batch.
+        """
+        rng = self._thread_state().rng
+        snapshot = self._snapshot
+        if isinstance(self.bandit, EpsilonGreedy):
+            explore = rng.random(batch_size) < snapshot.epsilon
+            arms = np.where(explore, rng.integers(self.n_arms, size=batch_size), snapshot.best_arm)
+        else:
+            arms = np.argmax(rng.beta(snapshot.a, snapshot.b, size=(batch_size, self.n_arms)), axis=1)
+        return arms
+
+    def record(self, arms, rewards):
+        """
+        Ingest a batch of (possibly delayed) feedback.
+
+        Args:
+            arms (Sequence[int]): Arms that were served.
+            rewards (Sequence[float]): Rewards observed for those arms.
+        """
+        arms = np.asarray(arms, dtype=np.intp)
+        rewards = np.asarray(rewards, dtype=float)
+        if isinstance(self.bandit, ThompsonSampling):
+            rewards = (rewards > 0).astype(float)
+        stripe = self._thread_state().stripe
+        with stripe.lock:
+            _accumulate(stripe.counts, arms, np.ones(len(arms)))
+            _accumulate(stripe.sums, arms, rewards)
+            stripe.pending += len(arms)
+            full = stripe.pending >= self.flush_every
+        if full:
+            self.flush(blocking=False)
+
+    def flush(self, blocking=True):
+        """
+        Fold every stripe into the wrapped bandit and publish a new snapshot.
+
+        A non-blocking call that finds another thread flushing leaves a request behind,
+        and the flushing thread drains all stripes once more before it returns. Feedback
+        recorded during a flush is therefore folded in by that same flush, not left
+        pending until the next stripe fills up.
+
+        Args:
+            blocking (bool, optional): Wait if another thread is already flushing.
+                Non-blocking callers simply leave the work to that thread.
+
+        Returns:
+            bool: Whether this call performed a flush.
+        """
+        self._flush_requested = True
+        performed = False
+        while self._flush_requested:
+            if not self._merge_lock.acquire(blocking=blocking):
+                return performed
+            try:
+                while self._flush_requested:
+                    self._flush_requested = False
+                    self._merge()
+                    performed = True
+            finally:
+                self._merge_lock.release()
+            # A request made between the last check and the release is picked up here.
+            blocking = False
+        return performed
+
+    def _merge(self):
+        """Drain every stripe into the bandit and publish; the caller holds the merge lock."""
+        counts = np.zeros(self.n_arms)
+        sums = np.zeros(self.n_arms)
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe_counts, stripe_sums, pending = stripe.counts, stripe.sums, stripe.pending
+                stripe.reset()
+            counts += stripe_counts
+            sums += stripe_sums
+            self.recorded += pending
+
+        if isinstance(self.bandit, EpsilonGreedy):
+            pulls = self.bandit.pulls + counts
+            seen = counts > 0
+            estimates = self.bandit.estimates
+            estimates[seen] += (sums[seen] - counts[seen] * estimates[seen]) / pulls[seen]
+            self.bandit.pulls = pulls
+            self.bandit.refresh_index(np.flatnonzero(seen))
+        else:
+            dtype = self.bandit.posterior_a.dtype
+            self.bandit.posterior_a += sums.astype(dtype)
+            self.bandit.posterior_b += (counts - sums).astype(dtype)
+            if isinstance(self.bandit, LazyThompsonSampling):
+                self.bandit.refresh_index()
+        self._publish()
+
+def load_test(make_server, thread_counts=(1, 2, 4, 8), duration=2.0, batch_size=32,
+              feedback_every=8, seed=0):
+    """
+    Measure selection throughput and tail latency as the number of threads grows.
+
+    Every thread repeatedly selects a batch, simulates rewards from the bandit's true
+    means and sends the feedback back in bursts of feedback_every batches.
+
+    Args:
+        make_server (Callable[[], ServingBandit]): Builds a fresh server per thread count.
+        thread_counts (Sequence[int], optional): Thread counts to test.
+        duration (float, optional): Seconds each configuration runs for.
+        batch_size (int, optional): Assignments requested per select() call.
+        feedback_every (int, optional): Number of batches buffered before record().
+        seed (int, optional): Seed for the simulated rewards.
+
+    Returns:
+        pd.DataFrame: Selections per second and p50/p99/p99.9 latency (ms) per thread count.
+    """
+    results = []
+    for n_threads in thread_counts:
+        server = make_server()
+        bandit = server.bandit
+        means = bandit.true_means if isinstance(bandit, EpsilonGreedy) else bandit.arm_means
+        latencies = [[] for _ in range(n_threads)]
+        selections = [0] * n_threads
+        seeds = np.random.SeedSequence(seed).spawn(n_threads)
+        start_barrier = threading.Barrier(n_threads + 1)
+        stop = threading.Event()
+
+        def worker(i):
+            rng = np.random.default_rng(seeds[i])
+            pending_arms, pending_rewards = [], []
+            start_barrier.wait()
+            while not stop.is_set():
+                tick = time.perf_counter()
+                arms = server.select(batch_size)
+                latencies[i].append(time.perf_counter() - tick)
+                selections[i] += batch_size
+                pending_arms.append(arms)
+                pending_rewards.append(rng.normal(means[arms], 1))
+                if len(pending_arms) == feedback_every:
+                    server.record(np.concatenate(pending_arms), np.concatenate(pending_rewards))
+                    pending_arms, pending_rewards = [], []
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        start_barrier.wait()
+        began = time.perf_counter()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        latency_ms = np.concatenate([np.asarray(lat) for lat in latencies]) * 1e3
+        p50, p99, p999 = np.percentile(latency_ms, [50, 99, 99.9])
+        results.append({"threads": n_threads, "selections_per_sec": sum(selections) / elapsed,
+                        "p50_ms": p50, "p99_ms": p99, "p999_ms": p999})
+        logger.info(f"{n_threads} threads: {sum(selections) / elapsed:,.0f} selections/s, "
+                    f"p99 {p99:.3f} ms")
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the bandit serving mode.")
+    parser.add_argument("--algorithm", choices=["epsilon-greedy", "thompson"], default="thompson")
+    parser.add_argument("--means", default="1,2,3,4", help="Comma separated true arm means.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    means = [float(m) for m in args.means.split(",")]
+    bandit_class = EpsilonGreedy if args.algorithm == "epsilon-greedy" else ThompsonSampling
+    report = load_test(lambda: ServingBandit(bandit_class(means)), thread_counts=args.threads,
+                       duration=args.duration, batch_size=args.batch_size)
+    logger.info(f"Load test:\n{report.to_string(index=False)}")
+
+
+# In[ ]:
+
+
+
+
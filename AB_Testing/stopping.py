@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Early Stopping Rules for Bandit Experiments
+
+A StoppingRule is checked every check_every trials and ends the run once its criterion
+is met. Three criteria are available.
+
+The posterior criteria draw n_draws joint samples from the bandit's posterior (in blocks
+of at most max_batch_elements values, so memory stays bounded for large arm counts) and
+estimate, for every arm, the probability that it is the best one and the expected loss
+of committing to it, E[max_k theta_k - theta_arm]:
+    prob_best: stop once the leading arm's probability of being best reaches the threshold.
+    expected_loss: stop once the leading arm's expected loss drops below the threshold.
+These are Bayesian decision rules with a fixed threshold. They carry no frequentist
+guarantee under monitoring: every additional check is another chance to stop on noise,
+so the more often a run is checked, the higher the chance of committing to a wrong arm.
+
+    confidence_sequence: anytime-valid at level alpha = threshold. Every arm gets a
+        normal-mixture confidence sequence for its mean reward (Howard et al., 2021), with
+        rewards assumed sigma-sub-Gaussian (the simulated rewards are N(mean, 1)) and the
+        arms stationary. The radius after n pulls is
+            sqrt((n sigma^2 + rho) log((n sigma^2 + rho) / (rho (alpha / 2K)^2))) / n,
+        which holds for all n simultaneously, so the run stops once the leading arm's lower
+        bound exceeds every other arm's upper bound. The chance that the stop ever picks a
+        wrong arm stays below alpha, however often the rule is checked. The price is that
+        every rival arm must be pulled often enough to be ruled out, so under strongly
+        greedy allocations (inverse epsilon decay, Thompson Sampling) it stops much later
+        than the posterior rules, or not at all.
+
+The Monte Carlo draws come from the rule's own Generator, so checking does not change
+the bandit's random stream: a run that is not stopped is identical to one without a rule.
+"""
+
+
+import numpy as np
+
+
+STOPPING_CRITERIA = ("prob_best", "expected_loss", "confidence_sequence")
+
+
+class StoppingRule:
+    """
+    Stopping criterion evaluated during an experiment.
+
+    Class Attributes:
+        criterion(str): 'prob_best', 'expected_loss' or 'confidence_sequence'.
+
+        threshold(float): Minimum probability of being best, maximum expected loss, or the
+            error level alpha of the confidence sequences.
+
+        check_every(int): Trials between two checks.
+
+        min_trials(int): No check happens before this many trials.
+
+        n_draws(int): Joint posterior samples per check.
+
+        max_batch_elements(int): Upper bound on the size of one block of draws.
+
+        rng(np.random.Generator): Source of the Monte Carlo draws.
+
+        sigma(float): Sub-Gaussian scale of the rewards, for the confidence sequences.
+
+        rho(float): Mixture variance of the confidence sequences; sets the number of pulls
+            around which they are tightest.
+    """
+
+    def __init__(self, criterion="prob_best", threshold=0.99, check_every=1000, min_trials=0,
+                 n_draws=4000, max_batch_elements=2_000_000, rng=None, sigma=1.0, rho=1.0):
+        """
+        Configure the rule.
+
+        Args:
+            criterion (str, optional): 'prob_best' (default), 'expected_loss' or 'confidence_sequence'.
+            threshold (float, optional): Probability to reach, loss to fall below, or alpha
+                for 'confidence_sequence' (e.g. 0.05). Defaults to 0.99.
+            check_every (int, optional): Trials between checks. Defaults to 1000.
+            min_trials (int, optional): Trials before the first check. Defaults to 0.
+            n_draws (int, optional): Posterior samples per check. Defaults to 4000.
+            max_batch_elements (int, optional): Largest block of draws held in memory at once.
+            rng (np.random.Generator | int, optional): Generator or seed for the Monte Carlo draws.
+            sigma (float, optional): Sub-Gaussian scale of the rewards. Defaults to 1.0.
+            rho (float, optional): Mixture variance of the confidence sequences. Defaults to 1.
+        """
+        if criterion not in STOPPING_CRITERIA:
+            raise ValueError(f"Unknown criterion {criterion!r}, expected one of {STOPPING_CRITERIA}")
+        if criterion == "confidence_sequence" and not 0 < threshold < 1:
+            raise ValueError(f"The confidence_sequence threshold is an error level in (0, 1), got {threshold}")
+        self.criterion = criterion
+        self.threshold = threshold
+        self.check_every = int(check_every)
+        self.min_trials = int(min_trials)
+        self.n_draws = int(n_draws)
+        self.max_batch_elements = int(max_batch_elements)
+        self.rng = np.random.default_rng(rng)
+        self.sigma = float(sigma)
+        self.rho = float(rho)
+
+    def __repr__(self):
+        if self.criterion == "confidence_sequence":
+            return f"StoppingRule(confidence_sequence alpha={self.threshold})"
+        return f"StoppingRule({self.criterion} {'>=' if self.criterion == 'prob_best' else '<='} {self.threshold})"
+
+    def evaluate(self, bandit):
+        """
+        Estimate the probability of being best and the expected loss of every arm.
+
+        Args:
+            bandit (Bandit): Bandit implementing posterior_samples().
+
+        Returns:
+            tuple: (prob_best (np.ndarray), expected_loss (np.ndarray)), one value per arm.
+        """
+        if bandit.posterior_samples is None:
+            raise TypeError(f"{type(bandit).__name__} has no posterior_samples(); "
+                            f"use the 'confidence_sequence' criterion instead")
+        n_arms = len(bandit._arm_regrets)
+        rows = max(1, self.max_batch_elements // n_arms)
+        wins = np.zeros(n_arms, dtype=np.int64)
+        arm_sums = np.zeros(n_arms)
+        max_sum = 0.0
+        for start in range(0, self.n_draws, rows):
+            draws = bandit.posterior_samples(min(rows, self.n_draws - start), self.rng)
+            wins += np.bincount(np.argmax(draws, axis=1), minlength=n_arms)
+            max_sum += draws.max(axis=1).sum()
+            arm_sums += draws.sum(axis=0)
+        return wins / self.n_draws, (max_sum - arm_sums) / self.n_draws
+
+    def confidence_bounds(self, bandit):
+        """
+        Anytime-valid confidence sequences for the mean reward of every arm.
+
+        Args:
+            bandit (Bandit): Bandit being run; its per-arm totals come from arm_totals().
+
+        Returns:
+            tuple: (means, lower, upper) arrays, one value per arm; unpulled arms get
+            infinite bounds.
+        """
+        counts, sums = bandit.arm_totals()
+        variance = counts * self.sigma ** 2 + self.rho
+        alpha = self.threshold / (2 * len(counts))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, sums / counts, 0.0)
+            radius = np.where(counts > 0, np.sqrt(variance * np.log(variance / (self.rho * alpha ** 2))) / counts,
+                              np.inf)
+        return means, means - radius, means + radius
+
+    def check(self, bandit, n_trials):
+        """
+        Evaluate the rule if a check is due and record the decision on the bandit.
+
+        A check is due every check_every trials once min_trials are reached, and at the
+        end of the budget so a full-length run also reports its decision.
+
+        Args:
+            bandit (Bandit): Bandit being run.
+            n_trials (int): Trial budget of the run.
+
+        Returns:
+            bool: True when the run should stop before its budget.
+        """
+        done = bandit.trials_logged
+        if done < n_trials and (done % self.check_every or done < self.min_trials):
+            return False
+        evidence = {}
+        if self.criterion == "confidence_sequence":
+            means, lower, upper = self.confidence_bounds(bandit)
+            best_arm = int(np.argmax(means))
+            rival_upper = np.max(np.delete(upper, best_arm), initial=-np.inf)
+            met = lower[best_arm] > rival_upper
+            evidence = {"lower_bound": float(lower[best_arm]), "rival_upper_bound": float(rival_upper)}
+            prob_best = expected_loss = np.full(len(means), np.nan)
+        else:
+            prob_best, expected_loss = self.evaluate(bandit)
+            if self.criterion == "prob_best":
+                best_arm = int(np.argmax(prob_best))
+                met = prob_best[best_arm] >= self.threshold
+            else:
+                best_arm = int(np.argmin(expected_loss))
+                met = expected_loss[best_arm] <= self.threshold
+        stopped = bool(met) and done < n_trials
+        bandit.stopping_decision = {
+            "criterion": self.criterion,
+            "threshold": self.threshold,
+            "criterion_met": bool(met),
+            "stopped_early": stopped,
+            "trials_run": done,
+            "trials_saved": n_trials - done,
+            "best_arm": best_arm,
+            "prob_best": float(prob_best[best_arm]),
+            "expected_loss": float(expected_loss[best_arm]),
+            **evidence,
+        }
+        return stopped
+
+
+# In[ ]:
+
+
+
+
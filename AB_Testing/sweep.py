@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Parameter Sweep Runner
+Runs Epsilon-Greedy and Thompson Sampling over a grid of configurations on a process pool.
+
+Each task gets its own child of one root SeedSequence, so a sweep is reproducible
+regardless of how the tasks are scheduled. Workers only send back a one-row summary,
+and the summaries are streamed into a single table (and optionally a CSV file) as
+soon as each task finishes. With a stopping rule, every task ends as soon as its
+stopping criterion is met, which cuts the total simulation time of large sweeps.
+"""
+
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import pandas as pd
+
+from loguru import logger
+
+from epsilon_greedy_algorithm import EpsilonGreedy
+from stopping import STOPPING_CRITERIA, StoppingRule
+from thompson_sampling_algorithm import ThompsonSampling
+
+
+ALGORITHMS = ("Epsilon-Greedy", "Thompson Sampling")
+
+SUMMARY_COLUMNS = [
+    "task", "algorithm", "arm_means", "n_arms", "epsilon_start", "epsilon_decay",
+    "n_trials", "replicate", "stopping", "trials_run", "stopped_early", "decision_arm",
+    "mean_reward", "total_regret", "best_arm_rate", "seconds"
+]
+
+
+def build_grid(arm_means=([1, 2, 3, 4],), n_arms=(), epsilon_starts=(1.0,),
+               epsilon_decays=("inverse",), n_trials=(20000,), n_replicates=1,
+               algorithms=ALGORITHMS, stopping=None):
+    """
+    Expand the sweep axes into a flat list of task configurations.
+
+    Epsilon settings only multiply the Epsilon-Greedy tasks, Thompson Sampling tasks
+    are generated once per arm configuration, trial count and replicate.
+
+    Args:
+        arm_means (Sequence[Sequence[float]]): Explicit arm-mean configurations.
+        n_arms (Sequence[int]): Arm counts, each expanded to means 1, 2, ..., n.
+        epsilon_starts (Sequence[float]): Starting exploration rates for Epsilon-Greedy.
+        epsilon_decays (Sequence[str]): Decay schedule names for Epsilon-Greedy.
+        n_trials (Sequence[int]): Trial budgets.
+        n_replicates (int): Independent replicates (seeds) per configuration.
+        algorithms (Sequence[str]): Algorithms to include.
+        stopping (dict, optional): StoppingRule keyword arguments applied to every task.
+
+    Returns:
+        list[dict]: One configuration dict per task.
+    """
+    means_grid = [list(means) for means in arm_means] + [list(range(1, k + 1)) for k in n_arms]
+    tasks = []
+    for means, trials, replicate in itertools.product(means_grid, n_trials, range(n_replicates)):
+        if "Epsilon-Greedy" in algorithms:
+            for epsilon_start, epsilon_decay in itertools.product(epsilon_starts, epsilon_decays):
+                tasks.append({"algorithm": "Epsilon-Greedy", "arm_means": means, "n_trials": trials,
+                              "replicate": replicate, "epsilon_start": epsilon_start,
+                              "epsilon_decay": epsilon_decay, "stopping": stopping})
+        if "Thompson Sampling" in algorithms:
+            tasks.append({"algorithm": "Thompson Sampling", "arm_means": means, "n_trials": trials,
+                          "replicate": replicate, "epsilon_start": None, "epsilon_decay": None,
+                          "stopping": stopping})
+    return tasks
+
+
+def run_task(task, seed):
+    """
+    Run one configuration with its own random stream and summarize it.
+
+    Args:
+        task (dict): Configuration produced by build_grid().
+        seed (np.random.SeedSequence): Independent seed for this task.
+
+    Returns:
+        dict: Summary row with the configuration and its key metrics.
+    """
+    rng = np.random.RandomState(np.random.MT19937(seed))
+    start = time.perf_counter()
+    if task["algorithm"] == "Epsilon-Greedy":
+        bandit = EpsilonGreedy(task["arm_means"], epsilon_start=task["epsilon_start"],
+                               epsilon_decay=task["epsilon_decay"], rng=rng)
+    else:
+        bandit = ThompsonSampling(task["arm_means"], rng=rng)
+    stopping = None
+    if task.get("stopping"):
+        stopping = StoppingRule(**task["stopping"], rng=np.random.default_rng(seed.spawn(1)[0]))
+    bandit.experiment(task["n_trials"], stopping=stopping)
+
+    best_arm = int(np.argmax(task["arm_means"]))
+    decision = bandit.stopping_decision or {}
+    return {
+        **task,
+        "arm_means": " ".join(str(m) for m in task["arm_means"]),
+        "n_arms": len(task["arm_means"]),
+        "stopping": repr(stopping) if stopping else None,
+        "trials_run": bandit.trials_logged,
+        "stopped_early": decision.get("stopped_early", False),
+        "decision_arm": decision.get("best_arm"),
+        "mean_reward": bandit.mean_reward,
+        "total_regret": float(bandit.total_regret),
+        "best_arm_rate": float(np.mean(bandit.logged_arms == best_arm)),
+        "seconds": time.perf_counter() - start
+    }
+
+
+def _quiet_worker():
+    """Silence the per-experiment log lines inside worker processes."""
+    logger.disable("epsilon_greedy_algorithm")
+    logger.disable("thompson_sampling_algorithm")
+
+
+def run_sweep(tasks, processes=None, seed=0, output=None):
+    """
+    Run every task on a process pool and collect the summaries as they finish.
+
+    Args:
+        tasks (list[dict]): Configurations produced by build_grid().
+        processes (int, optional): Number of worker processes, default is the CPU count.
+        seed (int, optional): Root seed, task i always receives child i of it.
+        output (str, optional): CSV path the summary rows are appended to as they arrive.
+
+    Returns:
+        pd.DataFrame: One row per task, ordered by task index.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    processes = processes or os.cpu_count()
+    logger.info(f"Running {len(tasks)} sweep tasks on {processes} processes")
+
+    rows = []
+    sink = open(output, "w", newline="") if output else None
+    try:
+        writer = csv.DictWriter(sink, fieldnames=SUMMARY_COLUMNS) if sink else None
+        if writer:
+            writer.writeheader()
+        with ProcessPoolExecutor(max_workers=processes, initializer=_quiet_worker) as pool:
+            futures = {pool.submit(run_task, task, task_seed): i
+                       for i, (task, task_seed) in enumerate(zip(tasks, seeds))}
+            for done, future in enumerate(as_completed(futures), start=1):
+                row = {"task": futures[future], **future.result()}
+                rows.append(row)
+                if writer:
+                    writer.writerow(row)
+                    sink.flush()
+                logger.debug(f"Task {row['task']} finished ({done}/{len(tasks)})")
+    finally:
+        if sink:
+            sink.close()
+
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values("task", ignore_index=True)
+    saved = int(summary["n_trials"].sum() - summary["trials_run"].sum())
+    if saved:
+        logger.info(f"Stopping rules saved {saved} of {int(summary['n_trials'].sum())} trials")
+    logger.success("Sweep complete.")
+    return summary
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Run a bandit parameter sweep on a process pool.")
+    parser.add_argument("--means", action="append", default=[],
+                        help="Comma separated arm means, can be repeated (default 1,2,3,4).")
+    parser.add_argument("--arms", type=int, nargs="*", default=[], help="Arm counts, means become 1..n.")
+    parser.add_argument("--epsilon-start", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--epsilon-decay", nargs="+", default=["inverse"])
+    parser.add_argument("--trials", type=int, nargs="+", default=[20000])
+    parser.add_argument("--replicates", type=int, default=1)
+    parser.add_argument("--stop-criterion", choices=list(STOPPING_CRITERIA), default=None,
+                        help="Stop each task early once this criterion is met; with confidence_sequence "
+                             "--stop-threshold is the error level alpha, e.g. 0.05.")
+    parser.add_argument("--stop-threshold", type=float, default=0.99)
+    parser.add_argument("--check-every", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="sweep_summary.csv")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    means = [[float(m) for m in spec.split(",")] for spec in args.means]
+    stopping = None
+    if args.stop_criterion:
+        stopping = {"criterion": args.stop_criterion, "threshold": args.stop_threshold,
+                    "check_every": args.check_every}
+    grid = build_grid(arm_means=means or (() if args.arms else ([1, 2, 3, 4],)), n_arms=args.arms,
+                      epsilon_starts=args.epsilon_start, epsilon_decays=args.epsilon_decay,
+                      n_trials=args.trials, n_replicates=args.replicates, stopping=stopping)
+    summary = run_sweep(grid, processes=args.processes, seed=args.seed, output=args.output)
+    table = summary.groupby(["algorithm", "n_arms", "epsilon_decay"], dropna=False)[
+        ["mean_reward", "total_regret", "best_arm_rate"]].mean()
+    logger.info(f"Sweep summary:\n{table.to_string()}")
+
+
+# In[ ]:
+
+
+
+
@@ -5,7 +5,6 @@
 
 
 import numpy as np
-import pandas as pd
 from loguru import logger
 from Bandit import Bandit
 
@@ -26,30 +25,44 @@ class ThompsonSampling(Bandit):
         
         posterior_b(np.ndarray): Beta parameters of Beta distributions (failure counts).
         
-        collected_rewards(list): Rewards recorded for each trial.
+        collected_rewards(np.ndarray): View of the rewards recorded for each trial (float32 trial buffer).
         
-        chosen_arm_indices(list): Indices of arms chosen at each trial.
+        chosen_arm_indices(np.ndarray): View of the arms chosen at each trial (int16 trial buffer).
+        
+        rng(np.random.RandomState): Source of randomness (the global NumPy state by default).
     """
 
-    def __init__(self, arm_means):
+    algorithm = "Thompson Sampling"
+    checkpoint_fields = ("posterior_a", "posterior_b")
+
+    def __init__(self, arm_means, rng=None):
         """
         Initialize the Thompson Sampling bandit.
 
         Args:
             arm_means (Sequence[float]): Real mean reward for each arm.
+            rng (np.random.RandomState, optional): Random state to draw from, default is the global NumPy state.
 
-        Sets initial Beta priors and empties lists to track results.
+        Sets initial Beta priors and an empty trial log to track results.
         """
         self.arm_means = np.array(arm_means)
         self.num_arms = len(arm_means)
         self.posterior_a = np.ones(self.num_arms)
         self.posterior_b = np.ones(self.num_arms)
-        self.collected_rewards = []
-        self.chosen_arm_indices = []
+        self.rng = np.random if rng is None else rng
+        self._reset_log(0, np.max(self.arm_means) - self.arm_means)
 
     def __repr__(self):
         return f"ThompsonSampling(num_arms={self.num_arms})"
 
+    @property
+    def collected_rewards(self):
+        return self.logged_rewards
+
+    @property
+    def chosen_arm_indices(self):
+        return self.logged_arms
+
     def pull(self):
         """
         Select an arm by sampling from the current posterior of each arm.
@@ -57,9 +70,9 @@ class ThompsonSampling(Bandit):
         Returns:
             tuple: (selected arm index, simulated reward)
         """
-        sampled_values = np.random.beta(self.posterior_a, self.posterior_b)
+        sampled_values = self.rng.beta(self.posterior_a, self.posterior_b)
         selected = np.argmax(sampled_values)
-        reward = np.random.normal(self.arm_means[selected], 1)
+        reward = self.rng.normal(self.arm_means[selected], 1)
         return selected, reward
 
     def update(self, arm_index, reward):
@@ -75,31 +88,42 @@ class ThompsonSampling(Bandit):
         else:
             self.posterior_b[arm_index] += 1
 
-    def experiment(self, trials=20000):
+    def posterior_samples(self, n_draws, rng):
+        """
+        Sample every arm's Beta posterior n_draws times.
+
+        Args:
+            n_draws (int): Number of joint samples.
+            rng (np.random.Generator): Source of the draws.
+
+        Returns:
+            np.ndarray: (n_draws, num_arms) sampled success probabilities.
+        """
+        return rng.beta(self.posterior_a, self.posterior_b, size=(n_draws, self.num_arms))
+
+    def _set_true_means(self, means):
+        super()._set_true_means(means)
+        self.arm_means = np.array(means, dtype=float)
+
+    def experiment(self, trials=20000, checkpoint=None, resume=False, sink=None, stopping=None):
         """
         Run Thompson Sampling for a number of trials and record results.
 
         Args:
             trials (int): Number of trials to run.
+            checkpoint (Checkpointer, optional): Periodically saves the run so it can be resumed.
+            resume (bool, optional): Continue from the last checkpoint instead of starting over.
+            sink (ResultSink, optional): Stream the trial log to disk in fixed-size chunks.
+            stopping (StoppingRule, optional): End the run once the rule's criterion is met.
 
         Returns:
-            pd.DataFrame: Trial results including chosen arm, reward, regret, and algorithm.
+            pd.DataFrame: Trial results including chosen arm, reward, regret, and algorithm (None when streamed to a sink).
         """
         logger.info("Starting Thompson Sampling simulation")
 
-        for _ in range(trials):
-            arm, reward = self.pull()
-            self.update(arm, reward)
-            self.chosen_arm_indices.append(arm)
-            self.collected_rewards.append(reward)
-
-        regret = np.max(self.arm_means) - np.array([self.arm_means[a] for a in self.chosen_arm_indices])
-        results_df = pd.DataFrame({
-            "Arm": self.chosen_arm_indices,
-            "Reward": self.collected_rewards,
-            "Regret": regret,
-            "Algorithm": "Thompson Sampling"
-        })
+        self._start_log(trials, np.max(self.arm_means) - self.arm_means, checkpoint, resume, sink)
+        self._run_trials(trials, checkpoint, stopping)
+        results_df = self._collect_results(trial_column=False)
         
         logger.success("Thompson Sampling simulation complete.")
         return results_df
@@ -108,10 +132,11 @@ class ThompsonSampling(Bandit):
         """
         Log mean reward and mean regret using loguru.
         """
-        mean_reward = np.mean(self.collected_rewards)
-        mean_regret = np.mean(np.max(self.arm_means) - np.array(self.collected_rewards))
+        mean_reward = self.mean_reward
+        mean_regret = np.max(self.arm_means) - mean_reward
         logger.info(f"[Thompson Sampling] Mean Reward: {mean_reward:.4f}")
         logger.info(f"[Thompson Sampling] Mean Regret: {mean_regret:.4f}")
+        self._log_stopping_decision()
 
 
 # In[ ]:
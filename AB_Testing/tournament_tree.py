@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[1]:
+
+
+"""
+Tournament Tree for Incremental Argmax
+Keeps the index of the largest value up to date under single-position updates.
+
+Each internal node stores the winning leaf of its two children, so changing one
+value only replays the matches on the path to the root: O(log K) per update and
+O(1) to read the argmax. Ties go to the lower index, exactly like np.argmax.
+"""
+
+
+class TournamentTree:
+    """
+    Array-backed max tournament tree over K values.
+
+    Class Attributes:
+        size(int): Number of leaves (the K values being tracked).
+
+        values(list[float]): Current value of every leaf.
+    """
+
+    def __init__(self, values):
+        """
+        Build the tree bottom-up in O(K).
+
+        Args:
+            values (Sequence[float]): Initial values of the leaves.
+        """
+        self.values = [float(v) for v in values]
+        self.size = len(self.values)
+        self._offset = 1 << max(self.size - 1, 0).bit_length()
+        self._winner = [-1] * (2 * self._offset)
+        self._winner[self._offset:self._offset + self.size] = range(self.size)
+        for node in range(self._offset - 1, 0, -1):
+            self._winner[node] = self._play(self._winner[2 * node], self._winner[2 * node + 1])
+
+    def __repr__(self):
+        return f"TournamentTree(size={self.size}, argmax={self.argmax()})"
+
+    def _play(self, left, right):
+        """Return the winner of two leaves, the left one (lower index) on ties."""
+        if right < 0:
+            return left
+        if left < 0:
+            return right
+        return left if self.values[left] >= self.values[right] else right
+
+    def update(self, index, value):
+        """
+        Change one leaf and replay the matches on its path to the root.
+
+        Args:
+            index (int): Leaf to update.
+            value (float): New value of that leaf.
+        """
+        self.values[index] = value
+        winner = self._winner
+        node = (index + self._offset) >> 1
+        while node:
+            new = self._play(winner[2 * node], winner[2 * node + 1])
+            if winner[node] == new and new != index:
+                break
+            winner[node] = new
+            node >>= 1
+
+    def argmax(self):
+        """
+        Return the index of the largest value in O(1).
+
+        Returns:
+            int: Same index np.argmax would return for the current values.
+        """
+        return self._winner[1] if self.size > 1 else 0
+
+
+# In[ ]:
+
+
+
+
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""aft_scoring.py
+
+Closed-form scoring with the fitted LogNormal AFT model, for customer files of any size.
+
+For LogNormalAFTFitter, log T ~ Normal(mu, sigma) with mu = X beta_mu and
+log sigma = X beta_sigma, so the survival function is
+
+    S(t) = 1 - Phi((log t - mu) / sigma) = ndtr(-(log t - mu) / sigma).
+
+The coefficients are read from final_model once (or from a JSON file written earlier).
+After that, every chunk of a customer CSV costs one matrix product for the linear
+predictors plus one vectorized ndtr over (customers, horizons). CLV and churn
+probabilities are written back out chunk by chunk, so memory stays bounded by the chunk
+size and lifelines is not needed in the scoring loop.
+
+    python aft_scoring.py data/telco.csv --output telco_scored.csv --save-coefficients final_model.json
+    python aft_scoring.py customers.csv --coefficients final_model.json --output scored.csv --chunk-size 500000
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from clv import AVG_MONTHLY_REVENUE, DISCOUNT_RATE, HORIZON, discount_factors
+from encoding import BINARY_COLS, MULTI_CATEGORY_COLS, TelcoEncoder
+
+
+def _binary_values(values):
+    """1/0 floats of a Yes/No (or already 1/0) column; anything else, missing values included, raises ValueError."""
+    if pd.api.types.is_numeric_dtype(values):
+        numeric = values.to_numpy(float)
+    else:
+        numeric = values.astype(object).map({'Yes': 1, 'No': 0}).to_numpy(float)
+    invalid = ~np.isin(numeric, (0.0, 1.0))
+    if invalid.any():
+        raise ValueError(f"Column {values.name!r} must hold Yes/No or 1/0, got {pd.unique(values[invalid]).tolist()}")
+    return numeric
+
+
+def _check_categories(values, column, vocabularies):
+    """Raise ValueError unless every value of a raw categorical column is in its vocabulary."""
+    if vocabularies is None or column not in vocabularies:
+        raise ValueError(f"The vocabulary of {column!r} is unknown, so its dummies cannot be built safely; "
+                         "pass the vocabularies or encode the chunk with a TelcoEncoder")
+    unknown = ~values.isin(vocabularies[column])
+    if unknown.any():
+        raise ValueError(f"Column {column!r} has missing values or categories outside its vocabulary "
+                         f"{vocabularies[column]}: {pd.unique(values[unknown]).tolist()}")
+
+
+def design_matrix(chunk, features, vocabularies=None):
+    """Build the (customers, features) float matrix of the given encoded feature names from a raw chunk.
+
+    Encoded columns already in the chunk are used as they are, Yes/No columns become 1/0 and
+    dummies such as 'custcat_Plus service' are computed as chunk['custcat'] == 'Plus service',
+    so the layout never depends on which categories happen to appear in the chunk. A raw
+    categorical column must only hold categories of its vocabulary ({column: categories}, as
+    in TelcoEncoder.vocabularies), and a Yes/No column only Yes/No or 1/0; anything else,
+    missing values included, raises ValueError instead of being scored as the baseline.
+    """
+    X = np.empty((len(chunk), len(features)))
+    checked = set()
+    for k, name in enumerate(features):
+        if name == 'Intercept':
+            X[:, k] = 1.0
+        elif name in BINARY_COLS and name in chunk.columns:
+            X[:, k] = _binary_values(chunk[name])
+        elif name in chunk.columns:
+            X[:, k] = chunk[name].to_numpy(float)
+        else:
+            column = next((col for col in MULTI_CATEGORY_COLS if name.startswith(f"{col}_")), None)
+            if column is None or column not in chunk.columns:
+                raise KeyError(f"Cannot build feature {name!r} from the columns of the chunk")
+            if column not in checked:
+                _check_categories(chunk[column], column, vocabularies)
+                checked.add(column)
+            X[:, k] = (chunk[column] == name[len(column) + 1:]).to_numpy(float)
+    return X
+
+
+class LogNormalScorer:
+    """Survival, CLV and churn scores of a fitted LogNormal AFT model without lifelines.
+
+    Class Attributes:
+        features (list): Covariates of the model, 'Intercept' included.
+        mu_coef (np.ndarray): Coefficients of mu, aligned with features.
+        sigma_coef (np.ndarray): Coefficients of log sigma, aligned with features.
+        vocabularies (dict): Categories of the raw categorical columns the model was fitted on, or None.
+    """
+
+    def __init__(self, mu, sigma, vocabularies=None):
+        """
+        Args:
+            mu (dict): {covariate: coefficient} of the mu_ parameter.
+            sigma (dict): {covariate: coefficient} of the sigma_ parameter (log scale).
+            vocabularies (dict, optional): {column: categories} used to validate raw chunks,
+                e.g. the TelcoEncoder.vocabularies of the training data.
+        """
+        self.vocabularies = vocabularies
+        self.features = list(dict.fromkeys(list(mu) + list(sigma)))
+        self.mu_coef = np.array([mu.get(name, 0.0) for name in self.features], dtype=float)
+        self.sigma_coef = np.array([sigma.get(name, 0.0) for name in self.features], dtype=float)
+
+    @classmethod
+    def from_model(cls, model, vocabularies=None):
+        """Extract the coefficients of a fitted lifelines LogNormalAFTFitter."""
+        params = model.params_
+        return cls(params.loc['mu_'].to_dict(), params.loc['sigma_'].to_dict(), vocabularies)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as handle:
+            coefficients = json.load(handle)
+        return cls(coefficients['mu_'], coefficients['sigma_'], coefficients.get('vocabularies'))
+
+    def to_json(self, path):
+        coefficients = {
+            'mu_': dict(zip(self.features, self.mu_coef.tolist())),
+            'sigma_': dict(zip(self.features, self.sigma_coef.tolist())),
+        }
+        if self.vocabularies is not None:
+            coefficients['vocabularies'] = self.vocabularies
+        with open(path, 'w') as handle:
+            json.dump(coefficients, handle, indent=2)
+
+    def linear_predictors(self, chunk):
+        """Return (mu, sigma) per customer, both from a single matrix product."""
+        X = design_matrix(chunk, self.features, self.vocabularies)
+        predictors = X @ np.column_stack([self.mu_coef, self.sigma_coef])
+        return predictors[:, 0], np.exp(predictors[:, 1])
+
+    @staticmethod
+    def survival_from_predictors(mu, sigma, times):
+        """S(t) for every customer and time, shape (customers, len(times))."""
+        with np.errstate(divide='ignore'):
+            log_times = np.log(np.asarray(times, dtype=float))
+        return ndtr(-(log_times[None, :] - mu[:, None]) / sigma[:, None])
+
+    def survival(self, chunk, times):
+        """Survival probabilities of the customers in chunk at the given times."""
+        mu, sigma = self.linear_predictors(chunk)
+        return self.survival_from_predictors(mu, sigma, times)
+
+    def score(self, chunk, monthly_revenue=AVG_MONTHLY_REVENUE, horizon=HORIZON, rate=DISCOUNT_RATE,
+              churn_horizons=(12,)):
+        """CLV (as in clv.customer_lifetime_value) and churn probability 1 - S(h) for each churn horizon.
+
+        Returns:
+            pd.DataFrame: 'CLV' and one 'churn_{h}m' column per horizon, indexed like chunk.
+        """
+        mu, sigma = self.linear_predictors(chunk)
+        weights = monthly_revenue * discount_factors(horizon, rate)
+        scores = {'CLV': self.survival_from_predictors(mu, sigma, np.arange(horizon + 1)) @ weights}
+        if len(churn_horizons):
+            churn = 1 - self.survival_from_predictors(mu, sigma, churn_horizons)
+            for k, h in enumerate(churn_horizons):
+                scores[f"churn_{h:g}m"] = churn[:, k]
+        return pd.DataFrame(scores, index=chunk.index)
+
+    def score_csv(self, path, output, chunk_size=100_000, encoder=None, **score_options):
+        """Score a customer CSV chunk by chunk and append the scores to output, returning the row count.
+
+        With a fitted encoding.TelcoEncoder, the categorical columns are parsed as categoricals
+        and every chunk is scored from the encoder's fixed columns.
+        """
+        n_rows = 0
+        dtypes = encoder.dtypes() if encoder is not None else None
+        for number, chunk in enumerate(pd.read_csv(path, chunksize=chunk_size, dtype=dtypes)):
+            features = encoder.transform(chunk) if encoder is not None else chunk
+            scored = chunk.join(self.score(features, **score_options))
+            scored.to_csv(output, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+            n_rows += len(chunk)
+        return n_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score CLV and churn probabilities with the LogNormal AFT model.")
+    parser.add_argument("data", help="Customer CSV with the raw telco columns.")
+    parser.add_argument("--output", required=True, help="CSV file for the scored customers.")
+    parser.add_argument("--coefficients", help="JSON coefficients written by --save-coefficients.")
+    parser.add_argument("--train", default="data/telco.csv", help="File to fit final_model on without --coefficients.")
+    parser.add_argument("--save-coefficients", help="Write the fitted coefficients to this JSON file.")
+    parser.add_argument("--encoder", help="JSON schema of a TelcoEncoder to parse and encode the chunks with.")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--monthly-revenue", type=float, default=AVG_MONTHLY_REVENUE)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--rate", type=float, default=DISCOUNT_RATE)
+    parser.add_argument("--churn-horizons", type=float, nargs="+", default=[12])
+    args = parser.parse_args()
+
+    if args.coefficients:
+        scorer = LogNormalScorer.from_json(args.coefficients)
+    else:
+        from clv import fit_final_model
+
+        train = pd.read_csv(args.train)
+        training_encoder = TelcoEncoder().fit(train)
+        scorer = LogNormalScorer.from_model(fit_final_model(training_encoder.transform(train)),
+                                            training_encoder.vocabularies)
+    if args.save_coefficients:
+        scorer.to_json(args.save_coefficients)
+
+    encoder = TelcoEncoder.from_json(args.encoder) if args.encoder else None
+    rows = scorer.score_csv(args.data, args.output, args.chunk_size, encoder, monthly_revenue=args.monthly_revenue,
+                            horizon=args.horizon, rate=args.rate, churn_horizons=args.churn_horizons)
+    print(f"Scored {rows} customers into {args.output}")
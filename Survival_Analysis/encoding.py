@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""encoding.py
+
+Schema-locked encoding of the telco columns, for processing files chunk by chunk.
+
+Section 4 of CLV.ipynb encodes with pd.get_dummies(drop_first=True), whose columns
+depend on the categories present in the frame it is given, and then casts everything to
+int64. TelcoEncoder learns the category vocabularies once. After that, every chunk is
+encoded into the same columns, in the same order as the notebook, with int8 dummies and
+Yes/No flags. The categorical columns are parsed as pandas categoricals already at
+read_csv time, so each value becomes a small integer code rather than a Python string.
+
+    encoder = TelcoEncoder().fit(pd.read_csv("data/telco.csv"))
+    for chunk in encoder.read_csv("customers.csv", chunksize=500_000):
+        ...
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+MULTI_CATEGORY_COLS = ['region', 'marital', 'ed', 'gender', 'custcat']
+BINARY_COLS = ['retire', 'voice', 'internet', 'forward', 'churn']
+RENAMES = {'churn': 'churn_flag'}
+# Bump when transform() changes its output for the same settings, so cached encodings are rebuilt.
+ENCODING_VERSION = 1
+
+
+class TelcoEncoder:
+    """Dummy encoder with a fixed vocabulary per categorical column.
+
+    Class Attributes:
+        vocabularies (dict): {column: sorted categories}; the first one is the dropped baseline.
+        passthrough (list): Remaining non-categorical columns, in file order.
+        columns (list): Encoded column names, the order of the notebook's telecom_encoded.
+    """
+
+    def __init__(self, categorical=None, binary=None, dummy_dtype=np.int8, handle_unknown='error'):
+        """
+        Args:
+            categorical (list, optional): Columns to dummy-encode with drop_first, MULTI_CATEGORY_COLS by default.
+            binary (list, optional): Yes/No columns mapped to 1/0, BINARY_COLS by default.
+            dummy_dtype: dtype of dummies and flags, np.int8 or bool.
+            handle_unknown (str): 'error' raises on categories outside the vocabulary,
+                'ignore' encodes them as all-zero dummies (the baseline).
+        """
+        if handle_unknown not in ('error', 'ignore'):
+            raise ValueError(f"handle_unknown must be 'error' or 'ignore', got {handle_unknown!r}")
+        self.categorical = list(categorical or MULTI_CATEGORY_COLS)
+        self.binary = list(binary or BINARY_COLS)
+        self.dummy_dtype = dummy_dtype
+        self.handle_unknown = handle_unknown
+        self.vocabularies = None
+        self.passthrough = None
+        self.columns = None
+
+    def fit(self, data):
+        """Learn the vocabularies and column layout from a frame (or a representative sample)."""
+        self.vocabularies = {col: sorted(pd.Series(data[col]).dropna().unique().tolist()) for col in self.categorical}
+        self.passthrough = [col for col in data.columns if col not in self.categorical]
+        self._layout()
+        return self
+
+    def _layout(self):
+        dummies = [f"{col}_{category}" for col in self.categorical for category in self.vocabularies[col][1:]]
+        self.columns = [RENAMES.get(col, col) for col in self.passthrough] + dummies
+
+    def dtypes(self):
+        """read_csv dtypes: categoricals with the learned vocabularies and Yes/No for the binary columns."""
+        dtypes = {col: pd.CategoricalDtype(vocabulary) for col, vocabulary in self.vocabularies.items()}
+        dtypes.update({col: pd.CategoricalDtype(['No', 'Yes']) for col in self.binary if col in self.passthrough})
+        return dtypes
+
+    def transform(self, chunk):
+        """Encode a raw chunk into exactly self.columns, whatever categories the chunk contains."""
+        if self.columns is None:
+            raise RuntimeError("TelcoEncoder must be fitted (or loaded) before transform")
+        encoded = {}
+        for col in self.passthrough:
+            values = chunk[col]
+            if col in self.binary:
+                codes = self._codes(values, ['No', 'Yes'], col)
+                values = pd.Series((codes == 1).astype(self.dummy_dtype), index=chunk.index)
+            encoded[RENAMES.get(col, col)] = values
+        for col in self.categorical:
+            vocabulary = self.vocabularies[col]
+            codes = self._codes(chunk[col], vocabulary, col)
+            for k, category in enumerate(vocabulary[1:], start=1):
+                encoded[f"{col}_{category}"] = pd.Series((codes == k).astype(self.dummy_dtype), index=chunk.index)
+        return pd.DataFrame(encoded, index=chunk.index)[self.columns]
+
+    def _codes(self, values, vocabulary, col):
+        """Integer codes of values in vocabulary, -1 for missing values and anything else."""
+        if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories) == vocabulary:
+            codes = values.cat.codes.to_numpy()
+        else:
+            codes = pd.Categorical(values, categories=vocabulary).codes
+        if self.handle_unknown == 'error' and (codes < 0).any():
+            raise ValueError(f"Column {col!r} has missing values or values outside its vocabulary {vocabulary}")
+        return codes
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def read_csv(self, path, chunksize=None, **options):
+        """pd.read_csv with categorical parsing, yielding encoded chunks (or one frame without chunksize)."""
+        reader = pd.read_csv(path, dtype=self.dtypes(), chunksize=chunksize, **options)
+        if chunksize is None:
+            return self.transform(reader)
+        return (self.transform(chunk) for chunk in reader)
+
+    def settings(self):
+        """Constructor settings and ENCODING_VERSION, which together with the data determine the encoding."""
+        return {"version": ENCODING_VERSION, "categorical": self.categorical, "binary": self.binary,
+                "dummy_dtype": np.dtype(self.dummy_dtype).name, "handle_unknown": self.handle_unknown}
+
+    def to_json(self, path):
+        schema = {"categorical": self.categorical, "binary": self.binary, "vocabularies": self.vocabularies,
+                  "passthrough": self.passthrough, "dummy_dtype": np.dtype(self.dummy_dtype).name,
+                  "handle_unknown": self.handle_unknown}
+        with open(path, "w") as handle:
+            json.dump(schema, handle, indent=2)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as handle:
+            schema = json.load(handle)
+        encoder = cls(schema["categorical"], schema["binary"], np.dtype(schema["dummy_dtype"]), schema["handle_unknown"])
+        encoder.vocabularies = schema["vocabularies"]
+        encoder.passthrough = schema["passthrough"]
+        encoder._layout()
+        return encoder
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""scenarios.py
+
+Retention what-if simulator over the final LogNormal AFT model.
+
+The report recommends upgrading Basic service customers and targeting unmarried and
+younger customers. Each such intervention is a scenario: a segment of customers (a
+pandas query on the raw columns), the features it changes (for example custcat set to
+'Plus service'), and a cost per targeted customer. The engine computes every customer's
+linear predictors once. Applying a scenario is then a sparse coefficient delta:
+    delta mu_i = sum_j beta_j (v_j - x_ij)
+over the few changed features j, for the customers i in the segment. All scenarios are
+stacked into one sparse (scenarios, features) matrix, and CLV and 12-month churn are
+recomputed for all scenarios x customers in batched array operations. Scenarios are
+ranked by CLV uplift per retention dollar.
+
+    python scenarios.py data/telco.csv
+    python scenarios.py customers.csv --coefficients final_model.json --scenarios campaigns.json --output ranked.csv
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from aft_scoring import LogNormalScorer, design_matrix
+from clv import AVG_MONTHLY_REVENUE, DISCOUNT_RATE, HORIZON, discount_factors
+from encoding import BINARY_COLS, MULTI_CATEGORY_COLS, TelcoEncoder
+
+
+# Interventions from the report's recommendations. The costs are illustrative retention
+# spend per targeted customer (e.g. a discounted upgrade for a year), not fitted values.
+REPORT_SCENARIOS = [
+    {"name": "Upgrade Basic to Plus service", "segment": "custcat == 'Basic service'",
+     "changes": {"custcat": "Plus service"}, "cost": 120.0},
+    {"name": "Upgrade Basic to E-service", "segment": "custcat == 'Basic service'",
+     "changes": {"custcat": "E-service"}, "cost": 120.0},
+    {"name": "Upgrade Basic to Total service", "segment": "custcat == 'Basic service'",
+     "changes": {"custcat": "Total service"}, "cost": 180.0},
+    {"name": "Plus service for unmarried Basic customers", "segment": "custcat == 'Basic service' and marital == 'Unmarried'",
+     "changes": {"custcat": "Plus service"}, "cost": 120.0},
+    {"name": "Plus service for Basic customers under 35", "segment": "custcat == 'Basic service' and age < 35",
+     "changes": {"custcat": "Plus service"}, "cost": 120.0},
+]
+
+# Values a Yes/No feature or a single dummy can be set to (True and False hash like 1 and 0).
+BINARY_VALUES = {'Yes': 1.0, 'No': 0.0, 1: 1.0, 0: 0.0}
+
+
+class ScenarioEngine:
+    """Batched CLV and churn what-ifs for a fixed customer base.
+
+    Class Attributes:
+        scorer (LogNormalScorer): Coefficients of the final model.
+        vocabularies (dict): Categories of each categorical column, from the encoder or the scorer.
+        X (np.ndarray): (customers, features) design matrix, built once.
+        mu, log_sigma (np.ndarray): Cached baseline linear predictors per customer.
+        clv, churn (np.ndarray): Baseline CLV and churn probability at churn_horizon.
+    """
+
+    def __init__(self, scorer, data, encoder=None, monthly_revenue=AVG_MONTHLY_REVENUE, horizon=HORIZON,
+                 rate=DISCOUNT_RATE, churn_horizon=12, max_batch_elements=20_000_000):
+        """
+        Args:
+            scorer (LogNormalScorer): The fitted model's coefficients.
+            data (pd.DataFrame): Raw customers; segment queries are evaluated on these columns.
+            encoder (TelcoEncoder, optional): Encoder for the design matrix, else built from the raw columns.
+            monthly_revenue, horizon, rate: CLV settings, as in clv.customer_lifetime_value.
+            churn_horizon (float): Months of the churn probability, 12 like churn_12m.
+            max_batch_elements (int): Upper bound of scenarios x customers x months per batch.
+        """
+        self.scorer = scorer
+        self.data = data
+        self.vocabularies = encoder.vocabularies if encoder is not None else scorer.vocabularies
+        self.churn_horizon = churn_horizon
+        self.max_batch_elements = max_batch_elements
+        self.times = np.append(np.arange(horizon + 1), churn_horizon).astype(float)
+        self.weights = monthly_revenue * discount_factors(horizon, rate)
+        self.X = design_matrix(encoder.transform(data) if encoder is not None else data, scorer.features,
+                               scorer.vocabularies)
+        self.mu = self.X @ scorer.mu_coef
+        self.log_sigma = self.X @ scorer.sigma_coef
+        self.clv, self.churn = self._score(self.mu[None], self.log_sigma[None])
+        self.clv, self.churn = self.clv[0], self.churn[0]
+
+    def _score(self, mu, log_sigma):
+        """CLV and churn for stacked predictors of shape (scenarios, customers)."""
+        survival = LogNormalScorer.survival_from_predictors(mu.ravel(), np.exp(log_sigma.ravel()), self.times)
+        survival = survival.reshape(mu.shape + (len(self.times),))
+        return survival[..., :-1] @ self.weights, 1 - survival[..., -1]
+
+    def _assignments(self, changes):
+        """Expand {column: value} into {model feature: new value}; a category sets all its dummies.
+
+        A category must be in its column's vocabulary, and a Yes/No feature or a single dummy
+        can only be set to Yes/No or 1/0; anything else raises ValueError instead of silently
+        moving the segment to the baseline.
+        """
+        features = self.scorer.features
+        assignments = {}
+        for key, value in changes.items():
+            if key in MULTI_CATEGORY_COLS:
+                vocabulary = (self.vocabularies or {}).get(key)
+                if vocabulary is None:
+                    raise ValueError(f"Scenario changes {key!r}, but its categories are unknown; pass an encoder "
+                                     "or a scorer with vocabularies")
+                if value not in vocabulary:
+                    raise ValueError(f"Scenario sets {key!r} to {value!r}, which is not one of {vocabulary}")
+                for name in features:
+                    if name.startswith(f"{key}_"):
+                        assignments[name] = float(name == f"{key}_{value}")
+            elif key in features:
+                if key in BINARY_COLS or any(key.startswith(f"{col}_") for col in MULTI_CATEGORY_COLS):
+                    if value not in BINARY_VALUES:
+                        raise ValueError(f"Scenario sets {key!r} to {value!r}, expected Yes/No or 1/0")
+                    assignments[key] = BINARY_VALUES[value]
+                else:
+                    assignments[key] = float(value)
+            else:
+                raise KeyError(f"Scenario changes {key!r}, which is neither a model feature nor a categorical column")
+        return assignments
+
+    def _deltas(self, scenarios):
+        """Sparse (scenarios, features) coefficient matrices and the constant part of each delta."""
+        rows, cols, values = [], [], []
+        for s, scenario in enumerate(scenarios):
+            for name, value in self._assignments(scenario.get("changes", {})).items():
+                rows.append(s)
+                cols.append(self.scorer.features.index(name))
+                values.append(value)
+        shape = (len(scenarios), len(self.scorer.features))
+        selected = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+        targets = sparse.csr_matrix((values, (rows, cols)), shape=shape)
+        deltas = []
+        for coef in (self.scorer.mu_coef, self.scorer.sigma_coef):
+            weights = selected @ sparse.diags(coef)
+            deltas.append((weights, np.asarray(targets.multiply(weights).sum(axis=1)).ravel()))
+        return deltas
+
+    def segments(self, scenarios):
+        """(scenarios, customers) boolean mask of the customers each scenario targets."""
+        masks = np.ones((len(scenarios), len(self.data)), dtype=bool)
+        for s, scenario in enumerate(scenarios):
+            segment = scenario.get("segment")
+            if isinstance(segment, str):
+                masks[s] = self.data.eval(segment).to_numpy(bool)
+            elif segment is not None:
+                masks[s] = np.asarray(segment, dtype=bool)
+        return masks
+
+    def simulate(self, scenarios, return_customers=False):
+        """Apply every scenario to its segment and rank the scenarios by CLV uplift per retention dollar.
+
+        Args:
+            scenarios (list): Dicts with 'name', 'segment' (query string, boolean mask or None for
+                everyone), 'changes' ({column or feature: value}) and 'cost' per targeted customer.
+            return_customers (bool): Also return the (scenarios, customers) CLV uplift and churn change.
+
+        Returns:
+            pd.DataFrame: One row per scenario with targeted, total_cost, clv_uplift, uplift per
+            customer, churn_change (mean over the segment), customers_retained and value_per_dollar,
+            sorted by value_per_dollar. With return_customers, (table, clv_uplift, churn_change).
+        """
+        masks = self.segments(scenarios)
+        (mu_weights, mu_const), (sigma_weights, sigma_const) = self._deltas(scenarios)
+        n_scenarios, n_customers = masks.shape
+        clv_uplift = np.zeros((n_scenarios, n_customers))
+        churn_change = np.zeros((n_scenarios, n_customers))
+        step = max(1, self.max_batch_elements // max(n_scenarios * len(self.times), 1))
+        for start in range(0, n_customers, step):
+            block = slice(start, start + step)
+            X = self.X[block].T
+            mask = masks[:, block]
+            mu = self.mu[None, block] + mask * (mu_const[:, None] - mu_weights @ X)
+            log_sigma = self.log_sigma[None, block] + mask * (sigma_const[:, None] - sigma_weights @ X)
+            clv, churn = self._score(mu, log_sigma)
+            clv_uplift[:, block] = clv - self.clv[None, block]
+            churn_change[:, block] = churn - self.churn[None, block]
+
+        targeted = masks.sum(axis=1)
+        costs = np.array([float(scenario.get("cost", 0.0)) for scenario in scenarios])
+        total_cost = costs * targeted
+        uplift = clv_uplift.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table = pd.DataFrame({
+                "scenario": [scenario.get("name", f"scenario {s}") for s, scenario in enumerate(scenarios)],
+                "targeted": targeted,
+                "cost_per_customer": costs,
+                "total_cost": total_cost,
+                "clv_uplift": uplift,
+                "clv_uplift_per_customer": uplift / targeted,
+                f"churn_{self.churn_horizon:g}m_change": churn_change.sum(axis=1) / targeted,
+                "customers_retained": -churn_change.sum(axis=1),
+                "value_per_dollar": np.where(total_cost > 0, uplift / total_cost, np.nan),
+                "net_value": uplift - total_cost,
+            })
+        table = table.sort_values("value_per_dollar", ascending=False, na_position="last").reset_index(drop=True)
+        if return_customers:
+            return table, clv_uplift, churn_change
+        return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank retention scenarios by CLV uplift per retention dollar.")
+    parser.add_argument("data", nargs="?", default="data/telco.csv", help="Raw customer CSV.")
+    parser.add_argument("--coefficients", help="JSON coefficients from aft_scoring.py --save-coefficients.")
+    parser.add_argument("--scenarios", help="JSON list of scenarios; default the report's recommendations.")
+    parser.add_argument("--monthly-revenue", type=float, default=AVG_MONTHLY_REVENUE)
+    parser.add_argument("--output", help="CSV file for the ranked scenarios.")
+    args = parser.parse_args()
+
+    customers = pd.read_csv(args.data)
+    if args.coefficients:
+        scorer = LogNormalScorer.from_json(args.coefficients)
+    else:
+        from clv import fit_final_model
+
+        training_encoder = TelcoEncoder().fit(customers)
+        scorer = LogNormalScorer.from_model(fit_final_model(training_encoder.transform(customers)),
+                                            training_encoder.vocabularies)
+    scenarios = REPORT_SCENARIOS
+    if args.scenarios:
+        with open(args.scenarios) as handle:
+            scenarios = json.load(handle)
+
+    engine = ScenarioEngine(scorer, customers, monthly_revenue=args.monthly_revenue)
+    ranking = engine.simulate(scenarios)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(ranking)
+    if args.output:
+        ranking.to_csv(args.output, index=False)
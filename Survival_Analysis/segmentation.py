@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""segmentation.py
+
+High-value / high-risk segmentation of scored customers, without holding them all in memory.
+
+The notebook flags customers with exact quantile(0.75) cutoffs on CLV and churn_12m and
+then sums the revenue at risk (the last cell of CLV.ipynb). Those cutoffs need the whole
+scored population at once. Here the work is split in two passes over scored chunks, such
+as the output of aft_scoring.py:
+
+1. every chunk updates a QuantileSketch per score; sketches of different files, built
+   in different worker processes, are merged into one;
+2. the cutoffs are read from the merged sketches, and a second pass over the chunks
+   assigns the high_value / high_risk / high_value_at_risk flags and accumulates the
+   sums that the revenue-at-risk and retention-budget rules need.
+
+    python segmentation.py telco_scored.csv
+    python segmentation.py scored_part_*.csv --processes 8 --output flagged.csv
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+VALUE_COL, RISK_COL = 'CLV', 'churn_12m'
+SEGMENTS = ('high_value', 'high_risk', 'high_value_at_risk', 'alternative_segment')
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch.
+
+    Values are kept in levels of compactors; a value at level h stands for 2^h inputs.
+    When a level outgrows its capacity it is sorted and every other value (from a random
+    offset) moves up one level. Memory stays around 3k values, and the rank error is of
+    order 1/k. Until the first compaction the sketch is exact, and quantile() then agrees
+    with np.quantile.
+
+    Class Attributes:
+        k (int): Capacity of the top level; larger is more accurate.
+        n (int): Number of values seen.
+        total, minimum, maximum (float): Exact sum, min and max of the values seen.
+    """
+
+    def __init__(self, k=1000, seed=0):
+        self.k = k
+        self.n = 0
+        self.total = 0.0
+        self.minimum, self.maximum = np.inf, -np.inf
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.total += values.sum()
+        self.minimum, self.maximum = min(self.minimum, values.min()), max(self.maximum, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one; the result summarizes both inputs."""
+        self.n += other.n
+        self.total += other.total
+        self.minimum, self.maximum = min(self.minimum, other.minimum), max(self.maximum, other.maximum)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.levels)):
+                items = self.levels[h]
+                if len(items) <= self._capacity(h):
+                    continue
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                promoted = items[self.rng.integers(2):even:2]
+                self.levels[h] = items[even:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                compacted = True
+
+    def quantile(self, q):
+        """Approximate q-quantile(s), linearly interpolated between ranks like np.quantile."""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        rank = np.asarray(q, dtype=float) * (cumulative[-1] - 1)
+        below = np.floor(rank)
+        lower = items[np.searchsorted(cumulative, below, side='right')]
+        upper = items[np.minimum(np.searchsorted(cumulative, below + 1, side='right'), len(items) - 1)]
+        return np.clip(lower + (rank - below) * (upper - lower), self.minimum, self.maximum)
+
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+
+def sketch_chunks(chunks, columns=(VALUE_COL, RISK_COL), k=1000, seed=0):
+    """First pass: one QuantileSketch per column over an iterable of scored chunks."""
+    sketches = {col: QuantileSketch(k, seed) for col in columns}
+    for chunk in chunks:
+        for col in columns:
+            sketches[col].update(chunk[col].to_numpy())
+    return sketches
+
+
+def _sketch_file(path, columns, k, seed, chunk_size):
+    return sketch_chunks(pd.read_csv(path, usecols=list(columns), chunksize=chunk_size), columns, k, seed)
+
+
+def sketch_files(paths, columns=(VALUE_COL, RISK_COL), k=1000, seed=0, chunk_size=100_000, processes=None):
+    """First pass over scored CSV files, one file per task on a process pool, merging the partial sketches."""
+    processes = min(processes or os.cpu_count(), len(paths))
+    tasks = [(path, columns, k, seed + number, chunk_size) for number, path in enumerate(paths)]
+    if processes <= 1:
+        partials = [_sketch_file(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            partials = list(pool.map(_sketch_file, *zip(*tasks)))
+    merged = partials[0]
+    for partial in partials[1:]:
+        for col in columns:
+            merged[col].merge(partial[col])
+    return merged
+
+
+def thresholds(sketches, value_quantile=0.75, risk_quantile=0.75, alt_value_quantile=0.90):
+    """Cutoffs of the notebook: top 25% CLV, top 25% churn_12m and, for the fallback segment,
+    the top 10% CLV with churn_12m above its mean."""
+    return {
+        'value': float(sketches[VALUE_COL].quantile(value_quantile)),
+        'risk': float(sketches[RISK_COL].quantile(risk_quantile)),
+        'alt_value': float(sketches[VALUE_COL].quantile(alt_value_quantile)),
+        'alt_risk': float(sketches[RISK_COL].mean()),
+    }
+
+
+def flag_chunk(chunk, cutoffs):
+    """Add the segment flags to a scored chunk."""
+    flagged = chunk.copy()
+    flagged['high_value'] = flagged[VALUE_COL] >= cutoffs['value']
+    flagged['high_risk'] = flagged[RISK_COL] >= cutoffs['risk']
+    flagged['high_value_at_risk'] = flagged['high_value'] & flagged['high_risk']
+    flagged['alternative_segment'] = (flagged[VALUE_COL] >= cutoffs['alt_value']) & \
+                                     (flagged[RISK_COL] >= cutoffs['alt_risk'])
+    return flagged
+
+
+def segment_chunks(chunks, cutoffs, by='custcat', output=None, budget_share=0.20):
+    """Second pass: flag every chunk and aggregate revenue at risk and the retention budget.
+
+    Args:
+        chunks (iterable): Scored chunks with CLV and churn_12m (the same ones as the first pass).
+        cutoffs (dict): From thresholds().
+        by (str, optional): Column for the segment-level summary, None to skip it.
+        output (str, optional): CSV file for the flagged customers, written chunk by chunk.
+        budget_share (float): Share of the revenue at risk allocated to retention.
+
+    Returns:
+        dict: segment counts, 'segment' used for the loss, 'annual_revenue_loss',
+        'retention_budget', 'cutoffs' and the 'summary' DataFrame by the group column.
+    """
+    totals = {name: np.zeros(3) for name in SEGMENTS}
+    n, risk_sum = 0, 0.0
+    groups = []
+    for number, chunk in enumerate(chunks):
+        flagged = flag_chunk(chunk, cutoffs)
+        for name in SEGMENTS:
+            selected = flagged[name].to_numpy()
+            totals[name] += [selected.sum(), flagged[VALUE_COL].to_numpy()[selected].sum(),
+                             flagged[RISK_COL].to_numpy()[selected].sum()]
+        n += len(flagged)
+        risk_sum += flagged[RISK_COL].sum()
+        if by is not None:
+            groups.append(flagged.groupby(by, observed=True).agg(CLV=(VALUE_COL, 'sum'), churn_12m=(RISK_COL, 'sum'),
+                                                                 count=(VALUE_COL, 'size')))
+        if output:
+            flagged.to_csv(output, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+
+    # Same fallbacks as the notebook when no high-value customer is also high-risk.
+    if totals['high_value_at_risk'][0] > 0:
+        segment = 'high_value_at_risk'
+        count, value_sum, segment_risk = totals[segment]
+        loss = value_sum * segment_risk / count
+    elif totals['alternative_segment'][0] > 0:
+        segment = 'alternative_segment'
+        count, value_sum, segment_risk = totals[segment]
+        loss = value_sum * segment_risk / count
+    else:
+        segment = 'high_value'
+        loss = totals[segment][1] * risk_sum / max(n, 1)
+
+    summary = None
+    if groups:
+        summary = pd.concat(groups).groupby(level=0).sum()
+        summary[VALUE_COL] /= summary['count']
+        summary[RISK_COL] /= summary['count']
+        summary = summary.reset_index()
+    result = {name: int(totals[name][0]) for name in SEGMENTS}
+    result.update({'n': n, 'segment': segment, 'annual_revenue_loss': loss,
+                   'retention_budget': loss * budget_share, 'cutoffs': cutoffs, 'summary': summary})
+    return result
+
+
+def segment_files(paths, chunk_size=100_000, processes=None, k=1000, by='custcat', output=None, budget_share=0.20):
+    """Both passes over scored CSV files: parallel sketching, then flagging and aggregation."""
+    cutoffs = thresholds(sketch_files(paths, k=k, chunk_size=chunk_size, processes=processes))
+    chunks = (chunk for path in paths for chunk in pd.read_csv(path, chunksize=chunk_size))
+    return segment_chunks(chunks, cutoffs, by, output, budget_share)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Segment scored customers into high-value / high-risk groups.")
+    parser.add_argument("scored", nargs="+", help="Scored CSV files with CLV and churn_12m, e.g. from aft_scoring.py.")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--k", type=int, default=1000, help="Sketch size; the rank error is of order 1/k.")
+    parser.add_argument("--by", default="custcat", help="Column of the segment-level summary.")
+    parser.add_argument("--budget-share", type=float, default=0.20)
+    parser.add_argument("--output", help="CSV file for the flagged customers.")
+    args = parser.parse_args()
+
+    result = segment_files(args.scored, args.chunk_size, args.processes, args.k, args.by, args.output,
+                           args.budget_share)
+    print("High-value customers:", result['high_value'])
+    print("High-risk customers:", result['high_risk'])
+    print("High-value at-risk customers:", result['high_value_at_risk'])
+    if result['segment'] == 'alternative_segment':
+        print(f"Using alternative segment: {result['alternative_segment']} customers")
+    elif result['segment'] == 'high_value':
+        print("Using all high-value customers for revenue loss calculation")
+    print(f"Estimated potential annual revenue loss: ${result['annual_revenue_loss']:.2f}")
+    print(f"Suggested retention budget: ${result['retention_budget']:.2f}")
+    if result['summary'] is not None:
+        print("\nSegment-level CLV & Churn Analysis:")
+        print(result['summary'])
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""bass_cli.py
+
+Command line entry point for fitting and forecasting with the Bass model.
+
+    python bass_cli.py fit data/airpods_data.xlsx
+    python bass_cli.py forecast data/airpods_data.xlsx --market-share 0.05 --start-year 2025 --horizon 20
+    python bass_cli.py forecast data/airpods_data.xlsx --market-share 0.05 --start-year 2025 --bootstrap 2000 --plot dyson.png
+
+Fitted parameters are cached as JSON files named after the SHA-256 of the data file's
+bytes, the column/sheet selection and the initial guess, so a forecast on data that was
+already fitted reads the cache instead of refitting. pandas, scipy and matplotlib are only
+imported by the code paths that need them: a cached point forecast runs on numpy alone.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from helper_functions import bass_adoption
+
+
+DEFAULT_GUESS = (0.03, 0.38, 160.0)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bass_cache")
+
+
+def cache_key(path, year_column, sales_column, sheet, initial_guess):
+    """SHA-256 of the data file and of every setting that changes the fit."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    settings = {"year_column": year_column, "sales_column": sales_column, "sheet": sheet,
+                "initial_guess": [float(x) for x in initial_guess]}
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_series(path, year_column="Year", sales_column="Sales", sheet="Data"):
+    """Read (years, sales) from a CSV with named columns or from a Statista-style Excel sheet.
+
+    In Excel files the first two columns holding numbers are taken as year and sales,
+    which skips the title and note rows of the exported sheet.
+    """
+    import pandas as pd
+
+    if path.endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(path, sheet_name=sheet, header=None)
+        numeric = frame.apply(pd.to_numeric, errors="coerce").dropna(axis=1, how="all").dropna()
+        years, sales = numeric.iloc[:, 0], numeric.iloc[:, 1]
+    else:
+        frame = pd.read_csv(path, usecols=[year_column, sales_column]).dropna()
+        years, sales = frame[year_column], frame[sales_column]
+    order = np.argsort(years.to_numpy())
+    return years.to_numpy(float)[order], sales.to_numpy(float)[order]
+
+
+def fit_series(years, sales, initial_guess):
+    """Fit p, q and M with curve_fit and the analytic Jacobian, as in script1.py."""
+    from scipy.optimize import curve_fit
+
+    from helper_functions import bass_jacobian, bass_model
+
+    parameters, covariance = curve_fit(bass_model, years - years.min(), sales, p0=initial_guess, jac=bass_jacobian)
+    return parameters, covariance
+
+
+def load_or_fit(args, refit=False):
+    """Return the cached fit for the arguments' data and guess, fitting and caching it when missing."""
+    key = cache_key(args.data, args.year_column, args.sales_column, args.sheet, args.initial_guess)
+    path = os.path.join(args.cache_dir, f"{key}.json")
+    if not refit and os.path.exists(path):
+        with open(path) as handle:
+            entry = json.load(handle)
+        print(f"Using cached fit {key[:12]} for {args.data}", file=sys.stderr)
+        return entry
+
+    years, sales = load_series(args.data, args.year_column, args.sales_column, args.sheet)
+    parameters, covariance = fit_series(years, sales, args.initial_guess)
+    entry = {
+        "key": key,
+        "data": os.path.abspath(args.data),
+        "initial_guess": list(args.initial_guess),
+        "params": dict(zip(("p", "q", "M"), parameters.tolist())),
+        "covariance": covariance.tolist(),
+        "first_year": int(years.min()),
+        "n_obs": len(years),
+    }
+    os.makedirs(args.cache_dir, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(entry, handle, indent=2)
+    os.replace(temporary, path)
+    print(f"Fitted and cached {key[:12]} for {args.data}", file=sys.stderr)
+    return entry
+
+
+def run_fit(args):
+    entry = load_or_fit(args, refit=args.refit)
+    p, q, M = (entry["params"][name] for name in ("p", "q", "M"))
+    errors = np.sqrt(np.diag(entry["covariance"]))
+    print(f"coefficient of innovation(p): {p:.4f} (se {errors[0]:.4f})")
+    print(f"coefficient of imitation(q): {q:.4f} (se {errors[1]:.4f})")
+    print(f"market potential(M): {M:.2f} (se {errors[2]:.2f})")
+
+
+def run_forecast(args):
+    entry = load_or_fit(args)
+    params = [entry["params"][name] for name in ("p", "q", "M")]
+    start_year = entry["first_year"] if args.start_year is None else args.start_year
+    years = np.arange(start_year, start_year + args.horizon)
+    yearly = bass_adoption(np.arange(args.horizon), params[0], params[1], params[2] * args.market_share)
+    columns = {"Year": years, "Yearly Adoption": yearly, "Cumulative Adoption": np.cumsum(yearly)}
+
+    forecast = None
+    if args.bootstrap:
+        from bootstrap import bootstrap_forecast
+
+        data_years, sales = load_series(args.data, args.year_column, args.sales_column, args.sheet)
+        forecast = bootstrap_forecast(data_years - data_years.min(), sales, params, n_boot=args.bootstrap,
+                                      method=args.method, horizon=args.horizon, market_share=args.market_share,
+                                      start_year=start_year, processes=args.processes, seed=args.seed)
+        for kind in ("yearly", "cumulative"):
+            for name, values in forecast[kind].items():
+                columns[f"{kind.capitalize()} {name}"] = values.to_numpy()
+
+    header = list(columns)
+    rows = np.column_stack([columns[name] for name in header])
+    if args.output:
+        np.savetxt(args.output, rows, delimiter=",", header=",".join(header), comments="", fmt="%.6g")
+    print("  ".join(f"{name:>{max(len(name), 10)}}" for name in header))
+    for row in rows:
+        print("  ".join(f"{value:>{max(len(name), 10)}.2f}" if name != "Year" else f"{int(value):>10}"
+                        for name, value in zip(header, row)))
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+
+        if forecast is not None:
+            from bootstrap import plot_bands
+
+            plot_bands(forecast, title="Forecasted Adoption", path=args.plot)
+        else:
+            import matplotlib.pyplot as plt
+
+            figure, axes = plt.subplots(2, 1, figsize=(10, 6))
+            for axis, name, color in zip(axes, ("Yearly Adoption", "Cumulative Adoption"), ("pink", "blue")):
+                axis.plot(years, columns[name], marker='o', color=color)
+                axis.set_title(f"Forecasted {name}")
+                axis.set_xlabel('Year')
+                axis.set_ylabel(name)
+                axis.set_xticks(years)
+                axis.grid(True)
+            figure.tight_layout()
+            figure.savefig(args.plot)
+        print(f"Saved plot to {args.plot}", file=sys.stderr)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fit and forecast the Bass diffusion model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    shared = argparse.ArgumentParser(add_help=False)
+    shared.add_argument("data", help="CSV file with year and sales columns, or a Statista-style .xlsx.")
+    shared.add_argument("--year-column", default="Year")
+    shared.add_argument("--sales-column", default="Sales")
+    shared.add_argument("--sheet", default="Data", help="Sheet to read from Excel files.")
+    shared.add_argument("--initial-guess", type=float, nargs=3, default=list(DEFAULT_GUESS), metavar=("P", "Q", "M"))
+    shared.add_argument("--cache-dir", default=CACHE_DIR)
+
+    fit = commands.add_parser("fit", parents=[shared], help="Fit p, q and M and cache them.")
+    fit.add_argument("--refit", action="store_true", help="Ignore a cached fit.")
+    fit.set_defaults(run=run_fit)
+
+    forecast = commands.add_parser("forecast", parents=[shared], help="Forecast adoption from the (cached) fit.")
+    forecast.add_argument("--horizon", type=int, default=20)
+    forecast.add_argument("--market-share", type=float, default=1.0, help="Scale applied to M, e.g. 0.05.")
+    forecast.add_argument("--start-year", type=int, default=None, help="Default: first year of the data.")
+    forecast.add_argument("--bootstrap", type=int, default=0, help="Bootstrap refits for prediction bands.")
+    forecast.add_argument("--method", choices=["residual", "parametric"], default="residual")
+    forecast.add_argument("--processes", type=int, default=None)
+    forecast.add_argument("--seed", type=int, default=0)
+    forecast.add_argument("--output", help="CSV file for the forecast table.")
+    forecast.add_argument("--plot", help="Image file for the forecast plot.")
+    forecast.set_defaults(run=run_forecast)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    arguments.run(arguments)
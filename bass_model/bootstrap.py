@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""bootstrap.py
+
+Bootstrap prediction intervals for Bass model forecasts.
+
+The fitted curve is perturbed n_boot times, either by resampling its residuals
+(residual bootstrap) or by adding Gaussian noise with the residual variance
+(parametric bootstrap), and every perturbed series is refitted. The refits are
+batched with panel_fit.fit_batch, and the batches are spread over a process pool,
+each with its own child of one SeedSequence, so results do not depend on scheduling.
+Forecasts for all parameter draws are then computed in one broadcast call. The
+parameter draws alone only capture the uncertainty of the mean curve, so every
+forecast draw also gets a new observation noise draw, resampled residuals or Gaussian
+noise as in the refits, before it is summarized as quantile bands. The bands are
+therefore prediction intervals for the future sales themselves.
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import bass_adoption
+from panel_fit import fit_batch
+
+
+METHODS = ("residual", "parametric")
+
+
+def _refit_chunk(t, fitted, residuals, sigma, method, p0, n_boot, seed):
+    """Simulate n_boot perturbed series and refit them together, returning (params, converged)."""
+    noise = observation_noise(residuals, sigma, method, (n_boot, len(t)), np.random.default_rng(seed))
+    times = np.broadcast_to(t, (n_boot, len(t)))
+    fit = fit_batch(times, fitted + noise, np.ones((n_boot, len(t)), dtype=bool), p0)
+    return fit["params"], fit["converged"]
+
+
+def _residuals(t, y, params):
+    """Fitted curve, residuals and residual standard deviation (with 3 fitted parameters)."""
+    fitted = bass_adoption(t, *params)
+    residuals = y - fitted
+    return fitted, residuals, np.sqrt(residuals @ residuals / max(len(y) - 3, 1))
+
+
+def observation_noise(residuals, sigma, method, shape, rng):
+    """Noise of the size of the fit's errors: resampled residuals ('residual') or N(0, sigma^2) ('parametric')."""
+    if method == "residual":
+        return rng.choice(residuals, size=shape, replace=True)
+    return rng.normal(0.0, sigma, size=shape)
+
+
+def bootstrap_parameters(t, y, params, n_boot=2000, method="residual", processes=None, seed=0, chunk_size=250):
+    """Draw bootstrap samples of (p, q, M) around a fitted Bass model.
+
+    Args:
+        t (array-like): Periods since launch of the observed sales.
+        y (array-like): Observed sales.
+        params (array-like): Fitted (p, q, M), also used as the start of every refit.
+        n_boot (int): Number of bootstrap refits.
+        method (str): 'residual' or 'parametric'.
+        processes (int, optional): Worker processes, default the CPU count; 1 runs in-process.
+        seed (int): Root seed; chunk i always receives child i.
+        chunk_size (int): Refits per task sent to a worker.
+
+    Returns:
+        np.ndarray: (n_converged, 3) parameter samples from the refits that converged.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+    t, y, params = (np.asarray(x, dtype=float) for x in (t, y, params))
+    fitted, residuals, sigma = _residuals(t, y, params)
+
+    sizes = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(t, fitted, residuals, sigma, method, params, size, task_seed) for size, task_seed in zip(sizes, seeds)]
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        results = [_refit_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_refit_chunk, *zip(*tasks)))
+
+    samples = np.concatenate([draws for draws, _ in results])
+    converged = np.concatenate([ok for _, ok in results])
+    if not converged.all():
+        warnings.warn(f"{(~converged).sum()} of {n_boot} bootstrap refits did not converge and were dropped",
+                      RuntimeWarning, stacklevel=2)
+    return samples[converged]
+
+
+def forecast_draws(samples, horizon=20, market_share=1.0):
+    """Yearly and cumulative adoption for every parameter sample, computed by broadcasting.
+
+    Args:
+        samples (np.ndarray): (n, 3) parameter samples.
+        horizon (int): Number of periods to forecast, starting at t = 0.
+        market_share (float): Scale applied to M, e.g. 0.05 for Dyson in script2.py.
+
+    Returns:
+        tuple: (yearly, cumulative) arrays of shape (n, horizon).
+    """
+    samples = np.asarray(samples, dtype=float)
+    t = np.arange(horizon)[None, :]
+    yearly = bass_adoption(t, samples[:, :1], samples[:, 1:2], samples[:, 2:] * market_share)
+    return yearly, np.cumsum(yearly, axis=1)
+
+
+def quantile_bands(draws, levels=(0.05, 0.5, 0.95), index=None):
+    """Per-period quantiles of forecast draws as a DataFrame with one column per level."""
+    bands = np.quantile(draws, levels, axis=0).T
+    return pd.DataFrame(bands, index=index, columns=[f"q{level:g}" for level in levels])
+
+
+def bootstrap_forecast(t, y, params, n_boot=2000, method="residual", horizon=20, market_share=1.0,
+                       start_year=0, levels=(0.05, 0.5, 0.95), processes=None, seed=0, noise=True):
+    """Bootstrap a fitted Bass model and return prediction bands for yearly and cumulative adoption.
+
+    Args:
+        noise (bool): Add observation noise to every forecast draw, scaled by market_share like M.
+            Without it the bands are confidence bands of the mean curve, which are narrower.
+
+    Returns:
+        dict: 'samples' (n, 3) parameters, 'point' DataFrame with the forecast from params,
+        and 'yearly' / 'cumulative' DataFrames of quantile bands indexed by calendar year.
+    """
+    samples = bootstrap_parameters(t, y, params, n_boot, method, processes, seed)
+    yearly, cumulative = forecast_draws(samples, horizon, market_share)
+    if noise:
+        _, residuals, sigma = _residuals(*(np.asarray(x, dtype=float) for x in (t, y, params)))
+        rng = np.random.default_rng([seed, len(samples)])
+        yearly = yearly + market_share * observation_noise(residuals, sigma, method, yearly.shape, rng)
+        cumulative = np.cumsum(yearly, axis=1)
+    point_yearly, point_cumulative = forecast_draws(np.asarray(params, dtype=float)[None], horizon, market_share)
+    years = pd.Index(np.arange(start_year, start_year + horizon), name="Year")
+    return {
+        "samples": samples,
+        "point": pd.DataFrame({"Yearly": point_yearly[0], "Cumulative": point_cumulative[0]}, index=years),
+        "yearly": quantile_bands(yearly, levels, years),
+        "cumulative": quantile_bands(cumulative, levels, years),
+    }
+
+
+def plot_bands(forecast, title="Forecasted Adoption", path=None):
+    """Plot the point forecast with its outer quantile band, yearly on top and cumulative below."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    for row, (key, color) in enumerate((("yearly", "pink"), ("cumulative", "blue")), start=1):
+        bands = forecast[key]
+        years = bands.index
+        plt.subplot(2, 1, row)
+        plt.fill_between(years, bands.iloc[:, 0], bands.iloc[:, -1], color=color, alpha=0.2,
+                         label=f"{bands.columns[0]}-{bands.columns[-1]} band")
+        plt.plot(years, forecast["point"][key.capitalize()], marker='o', color=color, label="Point forecast")
+        plt.title(f"{title} ({key})")
+        plt.xlabel('Year')
+        plt.ylabel(f"{key.capitalize()} Adoption")
+        plt.xticks(years)
+        plt.grid(True)
+        plt.legend()
+    plt.tight_layout()
+    if path:
+        plt.savefig(path)
+    else:
+        plt.show()
@@ -12,4 +12,49 @@ import numpy as np
 
 def bass_model(t, p, q, M):
     """Bass Diffusion Model for the annual sales"""
-    return (M * (p + q)**2 * np.exp(-(p + q) * t)) / ((p + q * np.exp(-(p + q) * t))**2)
\ No newline at end of file
+    return bass_adoption(t, p, q, M)
+
+
+def _bass_terms(t, p, q):
+    """Shared terms of the Bass kernels, stable for any sign of (p + q) * t.
+
+    With e = exp(-(p + q) t) and D = p + q e, returns s = p + q, 1 / D and e / D.
+    Only u = exp(-|(p + q) t|) <= 1 is ever computed: when (p + q) t < 0 numerator and
+    denominator are multiplied by 1 / e, which swaps the roles of p and q.
+    """
+    t, p, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (t, p, q)))
+    s = p + q
+    x = s * t
+    u = np.exp(-np.abs(x))
+    forward = x >= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = 1 / np.where(forward, p + q * u, q + p * u)
+    inv_d = np.where(forward, r, u * r)
+    e_d = np.where(forward, u * r, r)
+    return t, s, x, u, inv_d, e_d
+
+
+def bass_adoption(t, p, q, M):
+    """Adoption per period f(t) = M (p + q)^2 e / (p + q e)^2 with e = exp(-(p + q) t)"""
+    _, s, _, _, inv_d, e_d = _bass_terms(t, p, q)
+    return M * s * s * e_d * inv_d
+
+
+def bass_cumulative(t, p, q, M):
+    """Cumulative adoption F(t) = M (1 - e) / (p + q e), the integral of bass_adoption from 0 to t"""
+    _, _, x, u, inv_d, e_d = _bass_terms(t, p, q)
+    # 1 - e = -expm1(-x) is (1 - u) / D for x >= 0 and (u - 1) e / (D e) otherwise.
+    one_minus = -np.expm1(-np.abs(x))
+    return M * np.where(x >= 0, one_minus * inv_d, -one_minus * e_d)
+
+
+def bass_jacobian(t, p, q, M):
+    """Analytic Jacobian of bass_adoption with respect to (p, q, M), shape broadcast(t, p, q, M) + (3,)"""
+    t, s, _, _, inv_d, e_d = _bass_terms(t, p, q)
+    q = np.broadcast_to(np.asarray(q, dtype=float), t.shape)
+    base = s * e_d * inv_d
+    scaled = M * base
+    d_p = scaled * (2 - s * t - 2 * s * (inv_d - q * t * e_d))
+    d_q = scaled * (2 - s * t - 2 * s * e_d * (1 - q * t))
+    d_M = np.broadcast_to(s * base, np.broadcast(base, M).shape)
+    return np.stack(np.broadcast_arrays(d_p, d_q, d_M), axis=-1)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""multistart.py
+
+Multistart global fitting of the Bass model, for one product or a whole catalog.
+
+Every product gets the same space-filling design of n_starts (p, q, M) points (Sobol or
+Latin hypercube; p and M on a log scale, M relative to the product's total sales), so no
+hand-tuned initial guess is needed. The starts are then thinned in stages:
+
+1. screening: the SSE of every start is computed in one broadcast call and only the
+   best `keep` starts per product survive;
+2. a short Levenberg-Marquardt run (screen_iter iterations) on the survivors, after
+   which the best `finalists` per product are kept;
+3. the finalists are fitted to convergence.
+
+Stages 2 and 3 run all products and starts together as one batch of fit_batch rows,
+split into chunks over a process pool. The best converged fit is returned together with
+the number of finalists that reached the same optimum.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from helper_functions import bass_adoption
+from panel_fit import PARAMETERS, fit_batch, pad_panel
+
+
+# (low, high, log scale) per parameter; M is relative to the product's total sales.
+DEFAULT_BOUNDS = {"p": (1e-4, 0.2, True), "q": (0.0, 1.5, False), "M": (1e-3, 10.0, True)}
+
+
+def design_starts(n_starts, bounds=None, method="sobol", seed=0):
+    """Space-filling starting points in the unit-free parameter space.
+
+    Args:
+        n_starts (int): Number of starts; Sobol designs are best balanced for powers of two.
+        bounds (dict, optional): {name: (low, high, log)}, see DEFAULT_BOUNDS.
+        method (str): 'sobol' or 'lhs'.
+        seed (int): Seed of the scrambling.
+
+    Returns:
+        np.ndarray: (n_starts, 3) starts, with M still a multiple of total sales.
+    """
+    bounds = bounds or DEFAULT_BOUNDS
+    if method == "sobol":
+        sampler = qmc.Sobol(d=3, scramble=True, seed=seed)
+        m = int(np.log2(n_starts))
+        unit = sampler.random_base2(m) if 2 ** m == n_starts else sampler.random(n_starts)
+    elif method == "lhs":
+        unit = qmc.LatinHypercube(d=3, seed=seed).random(n_starts)
+    else:
+        raise ValueError(f"Unknown design {method!r}, expected 'sobol' or 'lhs'")
+    starts = np.empty_like(unit)
+    for k, name in enumerate(PARAMETERS):
+        low, high, log = bounds[name]
+        if log:
+            starts[:, k] = np.exp(np.log(low) + unit[:, k] * (np.log(high) - np.log(low)))
+        else:
+            starts[:, k] = low + unit[:, k] * (high - low)
+    return starts
+
+
+def _fit_rows(t, y, mask, p0, max_iter):
+    fit = fit_batch(t, y, mask, p0, max_iter=max_iter)
+    return fit["params"], fit["sse"], fit["converged"]
+
+
+def _fit_parallel(t, y, mask, p0, max_iter, processes, chunk_rows):
+    """Run fit_batch over the rows in chunks, on a process pool when there is more than one chunk."""
+    starts = range(0, len(t), chunk_rows)
+    tasks = [(t[s:s + chunk_rows], y[s:s + chunk_rows], mask[s:s + chunk_rows], p0[s:s + chunk_rows], max_iter)
+             for s in starts]
+    processes = processes or os.cpu_count()
+    if processes == 1 or len(tasks) == 1:
+        results = [_fit_rows(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_fit_rows, *zip(*tasks)))
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def _take(values, order):
+    """Select per-product rows: values (P, S, ...) indexed by order (P, k)."""
+    return np.take_along_axis(values, order.reshape(order.shape + (1,) * (values.ndim - 2)), axis=1)
+
+
+def multistart_batch(t, y, mask, n_starts=256, keep=32, finalists=8, screen_iter=10, max_iter=200,
+                     method="sobol", bounds=None, rtol=1e-3, processes=None, chunk_rows=4096, seed=0):
+    """Multistart fit of P padded series.
+
+    Args:
+        t, y, mask (np.ndarray): (P, T) arrays as produced by panel_fit.pad_panel.
+        n_starts (int): Design points per product.
+        keep (int): Starts per product kept after SSE screening.
+        finalists (int): Starts per product kept after the short LM run and fitted to convergence.
+        screen_iter (int): LM iterations of the short run.
+        max_iter (int): LM iterations of the final run.
+        method (str): Design, 'sobol' or 'lhs'.
+        bounds (dict, optional): Design bounds, see DEFAULT_BOUNDS.
+        rtol (float): Relative tolerance on SSE and parameters for two fits to agree.
+        processes (int, optional): Worker processes, default the CPU count.
+        chunk_rows (int): fit_batch rows per task.
+        seed (int): Seed of the design.
+
+    Returns:
+        dict: per product 'params' (P, 3), 'sse', 'converged', 'n_converged', 'n_agree'
+        and 'best_start' (index into the design).
+    """
+    n_products = len(t)
+    keep, finalists = min(keep, n_starts), min(finalists, keep, n_starts)
+    design = design_starts(n_starts, bounds, method, seed)
+    starts = np.repeat(design[None], n_products, axis=0)
+    starts[..., 2] *= np.where(mask, y, 0.0).sum(axis=1)[:, None]
+
+    # Stage 1: screen every start by its SSE, (P, S, T) in one broadcast.
+    fitted = bass_adoption(t[:, None, :], starts[..., 0:1], starts[..., 1:2], starts[..., 2:3])
+    residuals = np.where(mask[:, None, :], fitted - y[:, None, :], 0.0)
+    sse = np.einsum("pst,pst->ps", residuals, residuals)
+    sse[~np.isfinite(sse)] = np.inf
+    order = np.argsort(sse, axis=1)[:, :keep]
+    candidates, start_ids = _take(starts, order), order
+
+    def rows(values, k):
+        return np.repeat(values, k, axis=0)
+
+    # Stage 2: a short LM run on the survivors, then keep the finalists.
+    params, stage_sse, _ = _fit_parallel(rows(t, keep), rows(y, keep), rows(mask, keep),
+                                         candidates.reshape(-1, 3), screen_iter, processes, chunk_rows)
+    stage_sse = np.where(np.isfinite(stage_sse), stage_sse, np.inf).reshape(n_products, keep)
+    order = np.argsort(stage_sse, axis=1)[:, :finalists]
+    candidates = _take(params.reshape(n_products, keep, 3), order)
+    start_ids = np.take_along_axis(start_ids, order, axis=1)
+
+    # Stage 3: fit the finalists to convergence.
+    params, final_sse, converged = _fit_parallel(rows(t, finalists), rows(y, finalists), rows(mask, finalists),
+                                                 candidates.reshape(-1, 3), max_iter, processes, chunk_rows)
+    params = params.reshape(n_products, finalists, 3)
+    final_sse = np.where(np.isfinite(final_sse), final_sse, np.inf).reshape(n_products, finalists)
+    converged = converged.reshape(n_products, finalists)
+
+    ranking = np.where(converged, final_sse, np.inf)
+    any_converged = converged.any(axis=1)
+    best = np.where(any_converged, np.argmin(ranking, axis=1), np.argmin(final_sse, axis=1))
+    index = np.arange(n_products)
+    best_params, best_sse = params[index, best], final_sse[index, best]
+    close_sse = np.abs(final_sse - best_sse[:, None]) <= rtol * np.abs(best_sse[:, None]) + 1e-12
+    close_params = (np.abs(params - best_params[:, None]) <= rtol * np.abs(best_params[:, None])).all(axis=2)
+    return {
+        "params": best_params,
+        "sse": best_sse,
+        "converged": converged[index, best],
+        "n_converged": converged.sum(axis=1),
+        "n_agree": (converged & close_sse & close_params).sum(axis=1),
+        "best_start": start_ids[index, best],
+    }
+
+
+def multistart_panel(data, product="product", period="period", sales="sales", **options):
+    """Multistart fit of every product in a long (product, period, sales) table.
+
+    Args:
+        data (pd.DataFrame): One row per (product, period).
+        product, period, sales (str): Column names.
+        **options: Passed to multistart_batch.
+
+    Returns:
+        pd.DataFrame: Indexed by product, with p, q, M, sse, rmse, converged, n_converged,
+        n_agree (finalists that reached the best optimum) and best_start.
+    """
+    products, t, y, mask = pad_panel(data, product, period, sales)
+    fit = multistart_batch(t, y, mask, **options)
+    table = pd.DataFrame(fit["params"], index=products, columns=PARAMETERS)
+    n_obs = mask.sum(axis=1)
+    table["n_obs"] = n_obs
+    table["sse"] = fit["sse"]
+    table["rmse"] = np.sqrt(fit["sse"] / np.maximum(n_obs, 1))
+    for name in ("converged", "n_converged", "n_agree", "best_start"):
+        table[name] = fit[name]
+    table.index.name = product
+    return table
+
+
+def multistart_fit(t, y, **options):
+    """Multistart fit of a single series, e.g. the AirPods sales of script1.py.
+
+    Returns:
+        dict: 'params' (p, q, M), 'sse', 'converged', 'n_converged', 'n_agree', 'best_start'.
+    """
+    t, y = np.asarray(t, dtype=float)[None], np.asarray(y, dtype=float)[None]
+    fit = multistart_batch(t, y, np.ones_like(t, dtype=bool), **options)
+    return {name: values[0] for name, values in fit.items()}
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""panel_fit.py
+
+Batched Bass model fitting for many products at once.
+
+Instead of one curve_fit call per product, every product's series is padded into a
+(products, periods) array with a mask, and a Levenberg-Marquardt solver updates the
+(p, q, M) of all products in the same vectorized step. Each product keeps its own
+damping factor and stops iterating once it has converged, so every product ends at
+the least-squares fit curve_fit reaches from the same start, with its diagnostics.
+"""
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import bass_adoption, bass_jacobian
+
+
+PARAMETERS = ("p", "q", "M")
+
+
+def pad_panel(data, product="product", period="period", sales="sales"):
+    """Turn a long (product, period, sales) table into padded (P, T) arrays.
+
+    Periods are normalized per product so the first observed period is t = 0,
+    the same way script1.py uses Year - Year.min().
+
+    Returns:
+        tuple: (products, t, y, mask) with products an Index of length P and
+        t, y, mask arrays of shape (P, T).
+    """
+    frame = data[[product, period, sales]].dropna().sort_values([product, period])
+    codes, products = pd.factorize(frame[product], sort=True)
+    t = (frame[period] - frame.groupby(product)[period].transform("min")).to_numpy(float)
+    position = frame.groupby(product).cumcount().to_numpy()
+    shape = (len(products), position.max() + 1 if len(frame) else 0)
+    times, values = np.zeros(shape), np.zeros(shape)
+    mask = np.zeros(shape, dtype=bool)
+    times[codes, position] = t
+    values[codes, position] = frame[sales].to_numpy(float)
+    mask[codes, position] = True
+    return products, times, values, mask
+
+
+def _residuals(theta, t, y, mask):
+    """Masked residuals bass_adoption(t) - y for every product, shape (P, T)."""
+    fitted = bass_adoption(t, theta[:, 0, None], theta[:, 1, None], theta[:, 2, None])
+    return np.where(mask, fitted - y, 0.0)
+
+
+def _jacobian(theta, t, y, mask, residuals):
+    """Analytic Jacobian of the masked residuals, shape (P, T, 3)."""
+    jacobian = bass_jacobian(t, theta[:, 0, None], theta[:, 1, None], theta[:, 2, None])
+    return np.where(mask[..., None], jacobian, 0.0)
+
+
+def fit_batch(t, y, mask, p0, max_iter=200, ftol=1e-10, xtol=1e-10, jacobian=None):
+    """Fit the Bass model to P padded series at once with batched Levenberg-Marquardt.
+
+    Args:
+        t (np.ndarray): (P, T) periods since launch.
+        y (np.ndarray): (P, T) sales.
+        mask (np.ndarray): (P, T) True where an observation exists.
+        p0 (np.ndarray): (P, 3) or (3,) initial (p, q, M).
+        max_iter (int): Maximum iterations per product.
+        ftol (float): Stop when the relative decrease of the SSE falls below this.
+        xtol (float): Stop when the relative parameter step falls below this.
+        jacobian (callable, optional): jacobian(theta, t, y, mask, residuals) -> (P, T, 3),
+            the analytic bass_jacobian by default.
+
+    Returns:
+        dict: 'params' (P, 3), 'sse', 'iterations', 'converged', 'status' and
+        'covariance' (P, 3, 3), each with one entry per product.
+    """
+    jacobian = jacobian or _jacobian
+    n_products = len(t)
+    theta = np.array(np.broadcast_to(np.asarray(p0, dtype=float), (n_products, 3)))
+    residuals = _residuals(theta, t, y, mask)
+    sse = np.einsum("pt,pt->p", residuals, residuals)
+    damping = np.full(n_products, 1e-3)
+    iterations = np.zeros(n_products, dtype=int)
+    status = np.full(n_products, "max_iter", dtype=object)
+    active = np.isfinite(sse)
+    status[~active] = "invalid start"
+    eye = np.eye(3)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        J = jacobian(theta[idx], t[idx], y[idx], mask[idx], residuals[idx])
+        A = np.einsum("ptk,ptl->pkl", J, J)
+        g = np.einsum("ptk,pt->pk", J, residuals[idx])
+        diagonal = np.maximum(np.diagonal(A, axis1=1, axis2=2), 1e-12)
+        system = A + damping[idx, None, None] * diagonal[:, :, None] * eye
+        try:
+            step = -np.linalg.solve(system, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            step = -(np.linalg.pinv(system) @ g[..., None])[..., 0]
+
+        candidate = theta[idx] + step
+        new_residuals = _residuals(candidate, t[idx], y[idx], mask[idx])
+        new_sse = np.einsum("pt,pt->p", new_residuals, new_residuals)
+        better = np.isfinite(new_sse) & (new_sse <= sse[idx])
+        iterations[idx] += 1
+
+        accepted = idx[better]
+        decrease = (sse[accepted] - new_sse[better]) / np.maximum(sse[accepted], 1e-300)
+        relative_step = np.max(np.abs(step[better]) / np.maximum(np.abs(theta[accepted]), 1e-12), axis=1)
+        theta[accepted] = candidate[better]
+        residuals[accepted] = new_residuals[better]
+        sse[accepted] = new_sse[better]
+        damping[accepted] = np.maximum(damping[accepted] / 10, 1e-12)
+        rejected = idx[~better]
+        damping[rejected] *= 10
+
+        done_f = accepted[decrease < ftol]
+        status[done_f] = "ftol"
+        done_x = accepted[(relative_step < xtol) & (decrease >= ftol)]
+        status[done_x] = "xtol"
+        stalled = rejected[damping[rejected] > 1e16]
+        status[stalled] = "stalled"
+        active[done_f] = active[done_x] = active[stalled] = False
+
+    J = jacobian(theta, t, y, mask, residuals)
+    n_obs = mask.sum(axis=1)
+    dof = np.maximum(n_obs - 3, 1)
+    covariance = np.full((n_products, 3, 3), np.nan)
+    A = np.einsum("ptk,ptl->pkl", J, J)
+    invertible = np.abs(np.linalg.det(A)) > 1e-300
+    covariance[invertible] = np.linalg.pinv(A[invertible]) * (sse[invertible] / dof[invertible])[:, None, None]
+    converged = np.isin(status, ("ftol", "xtol"))
+    return {"params": theta, "sse": sse, "iterations": iterations, "converged": converged,
+            "status": status, "covariance": covariance}
+
+
+def fit_panel(data, product="product", period="period", sales="sales", initial_guess=(0.03, 0.38, None),
+              max_iter=200, ftol=1e-10, xtol=1e-10, jacobian=None):
+    """Fit p, q and M for every product of a long-format sales table.
+
+    Args:
+        data (pd.DataFrame): One row per (product, period) with the sales of that period.
+        product, period, sales (str): Column names.
+        initial_guess (tuple): Starting (p, q, M); M=None starts each product at its total sales.
+        max_iter, ftol, xtol: Solver settings, see fit_batch.
+        jacobian (callable, optional): Jacobian override, see fit_batch.
+
+    Returns:
+        pd.DataFrame: Indexed by product, with p, q, M, their standard errors and the
+        diagnostics n_obs, sse, rmse, r2, iterations, converged and status.
+    """
+    products, t, y, mask = pad_panel(data, product, period, sales)
+    p_start, q_start, M_start = initial_guess
+    p0 = np.column_stack([np.full(len(products), p_start), np.full(len(products), q_start),
+                          y.sum(axis=1) if M_start is None else np.full(len(products), M_start)])
+    fit = fit_batch(t, y, mask, p0, max_iter, ftol, xtol, jacobian)
+
+    n_obs = mask.sum(axis=1)
+    mean = y.sum(axis=1) / np.maximum(n_obs, 1)
+    total = np.where(mask, y - mean[:, None], 0.0)
+    total = np.einsum("pt,pt->p", total, total)
+    errors = np.sqrt(np.diagonal(fit["covariance"], axis1=1, axis2=2))
+    table = pd.DataFrame(fit["params"], index=products, columns=PARAMETERS)
+    for k, name in enumerate(PARAMETERS):
+        table[f"{name}_se"] = errors[:, k]
+    table["n_obs"] = n_obs
+    table["sse"] = fit["sse"]
+    table["rmse"] = np.sqrt(fit["sse"] / np.maximum(n_obs, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["r2"] = 1 - fit["sse"] / total
+    table["iterations"] = fit["iterations"]
+    table["converged"] = fit["converged"]
+    table["status"] = fit["status"]
+    table.index.name = product
+    return table
@@ -14,7 +14,7 @@ import matplotlib
 import matplotlib.pyplot as plt
 
 
-from helper_functions import bass_model
+from helper_functions import bass_model, bass_jacobian
 
 data = {
     'Year': [2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
@@ -37,10 +37,6 @@ plt.xlabel('Year')
 plt.ylabel('Unit Sales in Milions')
 
 plt.show()
-def bass_model(t, p, q, M):
-    """Bass Diffusion Model for the annual sales"""
-    return (M * (p + q)**2 * np.exp(-(p + q) * t)) / ((p + q * np.exp(-(p + q) * t))**2)
-
 
 airpods['Year_norm'] = airpods['Year'] - airpods['Year'].min()
 
@@ -50,7 +46,8 @@ parameters, _ = curve_fit(
     bass_model,
     airpods['Year_norm'],
     airpods['Sales'],
-    p0=initial_guess
+    p0=initial_guess,
+    jac=bass_jacobian
 )
 p, q, M = parameters
 
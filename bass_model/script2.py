@@ -61,4 +61,29 @@ plt.xticks(years_calendar_dyson)
 plt.grid(True)
 
 plt.tight_layout()
-plt.show()
\ No newline at end of file
+plt.show()
+
+#Bootstrap prediction intervals: the AirPods sales are refitted 2000 times and every refit is turned into a Dyson forecast.
+#The refits run in this process, since a script without a __main__ guard cannot start a process pool.
+
+from bootstrap import bootstrap_forecast, plot_bands
+
+dyson_bootstrap = bootstrap_forecast(
+    airpods['Year_norm'],
+    airpods['Sales'],
+    [p, q, M],
+    n_boot=2000,
+    method='residual',
+    horizon=len(years_future_dyson),
+    market_share=0.05,
+    start_year=2025,
+    processes=1
+)
+
+print("\nBootstrap 90% Bands for Yearly Adoption of Dyson OnTrac:")
+print(dyson_bootstrap['yearly'].round(2))
+
+print("\nBootstrap 90% Bands for Cumulative Adoption of Dyson OnTrac:")
+print(dyson_bootstrap['cumulative'].round(2))
+
+plot_bands(dyson_bootstrap, title='Forecasted Adoption of Dyson OnTrac headphones')